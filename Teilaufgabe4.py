@@ -7,642 +7,116 @@
 #!pip install pyomo -q
  
 import pyomo.environ as pyo
-from pyomo.opt import SolverFactory
- 
-# ============================================================================
-# MODELL INITIALISIERUNG
-# ============================================================================
- 
-model = pyo.ConcreteModel(name="LKW_Flottenplanung")
- 
-# ============================================================================
-# 1️⃣ INDEXMENGEN (SETS)
-# ============================================================================
- 
-# Touren
-model.R = pyo.Set(initialize=[
-    't-4', 't-5', 't-6', 's-1', 's-2', 's-3', 's-4',
-    'w1', 'w2', 'w3', 'w4', 'w5', 'w6', 'w7',
-    'r1', 'r2', 'r3', 'h3', 'h4', 'k1'
-])
- 
-# LKWs - ERHÖHT AUF 15
-model.K = pyo.Set(initialize=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14])
- 
-# Diesel-LKW-Typen
-model.TD = pyo.Set(initialize=['ActrosL'])
- 
-# Elektro-LKW-Typen
-model.TE = pyo.Set(initialize=['eActros600', 'eActros400'])
- 
-# Alle LKW-Typen
-model.T = model.TD | model.TE
- 
-# Ladesäulentypen
-model.L = pyo.Set(initialize=['Alpitronic-50', 'Alpitronic-200', 'Alpitronic-400'])
- 
-# Zeitintervalle
-model.Z = pyo.Set(initialize=range(1, 97))  # 1...96
- 
-# Tagzeit (06:00-17:45)
-model.Z_day = pyo.Set(initialize=range(25, 73))  # 25...72
- 
-# Nachtzeit
-model.Z_night = pyo.Set(initialize=[z for z in range(1, 97) if z not in range(25, 73)])
- 
-# ============================================================================
-# 2️⃣ PARAMETER
-# ============================================================================
- 
-# --- Tourenparameter ---
- 
-dist_data = {
-    't-4': 250, 't-5': 250, 't-6': 250,
-    's-1': 120, 's-2': 120, 's-3': 120, 's-4': 120,
-    'w1': 100, 'w2': 100, 'w3': 100, 'w4': 100, 'w5': 100, 'w6': 100, 'w7': 100,
-    'r1': 285, 'r2': 250, 'r3': 235, 'h3': 180, 'h4': 180, 'k1': 275
-}
-model.dist = pyo.Param(model.R, initialize=dist_data)
- 
-mDist_data = {
-    't-4': 150, 't-5': 150, 't-6': 150,
-    's-1': 32, 's-2': 32, 's-3': 32, 's-4': 32,
-    'w1': 32, 'w2': 32, 'w3': 32, 'w4': 32, 'w5': 32, 'w6': 32, 'w7': 32,
-    'r1': 259, 'r2': 220, 'r3': 219, 'h3': 160, 'h4': 160, 'k1': 235
-}
-model.mDist = pyo.Param(model.R, initialize=mDist_data)
- 
-s_r_data = {
-    't-4': 28, 't-5': 27, 't-6': 25,
-    's-1': 23, 's-2': 25, 's-3': 37, 's-4': 27,
-    'w1': 23, 'w2': 33, 'w3': 28, 'w4': 25, 'w5': 29, 'w6': 23, 'w7': 30,
-    'r1': 73, 'r2': 67, 'r3': 72, 'h3': 76, 'h4': 75, 'k1': 67
-}
-model.s_r = pyo.Param(model.R, initialize=s_r_data)
- 
-e_r_data = {
-    't-4': 69, 't-5': 70, 't-6': 67,
-    's-1': 63, 's-2': 65, 's-3': 65, 's-4': 67,
-    'w1': 63, 'w2': 73, 'w3': 69, 'w4': 65, 'w5': 69, 'w6': 63, 'w7': 70,
-    'r1': 91, 'r2': 88, 'r3': 87, 'h3': 92, 'h4': 91, 'k1': 91
-}
-model.e_r = pyo.Param(model.R, initialize=e_r_data)
- 
-def dur_z_init(model, r):
-    return model.e_r[r] - model.s_r[r]
-model.dur_z = pyo.Param(model.R, initialize=dur_z_init)
- 
-def start_at_init(model, r, z):
-    return 1 if z == model.s_r[r] else 0
-model.start_at = pyo.Param(model.R, model.Z, initialize=start_at_init)
- 
-def end_at_init(model, r, z):
-    return 1 if z == model.e_r[r] else 0
-model.end_at = pyo.Param(model.R, model.Z, initialize=end_at_init)
- 
-def active_tour_init(model, r, z):
-    return 1 if model.s_r[r] <= z < model.e_r[r] else 0
-model.active_tour = pyo.Param(model.R, model.Z, initialize=active_tour_init)
- 
-# --- Diesel-LKW-Parameter ---
- 
-model.cap_d = pyo.Param(model.TD, initialize={'ActrosL': 24000})
-model.opx_d = pyo.Param(model.TD, initialize={'ActrosL': 6000})
-model.kfz_d = pyo.Param(model.TD, initialize={'ActrosL': 556})
-model.avgDv_d = pyo.Param(model.TD, initialize={'ActrosL': 0.26})
-model.c_diesel = pyo.Param(initialize=1.5)
-model.c_m_d = pyo.Param(initialize=0.34)
 
-# ============================================================================
-# ERWEITERUNG 1: CO₂-MAUT-AUFSCHLAG (basierend auf co2_emission_class aus CSV)
-# ============================================================================
-# Aufschläge pro CO₂-Emissionsklasse (€/km, Stand 2024)
-co2_maut_aufschlag = {
-    1: 0.158,  # Schlechteste Klasse
-    2: 0.142,
-    3: 0.126,
-    4: 0.079,
-    5: 0.000   # Beste Klasse
-}
-
-model.c_co2_maut = pyo.Param(model.TD, initialize={'ActrosL': co2_maut_aufschlag[1]})
+import flussmodell
+from modell import (build_model, presolve_ausgeben, auf_basisraster, waehle_solver,
+                    SYMMETRIE_BRECHUNG, FORMULIERUNG, ZEITAGGREGATION, MIP_START,
+                    LOESUNG_SPEICHERN, BERICHT_AUS_DATEI)
+from startloesung import startloesung
+from loesungsspeicher import speichere_loesung, lade_loesung, loesungsdatei
 
-# --- Elektro-LKW-Parameter ---
- 
-model.cap_e = pyo.Param(model.TE, initialize={'eActros600': 60000, 'eActros400': 50000})
-model.opx_e = pyo.Param(model.TE, initialize={'eActros600': 6000, 'eActros400': 5000})
-model.avgEv_e = pyo.Param(model.TE, initialize={'eActros600': 1.1, 'eActros400': 1.05})
-model.soc_e = pyo.Param(model.TE, initialize={'eActros600': 621, 'eActros400': 414})
-model.thg_e = pyo.Param(model.TE, initialize={'eActros600': 1000, 'eActros400': 1000})
- 
-max_p_e_data = {'eActros600': 400, 'eActros400': 400, 'ActrosL': 0}
-model.max_p_e = pyo.Param(model.T, initialize=max_p_e_data)
- 
-# --- Ladesäulen-Parameter ---
- 
-model.cap_l = pyo.Param(model.L, initialize={
-    'Alpitronic-50': 3000, 'Alpitronic-200': 10000, 'Alpitronic-400': 16000
-})
-model.opx_l = pyo.Param(model.L, initialize={
-    'Alpitronic-50': 1000, 'Alpitronic-200': 1500, 'Alpitronic-400': 2000
-})
-model.max_p_l = pyo.Param(model.L, initialize={
-    'Alpitronic-50': 50, 'Alpitronic-200': 200, 'Alpitronic-400': 400
-})
-model.cs_l = pyo.Param(model.L, initialize={
-    'Alpitronic-50': 2, 'Alpitronic-200': 2, 'Alpitronic-400': 2
-})
- 
-# --- Netz- und Speicherparameter ---
- 
-model.p_grid_max = pyo.Param(initialize=500)
-model.capP_s = pyo.Param(initialize=30)
-model.capQ_s = pyo.Param(initialize=350)
-model.opx_s = pyo.Param(initialize=0.02)
-model.nrt = pyo.Param(initialize=0.98)
-model.dod = pyo.Param(initialize=0.025)
 # ============================================================================
 # ERWEITERUNG 2: ZEITVARIABLE STROMPREISE (HT/NT-Tarif)
 # ============================================================================
 HT_PREIS = 0.27  # €/kWh Hochtarif (06:00-22:00) - HIER ÄNDERN!
 NT_PREIS = 0.22  # €/kWh Niedrigtarif (22:00-06:00) - HIER ÄNDERN!
-
-def c_e_init(model, z):
-    # z=25 entspricht 06:00, z=88 entspricht 21:45
-    if 25 <= z <= 88:  # 06:00 - 22:00 (Hochtarif)
-        return HT_PREIS
-    else:              # 22:00 - 06:00 (Niedrigtarif)
-        return NT_PREIS
-
-model.c_e = pyo.Param(model.Z, initialize=c_e_init)
-model.c_gr = pyo.Param(initialize=1000)
-model.cPeak = pyo.Param(initialize=150)
-model.Nmax = pyo.Param(initialize=3)
-model.delta_t = pyo.Param(initialize=0.25)
-
-model.z6 = pyo.Param(initialize=25)
-
-
  
-def unplug_ok_init(model, z):
-    if z in model.Z_day:
-        return 1
-    elif z + 1 == model.z6:
-        return 1
-    else:
-        return 0
-model.unplug_ok = pyo.Param(model.Z, initialize=unplug_ok_init)
-
-# --- PV-Anlage ---
-model.p_pv_cap = pyo.Var(domain=pyo.NonNegativeReals, bounds=(0, 500))  # Installierte PV-Leistung kWp
-
-# ============================================================================
-# ERWEITERUNG 3: PV-ANLAGE
-# ============================================================================
-
-model.capex_pv = pyo.Param(initialize=70) #jährliche Kosten, runtergerechnet Instandhaltung, anschaffungskosten usw.. pro KW (Groesse)
-
-# PV-Erzeugungsprofil (normiert 0-1, typischer Sommertag)
-def pv_profile_init(model, z):
-    hour = (z - 1) * 0.25  # Intervall z in Stunden umrechnen
-    if hour < 6 or hour >= 20:      # Nacht: keine Erzeugung
-        return 0.0
-    elif 6 <= hour < 8:             # Sonnenaufgang
-        return (hour - 6) / 2 * 0.4
-    elif 8 <= hour < 10:            # Vormittag früh
-        return 0.4 + (hour - 8) / 2 * 0.3
-    elif 10 <= hour < 12:           # Vormittag spät
-        return 0.7 + (hour - 10) / 2 * 0.3
-    elif 12 <= hour < 14:           # Mittag (Maximum)
-        return 1.0
-    elif 14 <= hour < 16:           # Nachmittag früh
-        return 1.0 - (hour - 14) / 2 * 0.2
-    elif 16 <= hour < 18:           # Nachmittag spät
-        return 0.8 - (hour - 16) / 2 * 0.4
-    elif 18 <= hour < 20:           # Sonnenuntergang
-        return 0.4 - (hour - 18) / 2 * 0.4
-    else:
-        return 0.0
-
-model.pv_profile = pyo.Param(model.Z, initialize=pv_profile_init)
-
-# PV-Erzeugung pro Zeitintervall
-def p_pv_rule(model, z):
-    return model.p_pv_cap * model.pv_profile[z]
-model.p_pv = pyo.Expression(model.Z, rule=p_pv_rule)
 # ============================================================================
-# 3️⃣ ENTSCHEIDUNGSVARIABLEN
+# BERICHT AUS GESPEICHERTER LÖSUNG (BERICHT_AUS_DATEI in modell.py)
 # ============================================================================
- 
-# --- LKW-Typ-Zuordnung ---
-model.type_assignment = pyo.Var(model.K, model.T, domain=pyo.Binary)
-
-# LKW wird benutzt (mindestens eine Tour)
-model.truck_used = pyo.Var(model.K, domain=pyo.Binary)
-
-# Hilfsvariable für Linearisierung: truck_type_used[k,t] = truck_used[k] * type_assignment[k,t]
-model.truck_type_used = pyo.Var(model.K, model.T, domain=pyo.Binary)
- 
-# --- Hilfsvariable für Linearisierung: a_type[r,k,t] = a[r,k] * type_assignment[k,t] ---
-model.a_type = pyo.Var(model.R, model.K, model.T, domain=pyo.Binary)
- 
-# --- Zuordnung & Bewegung ---
-model.a = pyo.Var(model.R, model.K, domain=pyo.Binary)
-model.depart = pyo.Var(model.K, model.Z, domain=pyo.Binary)
-
- 
-# --- Laden ---
-model.assign = pyo.Var(model.K, model.L, model.Z, domain=pyo.Binary)
-model.plug = pyo.Var(model.K, model.L, model.Z, domain=pyo.Binary)
-model.real_p = pyo.Var(model.K, model.L, model.Z, domain=pyo.NonNegativeReals)
-model.y_l = pyo.Var(model.L, domain=pyo.NonNegativeIntegers, bounds=(0, model.Nmax))
- 
-# --- Energiezustände ---
-model.soc = pyo.Var(model.K, model.Z, domain=pyo.NonNegativeReals)
- 
-# --- Speicherbetrieb ---
-model.p_s = pyo.Var(domain=pyo.NonNegativeReals)
-model.q_s = pyo.Var(domain=pyo.NonNegativeReals)
-model.p_l_s = pyo.Var(model.Z, domain=pyo.NonNegativeReals)
-model.p_e_s = pyo.Var(model.Z, domain=pyo.NonNegativeReals)
-model.soc_s = pyo.Var(model.Z, domain=pyo.NonNegativeReals)
-model.mode_s = pyo.Var(model.Z, domain=pyo.Binary)
- 
-# --- Netz ---
-model.p_grid = pyo.Var(model.Z, domain=pyo.NonNegativeReals)
-model.p_peak = pyo.Var(domain=pyo.NonNegativeReals)
-model.u = pyo.Var(domain=pyo.Binary)
- 
-# ============================================================================
-# 4️⃣ LINEARISIERUNG: a_type[r,k,t] = a[r,k] * type_assignment[k,t]
-# ============================================================================
- 
-# Für ALLE Typen (TD und TE)
-def a_type_lin1_rule(model, r, k, t):
-    return model.a_type[r, k, t] <= model.a[r, k]
-model.con_a_type_lin1 = pyo.Constraint(model.R, model.K, model.T, rule=a_type_lin1_rule)
- 
-def a_type_lin2_rule(model, r, k, t):
-    return model.a_type[r, k, t] <= model.type_assignment[k, t]
-model.con_a_type_lin2 = pyo.Constraint(model.R, model.K, model.T, rule=a_type_lin2_rule)
- 
-def a_type_lin3_rule(model, r, k, t):
-    return model.a_type[r, k, t] >= model.a[r, k] + model.type_assignment[k, t] - 1
-model.con_a_type_lin3 = pyo.Constraint(model.R, model.K, model.T, rule=a_type_lin3_rule)
- 
-# ============================================================================
-# 5️⃣ NEBENBEDINGUNGEN
-# ============================================================================
- 
-# --- 5.0 LKW-TYP-ZUORDNUNG ---
- 
-def one_type_per_truck_rule(model, k):
-    return sum(model.type_assignment[k, t] for t in model.T) == 1
-model.con_one_type_per_truck = pyo.Constraint(model.K, rule=one_type_per_truck_rule)
-
-# --- 5.0b TRUCK_USED LOGIK ---
-
-def truck_used_lower_rule(model, k):
-    return sum(model.a[r, k] for r in model.R) <= len(model.R) * model.truck_used[k]
-model.con_truck_used_lower = pyo.Constraint(model.K, rule=truck_used_lower_rule)
-
-def truck_used_upper_rule(model, k):
-    return model.truck_used[k] <= sum(model.a[r, k] for r in model.R)
-model.con_truck_used_upper = pyo.Constraint(model.K, rule=truck_used_upper_rule)
 
-# --- LINEARISIERUNG: truck_type_used[k,t] = truck_used[k] * type_assignment[k,t] ---
-
-def ttu_lin1_rule(model, k, t):
-    return model.truck_type_used[k, t] <= model.truck_used[k]
-model.con_ttu_lin1 = pyo.Constraint(model.K, model.T, rule=ttu_lin1_rule)
-
-def ttu_lin2_rule(model, k, t):
-    return model.truck_type_used[k, t] <= model.type_assignment[k, t]
-model.con_ttu_lin2 = pyo.Constraint(model.K, model.T, rule=ttu_lin2_rule)
-
-def ttu_lin3_rule(model, k, t):
-    return model.truck_type_used[k, t] >= model.truck_used[k] + model.type_assignment[k, t] - 1
-model.con_ttu_lin3 = pyo.Constraint(model.K, model.T, rule=ttu_lin3_rule)
-
-# --- 5.1 TOUR-ZUORDNUNG ---
- 
-def tour_assignment_rule(model, r):
-    return sum(model.a[r, k] for k in model.K) == 1
-model.con_tour_assignment = pyo.Constraint(model.R, rule=tour_assignment_rule)
- 
-# --- 5.2 LKW-BEWEGUNGSLOGIK ---
- 
-def no_concurrent_tours_rule(model, k, z):
-    return sum(model.active_tour[r, z] * model.a[r, k] for r in model.R) <= 1
-model.con_no_concurrent_tours = pyo.Constraint(model.K, model.Z, rule=no_concurrent_tours_rule)
- 
-def no_concurrent_arrivals_rule(model, k, z):
-    return sum(model.end_at[r, z] * model.a[r, k] for r in model.R) <= 1
-model.con_no_concurrent_arrivals = pyo.Constraint(model.K, model.Z, rule=no_concurrent_arrivals_rule)
- 
-def depart_definition_rule(model, k, z):
-    return model.depart[k, z] == sum(model.start_at[r, z] * model.a[r, k] for r in model.R)
-model.con_depart_definition = pyo.Constraint(model.K, model.Z, rule=depart_definition_rule)
- 
-
- 
-# --- 5.4 ENERGIE-DYNAMIK ---
- 
-# Energieverbrauch als Expression (JETZT LINEAR mit a_type)
-def cons_expr_rule(model, k, z):
-    return sum(
-        sum(
-            model.a_type[r, k, t] * model.active_tour[r, z] *
-            (model.dist[r] * model.avgEv_e[t] / model.dur_z[r])
-            for r in model.R
-        )
-        for t in model.TE
-    )
-model.cons = pyo.Expression(model.K, model.Z, rule=cons_expr_rule)
- 
-# SOC-Dynamik
-def soc_dynamics_rule(model, k, z):
-    if z == 96:
-        return pyo.Constraint.Skip
-    return (model.soc[k, z+1] == model.soc[k, z] - model.cons[k, z] +
-            sum(model.real_p[k, l, z] for l in model.L) * 0.25)
-model.con_soc_dynamics = pyo.Constraint(model.K, model.Z, rule=soc_dynamics_rule)
- 
-# SOC-Obergrenze
-def soc_upper_rule(model, k, z):
-    return model.soc[k, z] <= sum(model.type_assignment[k, t] * model.soc_e[t] for t in model.TE) + \
-                               sum(model.type_assignment[k, t] * 1000 for t in model.TD)
-model.con_soc_upper = pyo.Constraint(model.K, model.Z, rule=soc_upper_rule)
- 
-# KREISLAUF: Start = Ende
-def soc_cycle_rule(model, k):
-    return model.soc[k, 1] == model.soc[k, 96]
-model.con_soc_cycle = pyo.Constraint(model.K, rule=soc_cycle_rule)
-# Neuer Code
-#Gesamtbegrenzung Ladesäulen: maximal 3 Säulen insgesamt
-def total_charger_limit_rule(model):
-    return sum(model.y_l[l] for l in model.L) <= model.Nmax
-model.con_total_charger_limit = pyo.Constraint(rule=total_charger_limit_rule) 
-
-# --- 5.5 LADE-LOGIK ---
-# 1. NEU: Nur laden wenn angesteckt
-def charging_requires_assign_rule(model, k, l, z):
-    return model.real_p[k, l, z] <= model.assign[k, l, z] * 10000
-model.con_charging_requires_assign = pyo.Constraint(model.K, model.L, model.Z, rule=charging_requires_assign_rule)
-
-# --- 
-
- 
-def charging_power_limit_rule(model, k, l, z):
-    return model.real_p[k, l, z] <= sum(model.type_assignment[k, t] * model.max_p_e[t] for t in model.T)
-model.con_charging_power_limit = pyo.Constraint(model.K, model.L, model.Z, rule=charging_power_limit_rule)
- 
-def assign_requires_plug_rule(model, k, l, z):
-    return model.assign[k, l, z] <= model.plug[k, l, z]
-model.con_assign_requires_plug = pyo.Constraint(model.K, model.L, model.Z, rule=assign_requires_plug_rule)
- 
-def one_charger_per_truck_rule(model, k, z):
-    return sum(model.plug[k, l, z] for l in model.L) <= 1
-model.con_one_charger_per_truck = pyo.Constraint(model.K, model.Z, rule=one_charger_per_truck_rule)
- 
-def diesel_no_charging_rule(model, k, l, z):
-    return model.assign[k, l, z] <= sum(model.type_assignment[k, t] for t in model.TE)
-model.con_diesel_no_charging = pyo.Constraint(model.K, model.L, model.Z, rule=diesel_no_charging_rule)
- 
-def diesel_no_plug_rule(model, k, l, z):
-    return model.plug[k, l, z] <= sum(model.type_assignment[k, t] for t in model.TE)
-model.con_diesel_no_plug = pyo.Constraint(model.K, model.L, model.Z, rule=diesel_no_plug_rule)
- 
-def no_charge_while_driving_rule(model, k, z):
-    return sum(model.plug[k, l, z] for l in model.L) <= 1 - sum(model.active_tour[r, z] * model.a[r, k] for r in model.R)
-model.con_no_charge_while_driving = pyo.Constraint(model.K, model.Z, rule=no_charge_while_driving_rule)
- 
-def unplug_before_departure_rule(model, k, l, z):
-    if z == 96:
-        return pyo.Constraint.Skip
-    return model.plug[k, l, z] <= 1 - model.depart[k, z+1]
-model.con_unplug_before_departure = pyo.Constraint(model.K, model.L, model.Z, rule=unplug_before_departure_rule)
- 
-def unplug_timing_rule(model, k, l, z):
-    if z == 96:
-        return pyo.Constraint.Skip
-    return model.plug[k, l, z] - model.plug[k, l, z+1] <= model.unplug_ok[z]
-model.con_unplug_timing = pyo.Constraint(model.K, model.L, model.Z, rule=unplug_timing_rule)
- 
-# --- 5.6 LADESÄULEN-KAPAZITÄTEN ---
- 
-def charger_assign_capacity_rule(model, l, z):
-    return sum(model.assign[k, l, z] for k in model.K) <= model.y_l[l] * model.cs_l[l]
-model.con_charger_assign_capacity = pyo.Constraint(model.L, model.Z, rule=charger_assign_capacity_rule)
- 
-def charger_plug_capacity_rule(model, l, z):
-    return sum(model.plug[k, l, z] for k in model.K) <= model.y_l[l] * model.cs_l[l]
-model.con_charger_plug_capacity = pyo.Constraint(model.L, model.Z, rule=charger_plug_capacity_rule)
- 
-def charger_power_capacity_rule(model, l, z):
-    return sum(model.real_p[k, l, z] for k in model.K) <= model.y_l[l] * model.max_p_l[l]
-model.con_charger_power_capacity = pyo.Constraint(model.L, model.Z, rule=charger_power_capacity_rule)
- 
-# --- 5.8 NETZ UND SPEICHER ---
- 
-def grid_balance_rule(model, z):
-    return (model.p_grid[z] == sum(model.real_p[k, l, z] for k in model.K for l in model.L) +
-            model.p_l_s[z] - model.p_e_s[z] - model.p_pv[z])
-model.con_grid_balance = pyo.Constraint(model.Z, rule=grid_balance_rule)
- 
-def grid_limit_rule(model, z):
-    return model.p_grid[z] <= model.p_grid_max + 500 * model.u
-model.con_grid_limit = pyo.Constraint(model.Z, rule=grid_limit_rule)
- 
-def peak_power_rule(model, z):
-    return model.p_grid[z] <= model.p_peak
-model.con_peak_power = pyo.Constraint(model.Z, rule=peak_power_rule)
- 
-def storage_dynamics_rule(model, z):
-    if z == 96:
-        return pyo.Constraint.Skip
-    return (model.soc_s[z+1] == model.soc_s[z] + model.p_l_s[z] * model.delta_t -
-            (1/model.nrt) * model.p_e_s[z] * model.delta_t)
-model.con_storage_dynamics = pyo.Constraint(model.Z, rule=storage_dynamics_rule)
- 
-def storage_neutral_rule(model):
-    return model.soc_s[1] == model.soc_s[96]
-model.con_storage_neutral = pyo.Constraint(rule=storage_neutral_rule)
- 
-def storage_capacity_rule(model, z):
-    return model.soc_s[z] <= model.q_s
-model.con_storage_capacity = pyo.Constraint(model.Z, rule=storage_capacity_rule)
- 
-def storage_reserve_rule(model, z):
-    return model.soc_s[z] >= model.dod * model.q_s
-model.con_storage_reserve = pyo.Constraint(model.Z, rule=storage_reserve_rule)
- 
-def storage_charge_mode_rule(model, z):
-    return model.p_l_s[z] <= model.p_s
-model.con_storage_charge_mode = pyo.Constraint(model.Z, rule=storage_charge_mode_rule)
- 
-def storage_charge_mode_binary_rule(model, z):
-    return model.p_l_s[z] <= 10000 * model.mode_s[z]
-model.con_storage_charge_mode_binary = pyo.Constraint(model.Z, rule=storage_charge_mode_binary_rule)
- 
-def storage_discharge_mode_rule(model, z):
-    return model.p_e_s[z] <= model.p_s
-model.con_storage_discharge_mode = pyo.Constraint(model.Z, rule=storage_discharge_mode_rule)
- 
-def storage_discharge_mode_binary_rule(model, z):
-    return model.p_e_s[z] <= 10000 * (1 - model.mode_s[z])
-model.con_storage_discharge_mode_binary = pyo.Constraint(model.Z, rule=storage_discharge_mode_binary_rule)
- 
-# ============================================================================
-# 6️⃣ ZIELFUNKTION (LINEARISIERT)
-# ============================================================================
+if BERICHT_AUS_DATEI:
+    model, results = lade_loesung(loesungsdatei('teilaufgabe4'))
+    solution_found = True
+    print(f"Bericht aus {loesungsdatei('teilaufgabe4')} (ohne Modellaufbau und Lösen)")
+else:
+    # ============================================================================
+    # MODELL INITIALISIERUNG (Sets, Parameter, Variablen, Nebenbedingungen: modell.py)
+    # Erweiterungen: CO₂-Maut-Aufschlag, HT/NT-Tarif, PV-Anlage
+    # ============================================================================
  
-def objective_rule(model):
-    # C_trucks: NUR für benutzte LKWs
-    C_trucks = sum(
-        sum(model.truck_type_used[k, t] * (model.cap_d[t] + model.opx_d[t] + model.kfz_d[t]) for t in model.TD) +
-        sum(model.truck_type_used[k, t] * (model.cap_e[t] + model.opx_e[t]) for t in model.TE)
-        for k in model.K
-    )
-    
-    C_chargers = sum(model.y_l[l] * (model.cap_l[l] + model.opx_l[l]) for l in model.L)
-    
-    C_grid_trafo = 10000 * model.u
-    
-    C_storage = (1 + model.opx_s) * (model.capP_s * model.p_s + model.capQ_s * model.q_s)
-    
-    # ERWEITERUNG 1: CO₂-Maut-Aufschlag hinzugefügt
-    C_diesel_var = 260 * sum(
-        model.a_type[r, k, t] * ((model.c_m_d + model.c_co2_maut[t]) * model.mDist[r] +
-                                  model.c_diesel * (model.dist[r]) * model.avgDv_d[t])
-        for r in model.R for k in model.K for t in model.TD
-    )
-    
-    C_electricity = model.c_gr + model.cPeak * model.p_peak + \
-                    260 * sum(model.c_e[z] * model.p_grid[z] * model.delta_t for z in model.Z)
-    
-    C_revenue = sum(
-        sum(model.truck_type_used[k, t] * model.thg_e[t] for t in model.TE)
-        for k in model.K
-    )
-    # ERWEITERUNG 3: PV-Anlage Kosten
-    C_pv = model.capex_pv * model.p_pv_cap
-    return C_trucks + C_chargers + C_grid_trafo + C_storage + C_diesel_var + C_electricity - C_revenue + C_pv
+    if FORMULIERUNG == 'fluss':
+        model = flussmodell.build_flow_model(erweiterungen=True, ht_preis=HT_PREIS, nt_preis=NT_PREIS)
+    else:
+        model = build_model(erweiterungen=True, ht_preis=HT_PREIS, nt_preis=NT_PREIS,
+                            symmetrie_brechung=SYMMETRIE_BRECHUNG)
+        presolve_ausgeben(model)
 
-model.obj = pyo.Objective(rule=objective_rule, sense=pyo.minimize)
-# ============================================================================
-# SOLVER INSTALLATION UND SETUP
-# ============================================================================
- 
- 
-# ============================================================================
-# 7️⃣ SOLVER
-# ============================================================================
+    mip_start = MIP_START and FORMULIERUNG != 'fluss'
+    if mip_start:
+        startwert = startloesung(model, erweiterungen=True)
+        mip_start = startwert is not None
+        if mip_start:
+            print(f"MIP-Start (startloesung.py): {startwert:,.2f} €")
  
-print("=" * 80)
-print("MODELL WIRD GELÖST...")
-print("=" * 80)
+    # ============================================================================
+    # 7️⃣ SOLVER
+    # ============================================================================
  
-# CBC bevorzugen (bessere Heuristiken als GLPK)
-solver = None
-solver_name = None
- 
-# Solver auswählen
-solver = None
-solver_name = None
-
-# Versuche zuerst Gurobi (beste Löserqualität)
-try:
-    solver = SolverFactory('gurobi')
-    if solver.available():
-        solver_name = 'Gurobi'
-        print(f"Verwende Solver: {solver_name}")
-except:
-    pass
-
-# Falls Gurobi nicht verfügbar, versuche HiGHS
-if solver is None or not solver.available():
-    try:
-        solver = SolverFactory('appsi_highs')
-        if solver.available():
-            solver_name = 'HiGHS'
-            print(f"Verwende Solver: {solver_name}")
-    except:
-        pass
-
-# Falls HiGHS nicht verfügbar, CBC
-if solver is None or not solver.available():
-    try:
-        solver = SolverFactory('cbc')
-        if solver.available():
-            solver_name = 'CBC'
-            print(f"Verwende Solver: {solver_name}")
-    except:
-        pass
-
-# Falls CBC nicht verfügbar, GLPK
-if solver is None or not solver.available():
-    try:
-        solver = SolverFactory('glpk')
-        if solver.available():
-            solver_name = 'GLPK'
-            print(f"Verwende Solver: {solver_name}")
-    except:
-        pass
+    print("=" * 80)
+    print("MODELL WIRD GELÖST...")
+    print("=" * 80)
  
-# Solver-Optionen
-if solver_name == 'Gurobi':
-    solver.options['TimeLimit'] = 3600  # 1 Stunde
-    solver.options['OutputFlag'] = 1
-elif solver_name == 'HiGHS':
-    solver.options['time_limit'] = 3600
-    solver.options['log_to_console'] = True
-elif solver_name == 'CBC':
-    solver.options['seconds'] = 3600
-    solver.options['heuristics'] = 'on'
-    solver.options['round'] = 'on'
-    solver.options['feas'] = 'on'
-    solver.options['cuts'] = 'on'
-elif solver_name == 'GLPK':
-    solver.options['tmlim'] = 3600
+    solver, solver_name = waehle_solver(zeitlimit=3600)  # 1 Stunde
 
-print(f"\nStarte Optimierung mit {solver_name} (Zeitlimit: 1 Stunde)...\n")
-results = solver.solve(model, tee=True)
+    print(f"\nStarte Optimierung mit {solver_name} (Zeitlimit: 1 Stunde)...\n")
+    if mip_start and solver.warm_start_capable():
+        results = solver.solve(model, tee=True, warmstart=True)
+    else:
+        results = solver.solve(model, tee=True)
  
-# ============================================================================
-# ERGEBNIS-AUSWERTUNG (auch bei TimeLimit)
-# ============================================================================
+    # ============================================================================
+    # ERGEBNIS-AUSWERTUNG (auch bei TimeLimit)
+    # ============================================================================
  
-print("\n" + "=" * 80)
-print("OPTIMIERUNGSERGEBNISSE")
-print("=" * 80)
+    print("\n" + "=" * 80)
+    print("OPTIMIERUNGSERGEBNISSE")
+    print("=" * 80)
  
-# Prüfe ob eine Lösung gefunden wurde (optimal ODER feasible bei TimeLimit)
-solution_found = False
+    # Prüfe ob eine Lösung gefunden wurde (optimal ODER feasible bei TimeLimit)
+    solution_found = False
  
-if results.solver.status == pyo.SolverStatus.ok:
-    if results.solver.termination_condition == pyo.TerminationCondition.optimal:
-        print("\n✅ OPTIMALE LÖSUNG GEFUNDEN\n")
-        solution_found = True
-    elif results.solver.termination_condition == pyo.TerminationCondition.feasible:
-        print("\n⚠️ ZULÄSSIGE LÖSUNG GEFUNDEN (nicht bewiesen optimal)\n")
-        solution_found = True
+    if results.solver.status == pyo.SolverStatus.ok:
+        if results.solver.termination_condition == pyo.TerminationCondition.optimal:
+            print("\n✅ OPTIMALE LÖSUNG GEFUNDEN\n")
+            solution_found = True
+        elif results.solver.termination_condition == pyo.TerminationCondition.feasible:
+            print("\n⚠️ ZULÄSSIGE LÖSUNG GEFUNDEN (nicht bewiesen optimal)\n")
+            solution_found = True
        
-elif results.solver.status == pyo.SolverStatus.aborted:
-    # TimeLimit erreicht - prüfe ob trotzdem eine Lösung existiert
-    if results.solver.termination_condition == pyo.TerminationCondition.maxTimeLimit:
-        print("\n⏱️ ZEITLIMIT ERREICHT\n")
-        # Prüfe ob eine feasible Lösung gefunden wurde
-        try:
-            obj_value = pyo.value(model.obj)
-            if obj_value is not None:
-                print("✅ Beste gefundene Lösung wird verwendet.\n")
-                solution_found = True
-        except:
-            pass
+    elif results.solver.status == pyo.SolverStatus.aborted:
+        # TimeLimit erreicht - prüfe ob trotzdem eine Lösung existiert
+        if results.solver.termination_condition == pyo.TerminationCondition.maxTimeLimit:
+            print("\n⏱️ ZEITLIMIT ERREICHT\n")
+            # Prüfe ob eine feasible Lösung gefunden wurde
+            try:
+                obj_value = pyo.value(model.obj)
+                if obj_value is not None:
+                    print("✅ Beste gefundene Lösung wird verwendet.\n")
+                    solution_found = True
+            except:
+                pass
+ 
+    # Zeitaggregiertes Modell: Lösung für die Auswertung ins 15-Minuten-Raster expandieren
+    if solution_found and FORMULIERUNG != 'fluss' and ZEITAGGREGATION:
+        basis = build_model(erweiterungen=True, ht_preis=HT_PREIS, nt_preis=NT_PREIS,
+                            symmetrie_brechung=SYMMETRIE_BRECHUNG, zeitaggregation=False)
+        model = auf_basisraster(model, basis)
+
+    # Lösung für spätere Berichte ohne erneutes Lösen sichern (loesungsspeicher.py)
+    if solution_found and FORMULIERUNG != 'fluss' and LOESUNG_SPEICHERN:
+        print(f"Lösung gespeichert: {speichere_loesung(model, loesungsdatei('teilaufgabe4'), results)}")
  
 # Falls Lösung gefunden, Ergebnisse ausgeben
-if solution_found:
+if solution_found and FORMULIERUNG == 'fluss' and not BERICHT_AUS_DATEI:
+    # Fluss-Formulierung hat keinen LKW-Index k: kompakte Auswertung der Umläufe
+    flussmodell.ergebnisse_ausgeben(model)
+elif solution_found:
+    # Zeitraster der Auswertung (AUFLOESUNG in modell.py)
+    dt = pyo.value(model.delta_t_basis)   # Stunden pro Slot
+    slots_pro_stunde = round(1 / dt)
+    n_slots = len(model.Z)
+
     # ========================================================================
     # BASIS-INFORMATIONEN (aus Original-Ausgabe)
     # ========================================================================
@@ -761,8 +235,8 @@ if solution_found:
             # Touren-Details formatieren
             tour_details = []
             for r in sorted_tours:
-                start_h = (model.s_r[r]-1)*0.25
-                end_h = (model.e_r[r]-1)*0.25
+                start_h = (model.s_r[r]-1)*dt
+                end_h = (model.e_r[r]-1)*dt
                 tour_details.append(f"{r}({start_h:.1f}h-{end_h:.1f}h)")
             
             print(f"{k:<6} {truck_type:<15} [{typ_kat}]   {len(tours):<8} {total_km:<10} {', '.join(tour_details)}")
@@ -1029,11 +503,11 @@ if solution_found:
     leistungskosten = pyo.value(model.cPeak) * peak
     
     # Arbeitspreis (Energiekosten)
-    energie_bezug_tag = sum(pyo.value(model.p_grid[z]) * model.delta_t for z in model.Z)
+    energie_bezug_tag = sum(pyo.value(model.p_grid[z]) * model.delta_t[z] for z in model.Z)
     energie_bezug_jahr = 260 * energie_bezug_tag
     
     # Arbeitskosten mit zeitvariablen Preisen berechnen
-    arbeitskosten = 260 * sum(model.c_e[z] * pyo.value(model.p_grid[z]) * model.delta_t for z in model.Z)
+    arbeitskosten = 260 * sum(model.c_e[z] * pyo.value(model.p_grid[z]) * model.delta_t[z] for z in model.Z)
     
     # Trafo-Erweiterung
     trafo = pyo.value(model.u) > 0.5
@@ -1090,7 +564,7 @@ if solution_found:
         pv_kosten = pyo.value(model.capex_pv) * pv_cap
         
         # Tägliche PV-Erzeugung berechnen
-        pv_erzeugung_tag = sum(pyo.value(model.p_pv[z]) * model.delta_t for z in model.Z)
+        pv_erzeugung_tag = sum(pyo.value(model.p_pv[z]) * model.delta_t[z] for z in model.Z)
         pv_erzeugung_jahr = 260 * pv_erzeugung_tag
         
         print(f"\n{'Komponente':<40} {'Wert':<20} {'Kosten':<15}")
@@ -1154,8 +628,8 @@ if solution_found:
     print("=" * 100)
     
     def zeit_format(z):
-        """Konvertiert Zeitintervall z (1-96) in Uhrzeit HH:MM"""
-        minuten = (z - 1) * 15
+        """Konvertiert Zeitintervall z (1-n_slots) in Uhrzeit HH:MM"""
+        minuten = round((z - 1) * dt * 60)
         stunden = minuten // 60
         mins = minuten % 60
         return f"{stunden:02d}:{mins:02d}"
@@ -1268,13 +742,13 @@ if solution_found:
                         'start_z': z, 'end_z': z,
                         'ladesaeule': ladesaeule,
                         'leistungen': [lade_leistung],
-                        'energie': lade_leistung * 0.25,
+                        'energie': lade_leistung * dt,
                         'soc_start': pyo.value(model.soc[k, z])
                     }
                 else:
                     aktuelle_session['end_z'] = z
                     aktuelle_session['leistungen'].append(lade_leistung)
-                    aktuelle_session['energie'] += lade_leistung * 0.25
+                    aktuelle_session['energie'] += lade_leistung * dt
             else:
                 if aktuelle_session is not None:
                     aktuelle_session['soc_end'] = pyo.value(model.soc[k, aktuelle_session['end_z']])
@@ -1293,7 +767,7 @@ if solution_found:
             total_energie_geladen = 0
             for i, session in enumerate(lade_sessions, 1):
                 dauer_intervalle = session['end_z'] - session['start_z'] + 1
-                dauer_minuten = dauer_intervalle * 15
+                dauer_minuten = round(dauer_intervalle * dt * 60)
                 dauer_str = f"{dauer_minuten} min"
                 avg_leistung = sum(session['leistungen']) / len(session['leistungen'])
                 
@@ -1341,17 +815,17 @@ if solution_found:
     print("-" * 60)
     
     for h in range(24):
-        z_start = h * 4 + 1
-        z_end = z_start + 3
+        z_start = h * slots_pro_stunde + 1
+        z_end = z_start + slots_pro_stunde - 1
         
         # Durchschnittliche Netzlast in dieser Stunde
-        netzlast_avg = sum(pyo.value(model.p_grid[z]) for z in range(z_start, min(z_end+1, 97))) / 4
+        netzlast_avg = sum(pyo.value(model.p_grid[z]) for z in range(z_start, min(z_end+1, n_slots+1))) / slots_pro_stunde
         
         # Ladende LKW zählen
         ladende_lkw = set()
         aktive_saeulen = set()
         
-        for z in range(z_start, min(z_end+1, 97)):
+        for z in range(z_start, min(z_end+1, n_slots+1)):
             for k in model.K:
                 for l in model.L:
                     if pyo.value(model.real_p[k, l, z]) > 0.1:
@@ -1532,8 +1006,8 @@ if solution_found:
             
             print(f"\nLKW {k} | Typ: {truck_type} [{typ_kat}] | {len(tours)} Tour(en) | {total_km} km")
             for r in sorted_tours:
-                start_h = (model.s_r[r]-1)*0.25
-                end_h = (model.e_r[r]-1)*0.25
+                start_h = (model.s_r[r]-1)*dt
+                end_h = (model.e_r[r]-1)*dt
                 print(f"    → {r}: {start_h:.2f}h - {end_h:.2f}h, {model.dist[r]} km")
     
     # LADEINFRASTRUKTUR
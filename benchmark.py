@@ -0,0 +1,193 @@
+# ============================================================================
+# BENCHMARK: WIRKUNG VON MODELLVARIANTEN AUF MODELLGRÖSSE UND LÖSUNGSZEIT
+# Aufruf: python benchmark.py {symmetrie,linearisierung,bigm,presolve,zeit,skalierung} [--zeitlimit 3600] [--erweiterungen]
+#                             [--groessen 20 100 500 1000] [--seed 0]
+# ============================================================================
+
+import argparse
+import os
+import tempfile
+import time
+
+import pyomo.environ as pyo
+from pyomo.repn import generate_standard_repn
+
+from modell import build_model, waehle_solver
+from generator import schreibe_instanz
+
+
+def modellgroesse(model):
+    """Anzahl aktiver Variablen (nicht fixiert) und Nebenbedingungen."""
+    n_var = sum(1 for v in model.component_data_objects(pyo.Var) if not v.fixed)
+    n_con = sum(1 for _ in model.component_data_objects(pyo.Constraint, active=True))
+    return n_var, n_con
+
+
+def lp_schranke(model, zeitlimit):
+    """Zielwert der LP-Relaxierung (Ganzzahligkeit aufgehoben) auf einer Kopie."""
+    relaxiert = pyo.TransformationFactory('core.relax_integer_vars').create_using(model)
+    solver, _ = waehle_solver(zeitlimit)
+    try:
+        solver.solve(relaxiert, tee=False)
+        return pyo.value(relaxiert.obj)
+    except:
+        return None
+
+
+def loese(model, zeitlimit):
+    """Löst das Modell und misst die Zeit bis zum Abbruch bzw. Optimalitätsnachweis."""
+    solver, solver_name = waehle_solver(zeitlimit)
+    start = time.perf_counter()
+    try:
+        results = solver.solve(model, tee=False)
+    except Exception as e:
+        return {'solver': solver_name, 'zeit': time.perf_counter() - start,
+                'status': f"Fehler: {e}", 'obj': None, 'lb': None}
+    dauer = time.perf_counter() - start
+
+    status = str(results.solver.termination_condition)
+    obj = None
+    try:
+        obj = pyo.value(model.obj)
+    except:
+        pass
+    lb = getattr(results.problem, 'lower_bound', None)
+    return {'solver': solver_name, 'zeit': dauer, 'status': status, 'obj': obj, 'lb': lb}
+
+
+def ausgabe(zeilen):
+    def zahl(x):
+        return f"{x:,.2f}" if isinstance(x, (int, float)) else '-'
+
+    print("\n" + "=" * 115)
+    print(f"{'Variante':<25} {'Aufbau':>8} {'Var.':>8} {'NB':>8} {'LP-Schranke':>14} {'Lösung':>10} "
+          f"{'Status':<15} {'Zielwert':>14} {'Schranke':>14}")
+    print("-" * 115)
+    for z in zeilen:
+        print(f"{z['variante']:<25} {z['aufbau']:>7.2f}s {z['n_var']:>8} {z['n_con']:>8} {zahl(z['lp']):>14} "
+              f"{z['zeit']:>9.1f}s {z['status']:<15} {zahl(z['obj']):>14} {zahl(z['lb']):>14}")
+    print("=" * 115)
+
+
+def benchmark_varianten(varianten, zeitlimit, erweiterungen=False):
+    """Baut und löst jede Variante (Name -> build_model-Optionen) nacheinander."""
+    zeilen = []
+    for name, optionen in varianten:
+        print(f"\n>>> {name}")
+        start = time.perf_counter()
+        model = build_model(erweiterungen=erweiterungen, **optionen)
+        aufbau = time.perf_counter() - start
+        n_var, n_con = modellgroesse(model)
+        lp = lp_schranke(model, zeitlimit)
+        ergebnis = loese(model, zeitlimit)
+        zeilen.append(dict(variante=name, aufbau=aufbau, n_var=n_var, n_con=n_con, lp=lp, **ergebnis))
+    ausgabe(zeilen)
+    return zeilen
+
+
+def koeffizientenbereich(model, komponente=None):
+    """Kleinster und größter Betrag der Matrixkoeffizienten (alle NB oder eine Komponente)."""
+    if komponente is None:
+        daten = model.component_data_objects(pyo.Constraint, active=True)
+    else:
+        daten = getattr(model, komponente).values()
+    werte = [abs(c) for con in daten
+             for c in generate_standard_repn(con.body, compute_values=True).linear_coefs if c != 0]
+    return (min(werte), max(werte)) if werte else (None, None)
+
+
+def vergleich_big_m(erweiterungen=False):
+    """Koeffizientenbereiche mit pauschalem (fest) und abgeleitetem (auto) Big-M."""
+    komponenten = ['con_charging_requires_assign', 'con_storage_charge_mode_binary',
+                   'con_storage_discharge_mode_binary', None]
+    modelle = {m: build_model(erweiterungen=erweiterungen, big_m=m) for m in ('fest', 'auto')}
+
+    print("\n" + "=" * 100)
+    print(f"{'Nebenbedingung':<36} {'vorher (fest)':>30} {'nachher (auto)':>30}")
+    print("-" * 100)
+    for komponente in komponenten:
+        spalten = []
+        for model in modelle.values():
+            lo, hi = koeffizientenbereich(model, komponente)
+            spalten.append(f"[{lo:g}, {hi:g}]  ({hi / lo:,.0f})")
+        print(f"{komponente or 'gesamtes Modell':<36} {spalten[0]:>30} {spalten[1]:>30}")
+    print("=" * 100)
+    auto = modelle['auto']
+    print("M_laden: " + ", ".join(f"{l}={pyo.value(auto.M_laden[l]):g}" for l in auto.L) +
+          f" | M_speicher_laden={pyo.value(auto.M_speicher_laden):g}"
+          f" | M_speicher_entladen={pyo.value(auto.M_speicher_entladen):g}")
+
+
+def benchmark_symmetrie(zeitlimit, erweiterungen=False):
+    """Zeit bis zur Optimalität ohne/mit Symmetriebrechung über K."""
+    return benchmark_varianten([
+        ('ohne Symmetriebrechung', {'symmetrie_brechung': False}),
+        ('mit Symmetriebrechung', {'symmetrie_brechung': True}),
+    ], zeitlimit, erweiterungen)
+
+
+def benchmark_linearisierung(zeitlimit, erweiterungen=False):
+    """Zeilenzahl, LP-Schranke und Lösungszeit: McCormick vs. disaggregiert."""
+    return benchmark_varianten([
+        ('McCormick', {'linearisierung': 'mccormick'}),
+        ('disaggregiert', {'linearisierung': 'disaggregiert'}),
+    ], zeitlimit, erweiterungen)
+
+
+def benchmark_big_m(zeitlimit, erweiterungen=False):
+    """Koeffizientenbereiche, LP-Schranke und Lösungszeit: Big-M fest vs. abgeleitet."""
+    vergleich_big_m(erweiterungen)
+    return benchmark_varianten([
+        ('Big-M fest (10000)', {'big_m': 'fest'}),
+        ('Big-M abgeleitet', {'big_m': 'auto'}),
+    ], zeitlimit, erweiterungen)
+
+
+def benchmark_presolve(zeitlimit, erweiterungen=False):
+    """Modellgröße und Lösungszeit ohne/mit strukturellem Presolve."""
+    return benchmark_varianten([
+        ('ohne Presolve', {'presolve': False}),
+        ('mit Presolve', {'presolve': True}),
+    ], zeitlimit, erweiterungen)
+
+
+def benchmark_zeitaggregation(zeitlimit, erweiterungen=False):
+    """96 Slots vs. Ereignisintervalle (Modellgröße, Schranke, Lösungszeit)."""
+    return benchmark_varianten([
+        ('96 Slots', {'zeitaggregation': False}),
+        ('Ereignisintervalle', {'zeitaggregation': True}),
+    ], zeitlimit, erweiterungen)
+
+
+def benchmark_skalierung(zeitlimit, erweiterungen=False, groessen=(20, 100, 500, 1000), seed=0):
+    """Aufbau- und Lösungszeit über synthetische Instanzen (generator.py) wachsender Tourenzahl."""
+    with tempfile.TemporaryDirectory() as ordner:
+        varianten = [(f"{n} Touren (seed {seed})",
+                      {'instanz': schreibe_instanz(os.path.join(ordner, f"instanz_{n}_{seed}.csv"), n, seed)})
+                     for n in groessen]
+        return benchmark_varianten(varianten, zeitlimit, erweiterungen)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark der Modellvarianten")
+    parser.add_argument('vergleich', choices=['symmetrie', 'linearisierung', 'bigm', 'presolve', 'zeit',
+                                                     'skalierung'])
+    parser.add_argument('--zeitlimit', type=int, default=3600, help="Zeitlimit pro Lauf in Sekunden")
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    parser.add_argument('--groessen', type=int, nargs='+', default=[20, 100, 500, 1000],
+                        help="Tourenzahlen für skalierung")
+    parser.add_argument('--seed', type=int, default=0, help="Zufallsstartwert der Instanzen für skalierung")
+    args = parser.parse_args()
+
+    if args.vergleich == 'symmetrie':
+        benchmark_symmetrie(args.zeitlimit, args.erweiterungen)
+    elif args.vergleich == 'linearisierung':
+        benchmark_linearisierung(args.zeitlimit, args.erweiterungen)
+    elif args.vergleich == 'bigm':
+        benchmark_big_m(args.zeitlimit, args.erweiterungen)
+    elif args.vergleich == 'presolve':
+        benchmark_presolve(args.zeitlimit, args.erweiterungen)
+    elif args.vergleich == 'zeit':
+        benchmark_zeitaggregation(args.zeitlimit, args.erweiterungen)
+    elif args.vergleich == 'skalierung':
+        benchmark_skalierung(args.zeitlimit, args.erweiterungen, args.groessen, args.seed)
@@ -0,0 +1,370 @@
+# ============================================================================
+# LOGIKBASIERTE BENDERS-ZERLEGUNG: FLOTTE/ZUORDNUNG IM MASTER, LADEN IM SUBPROBLEM
+# Aufruf: python benders.py [--iterationen 50] [--zeitlimit-master 120]
+#                           [--zeitlimit-sub 120] [--toleranz 0.001]
+#                           [--prozesse 4] [--erweiterungen]
+#
+# Master:  LKW-Typen, Tourzuordnung (a, a_type) und Ladesäulen y_l. Zeitabhängige
+#          Variablen (Laden, Netz, Speicher) sind fixiert, ihre Kosten schätzt
+#          theta nach unten ab (Energiebedarf der E-Touren × günstigster Preis).
+#          Gültige Relaxierung je LKW: Energie der Touren <= Ladeleistung × Standzeit.
+# Sub 1:   je E-LKW (parallel): Ist sein Tourenplan mit der höchsten Ladeleistung,
+#          die die Säulen y_l zulassen, energetisch fahrbar (SOC, Stecken,
+#          Umsteckzeiten)? Sonst Cut gegen die minimale unzulässige Tourmenge,
+#          gültig für alle LKW dieses Typs, solange keine stärkeren Säulen kommen.
+# Sub 2:   volles Lade-/Netzmodell mit fixierter Flotte und Zuordnung, y_l des
+#          Masters als Mindestausstattung (Zusatzsäulen gehen in die Subkosten);
+#          Netzausbau u, Speicher und PV werden hier dimensioniert.
+#          Unzulässig -> No-Good-Cut, zulässig -> obere Schranke und
+#          Optimalitäts-Cut theta >= Subkosten, solange E-Zuordnung und y_l gleich bleiben.
+#          Ohne Lösung im Zeitlimit wird Sub 2 mit verdoppeltem Limit wiederholt
+#          (SUB_WIEDERHOLUNGEN); bleibt es offen, endet die Iteration ohne Cut.
+# Die Master-Schranke ist eine gültige untere Schranke des Gesamtmodells.
+# ============================================================================
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pyomo.environ as pyo
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.opt import TerminationCondition
+
+from instanz import Instanz
+from modell import build_model, baue_sets_und_parameter, waehle_solver, AUFLOESUNG
+from mehrstufig import projiziere
+
+# Entscheidungen des Masters; alle übrigen Variablen gehören zum Subproblem
+MASTER = ('type_assignment', 'truck_used', 'truck_type_used', 'a_type', 'a', 'y_l')
+
+# build_model-Optionen, die Mengen und Parameter bestimmen (an Sub 1 weitergereicht)
+DATENOPTIONEN = ('ht_preis', 'nt_preis', 'tage', 'instanz')
+
+# Wiederholungen von Sub 2 mit verdoppeltem Zeitlimit, wenn keine Lösung gefunden wurde
+SUB_WIEDERHOLUNGEN = 2
+
+# Basisdaten je Prozess (Sub 1 läuft in Worker-Prozessen)
+_basis = {}
+
+
+def unzulaessig(results):
+    return results.solver.termination_condition in (TerminationCondition.infeasible,
+                                                    TerminationCondition.infeasibleOrUnbounded)
+
+
+def tourenergie(model, r, t):
+    """Energiebedarf von Tour r mit E-Typ t in kWh."""
+    return pyo.value(model.dist[r] * model.avgEv_e[t])
+
+
+def ladeleistung_typ(model, l, t, n=1):
+    """Höchste Ladeleistung eines LKW vom E-Typ t bei n Säulen vom Typ l.
+
+    Die Säulenleistung ist je Typ gepoolt (y_l * max_p_l), ein einzelner LKW
+    kann also mehr als eine Säule ausschöpfen, höchstens aber max_p_e.
+    """
+    return min(n * pyo.value(model.max_p_l[l]), pyo.value(model.max_p_e[t]))
+
+
+# ----------------------------------------------------------------------------
+# Master
+# ----------------------------------------------------------------------------
+
+def baue_master(erweiterungen=False, aufloesung=AUFLOESUNG, **optionen):
+    """build_model ohne Lade-/Netzteil, mit theta, Relaxierung und Cut-Liste.
+
+    Symmetriebrechung ist immer aktiv: jeder Flottenplan hat dann genau
+    einen Repräsentanten, die No-Good-Cuts greifen nicht ins Leere.
+    """
+    optionen['symmetrie_brechung'] = True
+    master = build_model(erweiterungen=erweiterungen, aufloesung=aufloesung, **optionen)
+
+    betrieb = [v for var in master.component_objects(pyo.Var) if var.local_name not in MASTER
+               for v in var.values()]
+    betrieb_ids = {id(v) for v in betrieb}
+    for con in master.component_data_objects(pyo.Constraint, active=True):
+        if any(id(v) in betrieb_ids for v in identify_variables(con.body)):
+            con.deactivate()
+    for v in betrieb:
+        v.fix(0)
+
+    # Anzahl Säulen je Typ als Auswahl, damit Cuts auf genau ein y_l zielen können
+    master.N = pyo.Set(initialize=range(0, pyo.value(master.Nmax) + 1))
+    master.y_wahl = pyo.Var(master.L, master.N, domain=pyo.Binary)
+    master.con_y_wahl = pyo.Constraint(master.L, rule=lambda m, l: sum(m.y_wahl[l, n] for n in m.N) == 1)
+    master.con_y_wert = pyo.Constraint(master.L, rule=lambda m, l: m.y_l[l] == sum(n * m.y_wahl[l, n] for n in m.N))
+
+    # Relaxierung je LKW: über den Tag geladene = verbrauchte Energie, geladen
+    # wird höchstens mit der stärksten Säule außerhalb der Tourzeiten
+    tag_h = sum(pyo.value(master.delta_t[z]) for z in master.Z)
+    p_max = {t: max(ladeleistung_typ(master, l, t, pyo.value(master.Nmax)) for l in master.L) for t in master.TE}
+
+    def energie_relax_rule(m, k, t):
+        return (sum(m.a_type[r, k, t] * (tourenergie(m, r, t) + p_max[t] * m.dur_z[r] * m.delta_t_basis)
+                    for r in m.R) <= p_max[t] * tag_h * m.type_assignment[k, t])
+    master.con_energie_relax = pyo.Constraint(master.K, master.TE, rule=energie_relax_rule)
+
+    def batterie_rule(m, r, k, t):
+        if tourenergie(m, r, t) <= m.soc_e[t]:
+            return pyo.Constraint.Skip
+        return m.a_type[r, k, t] == 0
+    master.con_batterie = pyo.Constraint(master.R, master.K, master.TE, rule=batterie_rule)
+
+    # Relaxierung Säulen: alle E-Touren zusammen höchstens Säulenleistung × Tag
+    master.con_saeulen_relax = pyo.Constraint(expr=sum(
+        master.a_type[r, k, t] * tourenergie(master, r, t) for r in master.R for k in master.K for t in master.TE
+    ) <= sum(master.y_l[l] * master.max_p_l[l] for l in master.L) * tag_h)
+
+    # theta: Strombezug, Netzausbau, Speicher, PV (ohne Grundgebühr c_gr)
+    master.theta = pyo.Var(domain=pyo.NonNegativeReals)
+    if erweiterungen:
+        c_min = min(pyo.value(master.c_e[z]) for z in master.Z)
+        pv_max = master.p_pv_cap.ub * sum(pyo.value(master.pv_profile[z] * master.delta_t[z]) for z in master.Z)
+    else:
+        c_min = pyo.value(master.c_e)
+        pv_max = 0
+    master.con_theta_energie = pyo.Constraint(expr=master.theta >= master.jahresfaktor * c_min * (
+        sum(master.a_type[r, k, t] * tourenergie(master, r, t) for r in master.R for k in master.K for t in master.TE)
+        - pv_max))
+
+    master.cuts = pyo.ConstraintList()
+    master.obj.deactivate()
+    master.obj_master = pyo.Objective(expr=master.obj.expr + master.theta, sense=pyo.minimize)
+    return master
+
+
+def e_zuordnung(master):
+    """Gewählte (r, k, t) mit E-Typ t und aktuelle Säulenzahl je Typ."""
+    e_touren = [(r, k, t) for r in master.R for k in master.K for t in master.TE
+                if master.a_type[r, k, t].value > 0.5]
+    y = {l: round(master.y_l[l].value) for l in master.L}
+    return e_touren, y
+
+
+# ----------------------------------------------------------------------------
+# Sub 1: Fahrbarkeit je E-LKW
+# ----------------------------------------------------------------------------
+
+def datenoptionen(optionen):
+    """DATENOPTIONEN aus optionen als hashbares Tupel; eine Instanz wird durch ihren Pfad ersetzt."""
+    daten = []
+    for name in DATENOPTIONEN:
+        wert = optionen.get(name)
+        if wert is None:
+            continue
+        if name == 'tage':
+            wert = tuple(wert)
+        elif isinstance(wert, Instanz):
+            wert = wert.pfad
+        daten.append((name, wert))
+    return tuple(daten)
+
+
+def _daten(erweiterungen, aufloesung, daten=()):
+    schluessel = (erweiterungen, aufloesung, daten)
+    if schluessel not in _basis:
+        basis = pyo.ConcreteModel()
+        baue_sets_und_parameter(basis, erweiterungen, aufloesung=aufloesung, **dict(daten))
+        _basis[schluessel] = (basis, waehle_solver(60)[0])
+    return _basis[schluessel]
+
+
+def lkw_fahrbar(touren, t, leistung, erweiterungen=False, aufloesung=AUFLOESUNG, daten=()):
+    """Kann ein LKW vom Typ t die touren mit eigener Säule (leistung kW) fahren?
+
+    Einzel-LKW-Ausschnitt von build_model (SOC, Stecken, Umsteckzeiten,
+    Abstecken vor Abfahrt) ohne Säulen- und Netzkopplung. daten sind die
+    Datenoptionen des Masters (siehe datenoptionen).
+    """
+    basis, solver = _daten(erweiterungen, aufloesung, daten)
+    touren = set(touren)
+    fahrt = {z: any(r in touren for r in basis.R_active[z]) for z in basis.Z}
+    abfahrt = {z: any(r in touren for r in basis.R_start[z]) for z in basis.Z}
+
+    m = pyo.ConcreteModel()
+    m.Z = pyo.Set(initialize=list(basis.Z))
+    m.soc = pyo.Var(m.Z, bounds=(0, pyo.value(basis.soc_e[t])))
+    m.plug = pyo.Var(m.Z, domain=pyo.Binary)
+    m.p = pyo.Var(m.Z, bounds=(0, leistung))
+
+    m.con_laden = pyo.Constraint(m.Z, rule=lambda m, z: m.p[z] <= leistung * m.plug[z])
+    m.con_fahrt = pyo.Constraint(m.Z, rule=lambda m, z: m.plug[z] <= (0 if fahrt[z] else 1))
+
+    def soc_rule(m, z):
+        if z == m.Z.last():
+            return m.soc[m.Z.first()] == m.soc[z]
+        verbrauch = sum(pyo.value(basis.dist[r] * basis.avgEv_e[t] / basis.dur_z[r] * basis.n_basis[z])
+                        for r in basis.R_active[z] if r in touren)
+        return m.soc[m.Z.next(z)] == m.soc[z] - verbrauch + m.p[z] * pyo.value(basis.delta_t[z])
+    m.con_soc = pyo.Constraint(m.Z, rule=soc_rule)
+
+    def umstecken_rule(m, z):
+        if z == m.Z.last():
+            return pyo.Constraint.Skip
+        if abfahrt[m.Z.next(z)]:
+            return m.plug[z] == 0
+        if basis.unplug_ok[z] == 1:
+            return pyo.Constraint.Skip
+        return m.plug[z] <= m.plug[m.Z.next(z)]
+    m.con_umstecken = pyo.Constraint(m.Z, rule=umstecken_rule)
+    m.obj = pyo.Objective(expr=0)
+
+    return not unzulaessig(solver.solve(m, load_solutions=False))
+
+
+def minimale_unzulaessige_menge(aufgabe):
+    """Deletion-Filter: None, wenn fahrbar, sonst eine minimale unzulässige Tourmenge."""
+    touren, t, leistung, erweiterungen, aufloesung, daten = aufgabe
+    if lkw_fahrbar(touren, t, leistung, erweiterungen, aufloesung, daten):
+        return None
+    kern = list(touren)
+    for r in list(touren):
+        rest = [x for x in kern if x != r]
+        if rest and not lkw_fahrbar(rest, t, leistung, erweiterungen, aufloesung, daten):
+            kern = rest
+    return kern
+
+
+def vorab_cuts(master, pool, erweiterungen=False, aufloesung=AUFLOESUNG, daten=()):
+    """Einzeltouren und Tourpaare, die schon mit der stärksten Säule nicht fahrbar sind.
+
+    Gleichzeitige Touren schließt der Master ohnehin aus; die übrigen Paare
+    werden parallel geprüft und als Konflikt-Cuts für alle LKW eingetragen.
+    """
+    konflikt = {(r1, r2) for c in master.C for r1 in master.R_clique[c] for r2 in master.R_clique[c]}
+    R = list(master.R)
+    mengen = [[r] for r in R] + [[r1, r2] for i, r1 in enumerate(R) for r2 in R[i + 1:]
+                                 if (r1, r2) not in konflikt]
+    aufgaben = [(touren, t, max(ladeleistung_typ(master, l, t, n) for l in master.L for n in master.N),
+                 erweiterungen, aufloesung, daten)
+                for t in master.TE for touren in mengen]
+    n_cuts = 0
+    for (touren, t, _, _, _, _), fahrbar in zip(aufgaben, pool.map(pruefe, aufgaben, chunksize=16)):
+        if fahrbar:
+            continue
+        for k in master.K:
+            master.cuts.add(sum(master.a_type[r, k, t] for r in touren) <= len(touren) - 1)
+        n_cuts += 1
+    print(f"Vorab: {n_cuts} von {len(aufgaben)} Tourmengen nicht fahrbar")
+
+
+def pruefe(aufgabe):
+    return lkw_fahrbar(*aufgabe)
+
+
+# ----------------------------------------------------------------------------
+# Hauptschleife
+# ----------------------------------------------------------------------------
+
+def loese_benders(iterationen=50, zeitlimit_master=120, zeitlimit_sub=120, toleranz=0.001,
+                  prozesse=4, erweiterungen=False, aufloesung=AUFLOESUNG, **optionen):
+    """Logikbasierte Benders-Iteration; gibt (bestes Subproblem-Modell, untere, obere Schranke) zurück.
+
+    Bleibt ein Sub 2 auch nach SUB_WIEDERHOLUNGEN ohne Lösung, bricht die
+    Iteration ab: ein No-Good könnte zulässige Flotten abschneiden.
+    """
+    master = baue_master(erweiterungen, aufloesung, **dict(optionen))
+    daten = datenoptionen(optionen)
+    solver_master, _ = waehle_solver(zeitlimit_master)
+    untere, obere, bestes = 0.0, float('inf'), None
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=prozesse) as pool:
+        vorab_cuts(master, pool, erweiterungen, aufloesung, daten)
+        for it in range(1, iterationen + 1):
+            results = solver_master.solve(master, tee=False, load_solutions=False)
+            if len(results.solution) == 0:
+                print(f"Iteration {it}: Master ohne Lösung ({results.solver.termination_condition}) - Abbruch")
+                break
+            master.solutions.load_from(results)
+            schranke = getattr(results.problem, 'lower_bound', None)
+            if schranke is None and results.solver.termination_condition == TerminationCondition.optimal:
+                schranke = pyo.value(master.obj_master)
+            if schranke is not None:
+                untere = max(untere, schranke)
+            e_touren, y = e_zuordnung(master)
+            auswahl = (sum(1 - master.a_type[r, k, t] for r, k, t in e_touren) +
+                       sum(1 - master.y_wahl[l, y[l]] for l in master.L))
+
+            # Sub 1: jeder E-LKW einzeln, parallel
+            aufgaben = []
+            for k in master.K:
+                for t in master.TE:
+                    touren = [r for r, k2, t2 in e_touren if k2 == k and t2 == t]
+                    if touren:
+                        leistung = max(ladeleistung_typ(master, l, t, y[l]) for l in master.L)
+                        aufgaben.append((touren, t, leistung, erweiterungen, aufloesung, daten))
+            n_cuts = 0
+            for (touren, t, leistung, _, _, _), kern in zip(aufgaben, pool.map(minimale_unzulaessige_menge, aufgaben)):
+                if kern is None:
+                    continue
+                staerker = [(l, n) for l in master.L for n in master.N if ladeleistung_typ(master, l, t, n) > leistung]
+                for k in master.K:
+                    master.cuts.add(sum(master.a_type[r, k, t] for r in kern) <= len(kern) - 1 + len(kern) *
+                                    sum(master.y_wahl[l, n] for l, n in staerker))
+                n_cuts += 1
+
+            if n_cuts:
+                print(f"Iteration {it}: untere Schranke {untere:,.2f} € | {n_cuts} LKW nicht fahrbar | "
+                      f"{time.perf_counter() - start:.0f}s")
+                continue
+
+            # Sub 2: Laden, Netz und Speicher für die ganze Flotte; y_l aus dem
+            # Master ist Mindestausstattung, weitere Säulen kosten im Subproblem
+            sub = build_model(erweiterungen=erweiterungen, aufloesung=aufloesung, **optionen)
+            projiziere(master, sub, fixieren=True, namen=('type_assignment', 'a', 'y_l'))
+            for l in sub.L:
+                sub.y_l[l].unfix()
+                sub.y_l[l].setlb(y[l])
+            for wiederholung in range(SUB_WIEDERHOLUNGEN + 1):
+                solver_sub, _ = waehle_solver(zeitlimit_sub * 2 ** wiederholung)
+                results = solver_sub.solve(sub, tee=False, load_solutions=False)
+                if unzulaessig(results) or len(results.solution) > 0:
+                    break
+            if unzulaessig(results):
+                master.cuts.add(sum(1 - master.a_type[r, k, t] for r, k, t in e_touren) +
+                                sum(master.y_wahl[l, n] for l in master.L for n in master.N if n > y[l]) >= 1)
+                print(f"Iteration {it}: untere Schranke {untere:,.2f} € | Laden/Netz unzulässig | "
+                      f"{time.perf_counter() - start:.0f}s")
+                continue
+            if len(results.solution) == 0:
+                print(f"Iteration {it}: untere Schranke {untere:,.2f} € | Laden/Netz ohne Lösung nach "
+                      f"{zeitlimit_sub * 2 ** SUB_WIEDERHOLUNGEN}s - Abbruch (--zeitlimit-sub erhöhen)")
+                break
+            sub.solutions.load_from(results)
+
+            # Cut mit der Subproblem-Schranke: bei Abbruch im Zeitlimit bleibt er gültig
+            kosten = pyo.value(sub.obj)
+            schranke = getattr(results.problem, 'lower_bound', None)
+            if schranke is None or not abs(schranke) < float('inf'):
+                schranke = kosten
+            theta = min(schranke, kosten) - pyo.value(master.obj)
+            master.cuts.add(master.theta >= theta * (1 - auswahl))
+            if kosten < obere:
+                obere, bestes = kosten, sub
+            print(f"Iteration {it}: untere Schranke {untere:,.2f} € | Lösung {kosten:,.2f} € | "
+                  f"beste {obere:,.2f} € | {time.perf_counter() - start:.0f}s")
+            if obere - untere <= toleranz * abs(obere):
+                break
+
+    return bestes, untere, obere
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Logikbasierte Benders-Zerlegung (Flotte | Laden)")
+    parser.add_argument('--iterationen', type=int, default=50)
+    parser.add_argument('--zeitlimit-master', type=int, default=120, help="Zeitlimit je Master-Lauf in Sekunden")
+    parser.add_argument('--zeitlimit-sub', type=int, default=120, help="Zeitlimit je Lade-Subproblem in Sekunden")
+    parser.add_argument('--toleranz', type=float, default=0.001, help="relative Lücke für den Abbruch")
+    parser.add_argument('--prozesse', type=int, default=4, help="parallele Einzel-LKW-Prüfungen")
+    parser.add_argument('--aufloesung', type=int, default=AUFLOESUNG)
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    args = parser.parse_args()
+
+    model, untere, obere = loese_benders(args.iterationen, args.zeitlimit_master, args.zeitlimit_sub,
+                                         args.toleranz, args.prozesse, args.erweiterungen, args.aufloesung)
+    if model is None:
+        print(f"\nUntere Schranke: {untere:,.2f} € | noch keine zulässige Lösung - mehr Iterationen")
+    else:
+        print(f"\nUntere Schranke: {untere:,.2f} € | beste Lösung: {obere:,.2f} € | "
+              f"Lücke: {(obere - untere) / abs(obere) * 100:.2f}%")
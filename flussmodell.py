@@ -0,0 +1,313 @@
+# ============================================================================
+# ALTERNATIVE FORMULIERUNG: AGGREGIERTE FLOTTE ALS TOUREN-VERKETTUNGS-FLUSS
+# ============================================================================
+# Statt jedem LKW-Slot k eine eigene Kopie aller Variablen zu geben, fahren die
+# Fahrzeuge als Fluss durch den Touren-Kompatibilitätsgraphen (DAG über die
+# Touren, geschlossen durch Kanten über Mitternacht), eine Ware pro LKW-Typ.
+#
+#   x[t,i,j,0] = 1: ein Fahrzeug vom Typ t fährt nach Tour i am selben Tag j
+#   x[t,i,j,1] = 1: ... nach Tour i als erste Tour des Folgetags j
+#
+# Jede Tour wird genau einmal erreicht; die Anzahl der Kanten über Mitternacht
+# je Typ ist die Flottengröße (jedes Fahrzeug überquert einmal pro Tag
+# Mitternacht). Geladen wird pro Tour-Knoten im Standfenster zwischen Ankunft
+# e_i und der Abfahrt zur Folgetour; der SOC wird entlang der Kette
+# weitergereicht. Modellgröße wächst mit |R|² statt mit |K|·|L|·|Z| und hat
+# keine Permutationssymmetrie über k.
+#
+# Abweichung zum LKW-indizierten Modell: assign ist ohne eigene Wirkung
+# (Ladepunkt-Kapazität greift schon über plug) und entfällt; Umläufe über
+# mehrere Tage (Zyklen mit mehreren Mitternachtskanten) sind zulässig.
+# ============================================================================
+
+import pyomo.environ as pyo
+
+from modell import baue_sets_und_parameter, baue_netz_und_speicher, big_m_schranken, BIG_M, AUFLOESUNG
+
+
+def build_flow_model(erweiterungen=False, ht_preis=0.27, nt_preis=0.22, big_m=BIG_M, aufloesung=AUFLOESUNG,
+                     instanz=None):
+    """Baut die Fluss-Formulierung mit denselben Daten wie build_model auf (instanz wie dort)."""
+
+    model = pyo.ConcreteModel(name="LKW_Flottenplanung_Fluss")
+
+    baue_sets_und_parameter(model, erweiterungen, ht_preis, nt_preis, aufloesung=aufloesung, instanz=instanz)
+    big_m_schranken(model, erweiterungen, big_m)
+
+    n_z = len(model.Z)
+
+    # ========================================================================
+    # 1️⃣ TOUREN-KOMPATIBILITÄTSGRAPH
+    # ========================================================================
+
+    # Kanten (i, j, w): j am selben Tag nach i (w=0) oder am Folgetag (w=1).
+    # Über Mitternacht nur, wenn j am selben Tag nicht mehr erreichbar wäre -
+    # sonst stünde das Fahrzeug länger als einen Tag.
+    kanten = []
+    for i in model.R:
+        for j in model.R:
+            if i != j and model.s_r[j] >= model.e_r[i]:
+                kanten.append((i, j, 0))
+            if model.s_r[j] < model.e_r[i]:
+                kanten.append((i, j, 1))
+    model.A = pyo.Set(dimen=3, initialize=kanten)
+
+    A_in = {r: [] for r in model.R}
+    A_out = {r: [] for r in model.R}
+    for (i, j, w) in kanten:
+        A_out[i].append((i, j, w))
+        A_in[j].append((i, j, w))
+
+    # Standfenster nach Tour i in absoluten Slots (> n_z = Folgetag)
+    def abfahrt(j, w):
+        return model.s_r[j] + n_z * w
+
+    fenster = {i: range(model.e_r[i], max(abfahrt(j, w) for (_, j, w) in A_out[i]))
+               for i in model.R}
+
+    def tag_slot(z):
+        return (z - 1) % n_z + 1
+
+    model.W = pyo.Set(dimen=3, initialize=[
+        (i, l, z) for i in model.R for l in model.L for z in fenster[i]
+    ])
+    model.W_R = pyo.Set(dimen=2, initialize=[(i, z) for i in model.R for z in fenster[i]])
+    W_slot = {(l, z): [] for l in model.L for z in model.Z}
+    for (i, l, z) in model.W:
+        W_slot[l, tag_slot(z)].append((i, z))
+
+    # ========================================================================
+    # 2️⃣ ENTSCHEIDUNGSVARIABLEN
+    # ========================================================================
+
+    model.x = pyo.Var(model.T, model.A, domain=pyo.Binary)
+    model.soc_dep = pyo.Var(model.R, domain=pyo.NonNegativeReals)  # SOC bei Abfahrt zu Tour r
+
+    model.plug = pyo.Var(model.W, domain=pyo.Binary)
+    model.real_p = pyo.Var(model.W, domain=pyo.NonNegativeReals)
+    model.y_l = pyo.Var(model.L, domain=pyo.NonNegativeIntegers, bounds=(0, model.Nmax))
+
+    # --- Abgeleitete Größen ---
+
+    def typ_in_rule(model, t, r):
+        return sum(model.x[t, a] for a in A_in[r])
+    model.typ_in = pyo.Expression(model.T, model.R, rule=typ_in_rule)
+
+    def e_in_rule(model, r):
+        return sum(model.typ_in[t, r] for t in model.TE)
+    model.e_in = pyo.Expression(model.R, rule=e_in_rule)
+
+    def n_fahrzeuge_rule(model, t):
+        return sum(model.x[t, i, j, w] for (i, j, w) in model.A if w == 1)
+    model.n_fahrzeuge = pyo.Expression(model.T, rule=n_fahrzeuge_rule)
+
+    def tour_cons_rule(model, r):
+        return sum(model.typ_in[t, r] * model.dist[r] * model.avgEv_e[t] for t in model.TE)
+    model.tour_cons = pyo.Expression(model.R, rule=tour_cons_rule)
+
+    def geladen_rule(model, r):
+        return sum(model.real_p[r, l, z] * model.delta_t[tag_slot(z)] for l in model.L for z in fenster[r])
+    model.geladen = pyo.Expression(model.R, rule=geladen_rule)
+
+    def kapazitaet_rule(model, r):
+        return sum(model.typ_in[t, r] * model.soc_e[t] for t in model.TE)
+    model.kapazitaet = pyo.Expression(model.R, rule=kapazitaet_rule)
+
+    # Fahrzeug hat den Knoten i bis Slot z (einschließlich Abfahrt in z+1) verlassen
+    def abgefahren(model, i, z):
+        return sum(model.x[t, a] for t in model.T for a in A_out[i] if abfahrt(a[1], a[2]) <= z + 1)
+
+    # ========================================================================
+    # 3️⃣ NEBENBEDINGUNGEN
+    # ========================================================================
+
+    # --- Tour-Abdeckung und Flusserhaltung ---
+
+    def tour_cover_rule(model, r):
+        return sum(model.typ_in[t, r] for t in model.T) == 1
+    model.con_tour_cover = pyo.Constraint(model.R, rule=tour_cover_rule)
+
+    def flow_conservation_rule(model, t, r):
+        return model.typ_in[t, r] == sum(model.x[t, a] for a in A_out[r])
+    model.con_flow_conservation = pyo.Constraint(model.T, model.R, rule=flow_conservation_rule)
+
+    # --- Energie entlang der Kette ---
+
+    def soc_dep_upper_rule(model, r):
+        return model.soc_dep[r] <= model.kapazitaet[r]
+    model.con_soc_dep_upper = pyo.Constraint(model.R, rule=soc_dep_upper_rule)
+
+    def soc_arrival_rule(model, r):
+        return model.soc_dep[r] >= model.tour_cons[r]
+    model.con_soc_arrival = pyo.Constraint(model.R, rule=soc_arrival_rule)
+
+    def soc_charged_upper_rule(model, r):
+        return model.soc_dep[r] - model.tour_cons[r] + model.geladen[r] <= model.kapazitaet[r]
+    model.con_soc_charged_upper = pyo.Constraint(model.R, rule=soc_charged_upper_rule)
+
+    M_soc = max(model.soc_e[t] for t in model.TE)
+
+    def soc_chain_rule(model, i, j, w):
+        return (model.soc_dep[j] <= model.soc_dep[i] - model.tour_cons[i] + model.geladen[i] +
+                M_soc * (1 - sum(model.x[t, i, j, w] for t in model.TE)))
+    model.con_soc_chain = pyo.Constraint(model.A, rule=soc_chain_rule)
+
+    # --- Lade-Logik im Standfenster ---
+
+    def charging_requires_plug_rule(model, i, l, z):
+        return model.real_p[i, l, z] <= model.M_laden[l] * model.plug[i, l, z]
+    model.con_charging_requires_plug = pyo.Constraint(model.W, rule=charging_requires_plug_rule)
+
+    def charging_power_limit_rule(model, i, z):
+        return (sum(model.real_p[i, l, z] for l in model.L) <=
+                sum(model.typ_in[t, i] * model.max_p_e[t] for t in model.T))
+    model.con_charging_power_limit = pyo.Constraint(model.W_R, rule=charging_power_limit_rule)
+
+    def diesel_no_plug_rule(model, i, l, z):
+        return model.plug[i, l, z] <= model.e_in[i]
+    model.con_diesel_no_plug = pyo.Constraint(model.W, rule=diesel_no_plug_rule)
+
+    def unplug_before_departure_rule(model, i, z):
+        return sum(model.plug[i, l, z] for l in model.L) <= 1 - abgefahren(model, i, z)
+    model.con_unplug_before_departure = pyo.Constraint(model.W_R, rule=unplug_before_departure_rule)
+
+    def unplug_timing_rule(model, i, l, z):
+        if z + 1 not in fenster[i] or tag_slot(z) == n_z:
+            return pyo.Constraint.Skip
+        return model.plug[i, l, z] - model.plug[i, l, z+1] <= model.unplug_ok[tag_slot(z)]
+    model.con_unplug_timing = pyo.Constraint(model.W, rule=unplug_timing_rule)
+
+    # --- Ladesäulen-Kapazitäten (pro Tages-Slot) ---
+
+    def total_charger_limit_rule(model):
+        return sum(model.y_l[l] for l in model.L) <= model.Nmax
+    model.con_total_charger_limit = pyo.Constraint(rule=total_charger_limit_rule)
+
+    def charger_plug_capacity_rule(model, l, z):
+        if not W_slot[l, z]:
+            return pyo.Constraint.Skip
+        return sum(model.plug[i, l, zz] for (i, zz) in W_slot[l, z]) <= model.y_l[l] * model.cs_l[l]
+    model.con_charger_plug_capacity = pyo.Constraint(model.L, model.Z, rule=charger_plug_capacity_rule)
+
+    def charger_power_capacity_rule(model, l, z):
+        if not W_slot[l, z]:
+            return pyo.Constraint.Skip
+        return sum(model.real_p[i, l, zz] for (i, zz) in W_slot[l, z]) <= model.y_l[l] * model.max_p_l[l]
+    model.con_charger_power_capacity = pyo.Constraint(model.L, model.Z, rule=charger_power_capacity_rule)
+
+    # --- Netz und Speicher (gemeinsamer Block mit build_model) ---
+
+    def ladeleistung(model, z):
+        return sum(model.real_p[i, l, zz] for l in model.L for (i, zz) in W_slot[l, z])
+    baue_netz_und_speicher(model, erweiterungen, ladeleistung)
+
+    # ========================================================================
+    # 4️⃣ ZIELFUNKTION (wie objective_rule, Flotte über n_fahrzeuge)
+    # ========================================================================
+
+    def objective_rule(model):
+        C_trucks = sum(model.n_fahrzeuge[t] * (model.cap_d[t] + model.opx_d[t] + model.kfz_d[t]) for t in model.TD) + \
+                   sum(model.n_fahrzeuge[t] * (model.cap_e[t] + model.opx_e[t]) for t in model.TE)
+
+        C_chargers = sum(model.y_l[l] * (model.cap_l[l] + model.opx_l[l]) for l in model.L)
+
+        C_grid_trafo = 10000 * model.u
+
+        C_storage = (1 + model.opx_s) * (model.capP_s * model.p_s + model.capQ_s * model.q_s)
+
+        if erweiterungen:
+            C_diesel_var = model.jahresfaktor * sum(
+                model.typ_in[t, r] * ((model.c_m_d + model.c_co2_maut[t]) * model.mDist[r] +
+                                      model.c_diesel * (model.dist[r]) * model.avgDv_d[t])
+                for r in model.R for t in model.TD
+            )
+
+            C_electricity = model.c_gr + model.cPeak * model.p_peak + \
+                            model.jahresfaktor * sum(model.c_e[z] * model.p_grid[z] * model.delta_t[z] for z in model.Z)
+        else:
+            C_diesel_var = model.jahresfaktor * sum(
+                model.typ_in[t, r] * (model.c_m_d * model.mDist[r] +
+                                      model.c_diesel * (model.dist[r]) * model.avgDv_d[t])
+                for r in model.R for t in model.TD
+            )
+
+            C_electricity = model.c_gr + model.cPeak * model.p_peak + \
+                            model.jahresfaktor * model.c_e * sum(model.p_grid[z] * model.delta_t[z] for z in model.Z)
+
+        C_revenue = sum(model.n_fahrzeuge[t] * model.thg_e[t] for t in model.TE)
+
+        C_pv = model.capex_pv * model.p_pv_cap if erweiterungen else 0
+
+        return C_trucks + C_chargers + C_grid_trafo + C_storage + C_diesel_var + C_electricity - C_revenue + C_pv
+
+    model.obj = pyo.Objective(rule=objective_rule, sense=pyo.minimize)
+
+    return model
+
+
+def fahrzeugumlaeufe(model):
+    """Zerlegt den Fluss in Umläufe: Liste von (Typ, Touren in Fahrreihenfolge, Fahrzeuge)."""
+    nachfolger = {}
+    for t in model.T:
+        for (i, j, w) in model.A:
+            if pyo.value(model.x[t, i, j, w]) > 0.5:
+                nachfolger[i] = (j, w, t)
+
+    umlaeufe = []
+    besucht = set()
+    for start in sorted(model.R, key=lambda r: model.s_r[r]):
+        if start in besucht or start not in nachfolger:
+            continue
+        touren, fahrzeuge, r = [], 0, start
+        while r not in besucht:
+            besucht.add(r)
+            touren.append(r)
+            r, w, t = nachfolger[r]
+            fahrzeuge += w
+        umlaeufe.append((t, touren, fahrzeuge))
+    return umlaeufe
+
+
+def ergebnisse_ausgeben(model):
+    """Kompakte Auswertung der Fluss-Formulierung."""
+
+    dt = pyo.value(model.delta_t_basis)   # Stunden pro Slot
+
+    def zeit_format(z):
+        minuten = round((z - 1) * dt * 60)
+        return f"{minuten // 60:02d}:{minuten % 60:02d}"
+
+    print("\n" + "=" * 100)
+    print("OPTIMIERUNGSERGEBNISSE - FLUSS-FORMULIERUNG")
+    print("=" * 100)
+    print(f"Gesamtkosten (jährlich): {pyo.value(model.obj):,.2f} €")
+
+    print("\n" + "-" * 100)
+    print("🚗 FLOTTE")
+    print("-" * 100)
+    for t in model.T:
+        n = int(round(pyo.value(model.n_fahrzeuge[t])))
+        if n > 0:
+            print(f"  {t:<15} {n:>3}  [{'E' if t in model.TE else 'D'}]")
+
+    print("\n" + "-" * 100)
+    print("🚛 UMLÄUFE")
+    print("-" * 100)
+    for nr, (t, touren, fahrzeuge) in enumerate(fahrzeugumlaeufe(model), 1):
+        details = ", ".join(f"{r}({zeit_format(model.s_r[r])}-{zeit_format(model.e_r[r])})" for r in touren)
+        geladen = sum(pyo.value(model.geladen[r]) for r in touren)
+        print(f"  {nr:<3} {t:<15} {fahrzeuge} Fzg.  {details}" +
+              (f"  | geladen {geladen:.1f} kWh/Tag" if t in model.TE else ""))
+
+    print("\n" + "-" * 100)
+    print("⚡ LADEINFRASTRUKTUR / 🔌 NETZ & SPEICHER")
+    print("-" * 100)
+    for l in model.L:
+        n = int(round(pyo.value(model.y_l[l])))
+        if n > 0:
+            print(f"  {l:<20} {n} Säule(n), {n * model.cs_l[l]} Ladepunkte, max {n * model.max_p_l[l]} kW")
+    print(f"  Trafo-Erweiterung:   {'JA' if pyo.value(model.u) > 0.5 else 'NEIN'}")
+    print(f"  Spitzenlast:         {pyo.value(model.p_peak):.2f} kW")
+    print(f"  Speicher:            {pyo.value(model.p_s):.1f} kW / {pyo.value(model.q_s):.1f} kWh")
+    if hasattr(model, 'p_pv_cap'):
+        print(f"  PV-Anlage:           {pyo.value(model.p_pv_cap):.1f} kWp")
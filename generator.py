@@ -0,0 +1,105 @@
+# ============================================================================
+# SYNTHETISCHE INSTANZEN IM FORMAT VON full.csv (SKALIERUNGSSTUDIEN)
+# Aufruf: python generator.py --touren 500 [--seed 0] [--ueberlappung 1.0]
+#                             [--dist 80 300] [--maut 0.3 0.9] [--raster 15]
+#                             [--katalog full.csv] [--ausgabe instanz_500_0.csv]
+#
+# Säulen-, E-LKW- und Diesel-LKW-Abschnitt werden aus dem Katalog (einer
+# full.csv-Datei) übernommen, der Tourenabschnitt wird erzeugt:
+#   - jede Tour gehört zu einer Schicht aus SCHICHTEN (Anteil, mittlere
+#     Startzeit und Streuung in Stunden, Dauerbereich in Stunden), wie in der
+#     Beispielinstanz Tagestouren ab ca. 06:30 und Abendtouren ab ca. 17:30;
+#   - ueberlappung skaliert die Dichte: die Streuung der Startzeiten wird durch
+#     ueberlappung geteilt (größer = mehr gleichzeitige Touren, mehr LKW);
+#   - Zeiten liegen auf einem Raster von raster Minuten und enden spätestens
+#     im letzten Rasterschritt vor Mitternacht (Touren über Mitternacht
+#     unterstützt das Modell nicht);
+#   - Strecke gleichverteilt in dist, Mautstrecke als Anteil maut davon.
+# Gleicher seed und gleiche Parameter ergeben dieselbe Datei.
+# ============================================================================
+
+import argparse
+import os
+
+import numpy as np
+
+from instanz import lade_instanz
+
+KATALOG_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'full.csv')
+
+# Späteste Ankunft in Minuten nach Mitternacht (auf das Raster abgerundet)
+TAGESENDE = 24 * 60 - 1
+
+# (Anteil, mittlere Startzeit h, Streuung h, kürzeste Dauer h, längste Dauer h)
+SCHICHTEN = {
+    'Tag': (0.7, 6.5, 0.6, 7.0, 10.5),
+    'Abend': (0.3, 17.5, 0.8, 3.5, 5.5),
+}
+
+
+def katalog_abschnitte(pfad):
+    """Säulen-, E-LKW- und Diesel-LKW-Abschnitt von pfad als Textblöcke (unverändert)."""
+    lade_instanz(pfad)   # prüft, dass alle Abschnitte vorhanden sind
+    with open(pfad, encoding='utf-8') as f:
+        bloecke = [block.strip('\n') for block in f.read().replace('\r\n', '\n').split('\n\n')]
+    return [block for block in bloecke if block and not block.startswith('route_id')]
+
+
+def erzeuge_touren(anzahl, seed=0, ueberlappung=1.0, dist=(80, 300), maut=(0.3, 0.9), raster=15,
+                   schichten=SCHICHTEN):
+    """Zeilen des Tourenabschnitts: (route_id, route_name, Strecke, Mautstrecke, Start, Ende)."""
+    rng = np.random.default_rng(seed)
+    namen = list(schichten)
+    anteile = np.array([schichten[n][0] for n in namen], dtype=float)
+    schicht = rng.choice(len(namen), size=anzahl, p=anteile / anteile.sum())
+    _, mittel, streuung, dauer_min, dauer_max = (np.array([schichten[n][i] for n in namen])[schicht]
+                                                  for i in range(5))
+
+    dauer = rng.uniform(dauer_min, dauer_max) * 60
+    start = rng.normal(mittel, streuung / ueberlappung) * 60
+    tagesende = TAGESENDE // raster * raster
+    start = np.clip(start, 0, tagesende - dauer)
+    start = np.floor(start / raster) * raster
+    ende = np.minimum(start + np.maximum(np.round(dauer / raster), 1) * raster, tagesende)
+
+    strecke = rng.integers(dist[0], dist[1] + 1, size=anzahl)
+    mautstrecke = np.round(strecke * rng.uniform(maut[0], maut[1], size=anzahl)).astype(np.int64)
+
+    def uhrzeit(minuten):
+        return f"{int(minuten) // 60:02d}:{int(minuten) % 60:02d}"
+
+    return [(f"g{i + 1}", f"Synthetisch-{namen[schicht[i]]}", int(strecke[i]), int(mautstrecke[i]),
+             uhrzeit(start[i]), uhrzeit(ende[i])) for i in range(anzahl)]
+
+
+def schreibe_instanz(pfad, anzahl, seed=0, katalog=KATALOG_CSV, **parameter):
+    """Schreibt eine full.csv-kompatible Instanz mit anzahl Touren nach pfad.
+
+    parameter werden an erzeuge_touren weitergereicht.
+    """
+    touren = erzeuge_touren(anzahl, seed, **parameter)
+    zeilen = ["route_id;route_name;distance_total;distance_toll;starttime;endtime"]
+    zeilen += [";".join(str(wert) for wert in tour) for tour in touren]
+    with open(pfad, 'w', encoding='utf-8', newline='\n') as f:
+        f.write("\n\n".join(katalog_abschnitte(katalog) + ["\n".join(zeilen)]) + "\n")
+    return pfad
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetische Instanz im Format von full.csv")
+    parser.add_argument('--touren', type=int, required=True, help="Anzahl Touren")
+    parser.add_argument('--seed', type=int, default=0, help="Zufallsstartwert")
+    parser.add_argument('--ueberlappung', type=float, default=1.0, help="Dichte gleichzeitiger Touren (1 = wie Beispiel)")
+    parser.add_argument('--dist', type=int, nargs=2, default=[80, 300], help="Streckenbereich in km")
+    parser.add_argument('--maut', type=float, nargs=2, default=[0.3, 0.9], help="Bereich des Mautanteils")
+    parser.add_argument('--raster', type=int, default=15, help="Zeitraster der Start-/Endzeiten in Minuten")
+    parser.add_argument('--katalog', default=KATALOG_CSV, help="full.csv mit Säulen- und LKW-Katalog")
+    parser.add_argument('--ausgabe', help="Zieldatei (Standard: instanz_<touren>_<seed>.csv)")
+    args = parser.parse_args()
+
+    pfad = args.ausgabe or f"instanz_{args.touren}_{args.seed}.csv"
+    schreibe_instanz(pfad, args.touren, args.seed, args.katalog, ueberlappung=args.ueberlappung,
+                     dist=tuple(args.dist), maut=tuple(args.maut), raster=args.raster)
+    instanz = lade_instanz(pfad)
+    print(f"{pfad}: {len(instanz.touren)} Touren, {len(instanz.saeulen)} Säulentypen, "
+          f"{len(instanz.e_lkw)} E-LKW-Typen, {len(instanz.diesel_lkw)} Diesel-LKW-Typen")
@@ -0,0 +1,121 @@
+# ============================================================================
+# INSTANZDATEN AUS full.csv (SÄULEN, E-LKW, DIESEL-LKW, TOUREN)
+# Aufruf: python instanz.py [pfad.csv]
+#
+# full.csv besteht aus durch Leerzeilen getrennten Abschnitten mit eigener
+# Kopfzeile (Trennzeichen ';'); der Abschnitt wird an seiner Kopfzeile erkannt:
+#   charger_model;capex_yearly;opex_yearly;max_power;charging_spots
+#   truck_model;...;avg_energy_kWh_per_100km;...;soc_max_kWh   (E-LKW)
+#   truck_model;...;avg_diesel_per_100km;kfz_yearly             (Diesel-LKW)
+#   route_id;route_name;distance_total;distance_toll;starttime;endtime
+# Jeder Abschnitt wird zu NumPy-Spalten (ganzzahlig, wenn alle Werte ganz
+# sind) plus Namensliste und Index Name -> Zeile. build_model liest daraus
+# Mengen und Parameter; eine andere Instanz ist nur ein anderer Pfad.
+# ============================================================================
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Kopfzeilen-Erkennung: Abschnitt -> Spalte, die nur in diesem Abschnitt vorkommt
+ABSCHNITTE = {
+    'saeulen': 'charger_model',
+    'e_lkw': 'avg_energy_kWh_per_100km',
+    'diesel_lkw': 'avg_diesel_per_100km',
+    'touren': 'route_id',
+}
+
+# Zeitspalten im Format HH:MM, als Minuten nach Mitternacht gespeichert
+ZEITSPALTEN = ('starttime', 'endtime')
+
+# Bereits gelesene Dateien: (Pfad, Änderungszeit) -> Instanz
+_geladen = {}
+
+
+class Tabelle:
+    """Ein Abschnitt von full.csv: namen (erste Spalte), index und je Spalte ein NumPy-Array."""
+
+    def __init__(self, kopf, zeilen):
+        self.namen = [zeile[0] for zeile in zeilen]
+        self.index = {name: i for i, name in enumerate(self.namen)}
+        if len(self.index) < len(self.namen):
+            raise ValueError(f"Abschnitt {kopf[0]}: doppelte Namen")
+        spalten = list(zip(*zeilen)) if zeilen else [()] * len(kopf)
+        self.spalten = {name: spalte(name, werte) for name, werte in zip(kopf[1:], spalten[1:])}
+
+    def __len__(self):
+        return len(self.namen)
+
+    def __getitem__(self, spaltenname):
+        return self.spalten[spaltenname]
+
+    def als_dict(self, spaltenname, faktor=1):
+        """{Name: Wert} mit Python-Zahlen (für pyo.Param initialize)."""
+        werte = self.spalten[spaltenname]
+        return dict(zip(self.namen, (werte / faktor if faktor != 1 else werte).tolist()))
+
+
+def spalte(name, werte):
+    """Textwerte einer Spalte als NumPy-Array: Zeiten in Minuten, sonst Zahlen, sonst Text."""
+    if name in ZEITSPALTEN:
+        return np.array([int(w[:-3]) * 60 + int(w[-2:]) for w in werte], dtype=np.int64)
+    try:
+        zahlen = np.array(werte, dtype=np.float64)
+    except ValueError:
+        return np.array(werte, dtype=str)
+    if np.all(zahlen == np.round(zahlen)):
+        return zahlen.astype(np.int64)
+    return zahlen
+
+
+class Instanz:
+    """Alle Abschnitte einer full.csv-Datei als Tabellen (saeulen, e_lkw, diesel_lkw, touren)."""
+
+    def __init__(self, pfad):
+        self.pfad = pfad
+        with open(pfad, encoding='utf-8') as f:
+            text = f.read()
+        bloecke = [[]]
+        for zeile in text.splitlines():
+            if zeile.strip(' ;'):
+                bloecke[-1].append(zeile.rstrip(';').split(';'))
+            elif bloecke[-1]:
+                bloecke.append([])   # Leerzeile beendet einen Abschnitt
+        tabellen = {}
+        for zeilen in bloecke:
+            if not zeilen:
+                continue
+            kopf = zeilen[0]
+            art = next((art for art, erkennung in ABSCHNITTE.items() if erkennung in kopf), None)
+            if art is None:
+                raise ValueError(f"{pfad}: unbekannter Abschnitt mit Kopf {';'.join(kopf)}")
+            tabellen[art] = Tabelle(kopf, zeilen[1:])
+        fehlend = [art for art in ABSCHNITTE if art not in tabellen]
+        if fehlend:
+            raise ValueError(f"{pfad}: Abschnitte fehlen: {', '.join(fehlend)}")
+        self.saeulen = tabellen['saeulen']
+        self.e_lkw = tabellen['e_lkw']
+        self.diesel_lkw = tabellen['diesel_lkw']
+        self.touren = tabellen['touren']
+
+
+def lade_instanz(pfad):
+    """Instanz aus pfad; eine unveränderte Datei wird nur einmal gelesen."""
+    schluessel = (os.path.abspath(pfad), os.path.getmtime(pfad))
+    if schluessel not in _geladen:
+        _geladen[schluessel] = Instanz(pfad)
+    return _geladen[schluessel]
+
+
+if __name__ == "__main__":
+    pfad = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'full.csv')
+    start = time.perf_counter()
+    instanz = Instanz(pfad)
+    sekunden = time.perf_counter() - start
+    print(f"{pfad}: gelesen in {sekunden * 1000:.1f} ms")
+    for art in ABSCHNITTE:
+        tabelle = getattr(instanz, art)
+        print(f"  {art:<12} {len(tabelle):>7} Zeilen | " +
+              ", ".join(f"{name} ({werte.dtype})" for name, werte in tabelle.spalten.items()))
@@ -0,0 +1,218 @@
+# ============================================================================
+# LAGRANGE-RELAXIERUNG DER LKW-KOPPLUNG: UNTERE SCHRANKE UND REPARIERTER PLAN
+# Aufruf: python lagrange.py [--iterationen 50] [--zeitlimit 600]
+#                            [--prozesse 4] [--erweiterungen]
+#
+# Relaxiert (mit Multiplikatoren in die Zielfunktion gezogen):
+#   con_charger_assign_capacity, con_charger_plug_capacity,
+#   con_charger_power_capacity, con_grid_balance   (Kopplung im Zeitslot)
+#   con_tour_assignment                            (Kopplung über die Touren)
+# Danach zerfällt build_model in unabhängige Teilprobleme:
+#   - ein LKW (build_model mit anzahl_lkw=1), je LKW-Typ getrennt gelöst;
+#     alle |K| LKW (flottengroesse) sind gleich, der Wert zählt also |K|-mal,
+#   - Netz/Speicher/PV/Säulen (ohne LKW).
+# Die Teilprobleme laufen parallel im Prozess-Pool; die Multiplikatoren folgen
+# Subgradienten-Schritten nach Polyak. Jeder Lagrange-Wert (mit den
+# Solver-Schranken der Teilprobleme) ist eine gültige untere Schranke.
+# Startwerte: Tour-Duale der Spaltengenerierung und Strompreis je Slot.
+# Reparatur: die LKW-Lösungen der Iterationen sind Dienste; ganzzahliger
+# Master über Dienst-Pool (höchstens |K| Dienste, damit Schranke und Plan
+# dasselbe Modell betreffen) und exakte Bewertung wie in spaltengenerierung.py.
+# Außerhalb der Teilprobleme werden nur Mengen und Parameter gebraucht
+# (baue_sets_und_parameter), kein K-indiziertes Gesamtmodell.
+# ============================================================================
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pyomo.environ as pyo
+from pyomo.core.expr.visitor import identify_variables
+
+from modell import build_model, baue_sets_und_parameter, flottengroesse, waehle_solver, AUFLOESUNG
+from spaltengenerierung import generiere_spalten, waehle_dienste, bewerte
+from mehrstufig import hat_loesung
+
+# Relaxierte Nebenbedingungen
+GEKOPPELT = ('con_tour_assignment', 'con_charger_assign_capacity', 'con_charger_plug_capacity',
+             'con_charger_power_capacity', 'con_grid_balance')
+
+# Variablen des Netz-Teilproblems; alle übrigen gehören zum LKW
+NETZ = ('y_l', 'u', 'p_s', 'q_s', 'p_l_s', 'p_e_s', 'soc_s', 'mode_s', 'p_grid', 'p_peak', 'p_pv_cap')
+
+# Teilprobleme je Prozess, werden nur einmal aufgebaut
+_teilprobleme = {}
+
+
+def baue_teilproblem(teil, erweiterungen=False, aufloesung=AUFLOESUNG):
+    """Ein-LKW-Modell mit fixiertem Typ teil oder Netz-Teilproblem (teil='netz')."""
+    m = build_model(erweiterungen=erweiterungen, aufloesung=aufloesung, anzahl_lkw=1)
+    for name in GEKOPPELT:
+        m.component(name).deactivate()
+    for var in m.component_objects(pyo.Var):
+        if (var.local_name in NETZ) != (teil == 'netz'):
+            var.fix(0)
+    if teil != 'netz':
+        for t in m.T:
+            m.type_assignment[1, t].fix(1 if t == teil else 0)
+    for con in m.component_data_objects(pyo.Constraint, active=True):
+        if all(v.fixed for v in identify_variables(con.body)):
+            con.deactivate()
+
+    m.lg_tour = pyo.Param(m.R, initialize=0, mutable=True)
+    m.lg_assign = pyo.Param(m.L, m.Z, initialize=0, mutable=True)
+    m.lg_plug = pyo.Param(m.L, m.Z, initialize=0, mutable=True)
+    m.lg_power = pyo.Param(m.L, m.Z, initialize=0, mutable=True)
+    m.lg_netz = pyo.Param(m.Z, initialize=0, mutable=True)
+
+    if teil == 'netz':
+        p_pv = (lambda z: m.p_pv[z]) if erweiterungen else (lambda z: 0)
+        lagrange = (
+            -sum(m.y_l[l] * m.cs_l[l] * (m.lg_assign[l, z] + m.lg_plug[l, z]) +
+                 m.y_l[l] * m.max_p_l[l] * m.lg_power[l, z] for l in m.L for z in m.Z) +
+            sum(m.lg_netz[z] * (m.p_l_s[z] - m.p_e_s[z] - p_pv(z) - m.p_grid[z]) for z in m.Z))
+        m.obj_lagrange = pyo.Objective(expr=m.obj.expr + lagrange, sense=pyo.minimize)
+    else:
+        lagrange = (
+            -sum(m.lg_tour[r] * m.a[r, 1] for r in m.R) +
+            sum(m.lg_assign[l, z] * m.assign[1, l, z] + m.lg_plug[l, z] * m.plug[1, l, z] +
+                (m.lg_power[l, z] + m.lg_netz[z]) * m.real_p[1, l, z] for l in m.L for z in m.Z))
+        m.obj_lagrange = pyo.Objective(expr=m.obj.expr - m.c_gr + lagrange, sense=pyo.minimize)
+    m.obj.deactivate()
+    return m
+
+
+def loese_teil(aufgabe):
+    """Löst ein Teilproblem für gegebene Multiplikatoren (läuft im Worker-Prozess)."""
+    teil, lam, erweiterungen, aufloesung, zeitlimit = aufgabe
+    schluessel = (teil, erweiterungen, aufloesung, zeitlimit)
+    if schluessel not in _teilprobleme:
+        _teilprobleme[schluessel] = (baue_teilproblem(teil, erweiterungen, aufloesung),
+                                     waehle_solver(zeitlimit)[0])
+    m, solver = _teilprobleme[schluessel]
+
+    for name in ('tour', 'assign', 'plug', 'power', 'netz'):
+        param = m.component('lg_' + name)
+        for index, wert in lam[name].items():
+            param[index] = wert
+    results = solver.solve(m)
+    wert = pyo.value(m.obj_lagrange)
+    schranke = getattr(results.problem, 'lower_bound', None)
+    if schranke is None or not abs(schranke) < float('inf'):
+        schranke = wert
+
+    ergebnis = {'teil': teil, 'wert': wert, 'schranke': min(schranke, wert)}
+    if teil == 'netz':
+        ergebnis['y'] = {l: m.y_l[l].value for l in m.L}
+        ergebnis['bilanz'] = {z: m.p_l_s[z].value - m.p_e_s[z].value -
+                              (pyo.value(m.p_pv[z]) if erweiterungen else 0) - m.p_grid[z].value for z in m.Z}
+    else:
+        ergebnis['touren'] = tuple(r for r in m.R if m.a[r, 1].value > 0.5)
+        ergebnis['assign'] = {(l, z): m.assign[1, l, z].value for l in m.L for z in m.Z}
+        ergebnis['plug'] = {(l, z): m.plug[1, l, z].value for l in m.L for z in m.Z}
+        ergebnis['real_p'] = {(l, z): m.real_p[1, l, z].value for l in m.L for z in m.Z}
+    return ergebnis
+
+
+def start_multiplikatoren(basis, tour_duale, erweiterungen=False):
+    """Tour-Duale der Spaltengenerierung, Netz-Multiplikator = Strompreis der Leistung im Slot."""
+    def c_e(z):
+        return pyo.value(basis.c_e[z] if erweiterungen else basis.c_e)
+    null = {(l, z): 0.0 for l in basis.L for z in basis.Z}
+    return {
+        'tour': dict(tour_duale),
+        'assign': dict(null), 'plug': dict(null), 'power': dict(null),
+        'netz': {z: pyo.value(basis.jahresfaktor) * c_e(z) * pyo.value(basis.delta_t[z]) for z in basis.Z},
+    }
+
+
+def subgradient(basis, lkw, netz, n):
+    """Verletzung der relaxierten Nebenbedingungen; alle n LKW wählen die Lösung lkw."""
+    return {
+        'tour': {r: 1 - n * (r in lkw['touren']) for r in basis.R},
+        'assign': {(l, z): n * lkw['assign'][l, z] - netz['y'][l] * basis.cs_l[l] for l in basis.L for z in basis.Z},
+        'plug': {(l, z): n * lkw['plug'][l, z] - netz['y'][l] * basis.cs_l[l] for l in basis.L for z in basis.Z},
+        'power': {(l, z): n * lkw['real_p'][l, z] - netz['y'][l] * basis.max_p_l[l] for l in basis.L for z in basis.Z},
+        'netz': {z: n * sum(lkw['real_p'][l, z] for l in basis.L) + netz['bilanz'][z] for z in basis.Z},
+    }
+
+
+def loese_lagrange(iterationen=50, zeitlimit=600, prozesse=4, schritt=1.0, erweiterungen=False,
+                   aufloesung=AUFLOESUNG):
+    """Subgradientenverfahren mit Reparatur; gibt (Modell, untere Schranke, obere Schranke) zurück.
+
+    zeitlimit gilt für Master, Bewertung und jedes Teilproblem.
+    """
+    basis = pyo.ConcreteModel(name="Lagrange_Daten")
+    baue_sets_und_parameter(basis, erweiterungen, aufloesung=aufloesung)
+    n_lkw = flottengroesse(basis)
+    dienste, _, duals = generiere_spalten(basis, erweiterungen=erweiterungen, aufloesung=aufloesung,
+                                          max_dienste=n_lkw)
+    bekannt = set(dienste)
+    lam = start_multiplikatoren(basis, duals['touren'], erweiterungen)
+
+    # Obere Schranke für die Schrittweite: Plan aus den Diensten der Spaltengenerierung
+    gewaehlt, y = waehle_dienste(basis, dienste, zeitlimit, erweiterungen, max_dienste=n_lkw)
+    bester = bewerte(gewaehlt, y, zeitlimit, erweiterungen, aufloesung)
+    obere = pyo.value(bester.obj) if hat_loesung(bester) else None
+
+    untere, ohne_besserung = -float('inf'), 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=prozesse) as pool:
+        for it in range(1, iterationen + 1):
+            aufgaben = [(teil, lam, erweiterungen, aufloesung, zeitlimit) for teil in list(basis.T) + ['netz']]
+            ergebnisse = list(pool.map(loese_teil, aufgaben))
+            lkw_teile, netz = ergebnisse[:-1], ergebnisse[-1]
+
+            lkw = min(lkw_teile, key=lambda e: e['wert'])
+            wert = (sum(lam['tour'].values()) + n_lkw * min(e['schranke'] for e in lkw_teile) +
+                    netz['schranke'])
+            if wert > untere + 1e-6:
+                untere, ohne_besserung = wert, 0
+            else:
+                ohne_besserung += 1
+                if ohne_besserung >= 5:
+                    schritt, ohne_besserung = schritt / 2, 0
+
+            for e in lkw_teile:
+                if e['touren'] and (e['teil'], e['touren']) not in bekannt:
+                    dienste.append((e['teil'], e['touren']))
+                    bekannt.add((e['teil'], e['touren']))
+
+            # Polyak-Schritt Richtung Zielwert (beste Lösung oder 5 % über der Schranke)
+            g = subgradient(basis, lkw, netz, n_lkw)
+            norm = sum(wert_g ** 2 for teil in g.values() for wert_g in teil.values())
+            ziel = obere if obere is not None else wert + 0.05 * abs(wert)
+            print(f"Iteration {it}: L = {wert:,.2f} € | beste Schranke {untere:,.2f} € | "
+                  f"Schritt {schritt:g} | {time.perf_counter() - start:.0f}s")
+            if norm < 1e-9:
+                break
+            t_k = schritt * (ziel - wert) / norm
+            for name, teil in g.items():
+                for index, wert_g in teil.items():
+                    neu = lam[name][index] + t_k * wert_g
+                    lam[name][index] = neu if name in ('tour', 'netz') else max(0.0, neu)
+
+    print("\n>>> Reparatur: ganzzahliger Master über alle Dienste")
+    gewaehlt, y = waehle_dienste(basis, dienste, zeitlimit, erweiterungen, max_dienste=n_lkw)
+    model = bewerte(gewaehlt, y, zeitlimit, erweiterungen, aufloesung)
+    if hat_loesung(model) and (obere is None or pyo.value(model.obj) < obere):
+        bester, obere = model, pyo.value(model.obj)
+    return bester, untere, obere
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lagrange-Relaxierung der Säulen- und Netzkopplung")
+    parser.add_argument('--iterationen', type=int, default=50)
+    parser.add_argument('--zeitlimit', type=int, default=600,
+                        help="Zeitlimit für Master, Bewertung und Teilprobleme in Sekunden")
+    parser.add_argument('--prozesse', type=int, default=4, help="parallele Teilprobleme")
+    parser.add_argument('--aufloesung', type=int, default=AUFLOESUNG)
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    args = parser.parse_args()
+
+    model, untere, obere = loese_lagrange(args.iterationen, args.zeitlimit, args.prozesse,
+                                          erweiterungen=args.erweiterungen, aufloesung=args.aufloesung)
+    print(f"\nUntere Schranke (Lagrange): {untere:,.2f} €")
+    if obere is not None:
+        print(f"Reparierter Plan:           {obere:,.2f} € | Lücke: {(obere - untere) / abs(obere) * 100:.2f}%")
@@ -0,0 +1,193 @@
+# ============================================================================
+# LARGE NEIGHBOURHOOD SEARCH (LNS) AUF DEM LKW-MODELL
+# Aufruf: python lns.py [--zeitbudget 300] [--stagnation 25] [--teilzeit 20]
+#                       [--seed 0] [--verlauf lns.csv] [--erweiterungen]
+#
+# Start ist die konstruktive Lösung aus startloesung.py. Je Iteration wird
+# eine Nachbarschaft freigegeben, alle übrigen ganzzahligen Variablen werden
+# auf die beste bekannte Lösung fixiert (kontinuierliche bleiben immer frei),
+# und das kleine Teil-MIP mit MIP-Start und kurzem Zeitlimit gelöst:
+#   'lkw':     Touren, Typ und Laden einiger LKW (alle K-indizierten
+#              Variablen dieser LKW, Touren dürfen zwischen ihnen wechseln)
+#   'fenster': Lade- und Speicherbetrieb in einem Zeitfenster
+#   'saeulen': Säulenmix y_l, Netzausbau u und der gesamte Ladebetrieb
+# Nachbarschaften mit Verbesserung werden häufiger gewählt. Abbruch nach
+# zeitbudget Sekunden (jedes Teil-MIP bekommt höchstens die Restzeit) oder
+# stagnation Iterationen ohne Verbesserung; der
+# Verlauf (Iteration, Nachbarschaft, Zielwert, Zeit) wird mitgeschrieben.
+# ============================================================================
+
+import argparse
+import csv
+import random
+import time
+
+import pyomo.environ as pyo
+
+from modell import build_model, waehle_solver, ZEITLIMIT_OPTION
+from startloesung import startloesung
+from benders import unzulaessig
+
+NACHBARSCHAFTEN = ('lkw', 'fenster', 'saeulen')
+
+# Kürzeste sinnvolle Restzeit für ein Teil-MIP in Sekunden
+MIN_TEILZEIT = 1
+
+# Lade- und Speicherbetrieb (frei in 'fenster' und 'saeulen')
+BETRIEB = ('assign', 'plug', 'mode_s')
+
+
+def position(var, menge):
+    """Stelle von menge im Index von var oder None."""
+    if not var.is_indexed():
+        return None
+    mengen = list(var.index_set().subsets(expand_all_set_operators=False))
+    for i, m in enumerate(mengen):
+        if m is menge:
+            return i
+    return None
+
+
+def eintrag(index, i):
+    return (index if isinstance(index, tuple) else (index,))[i]
+
+
+def ganzzahlige(model):
+    """Alle ganzzahligen, nicht schon im Modellaufbau fixierten Variablen als {(Name, Index): VarData}."""
+    ergebnis = {}
+    for var in model.component_objects(pyo.Var):
+        for index, v in var.items():
+            if v.is_integer() and not v.fixed:
+                ergebnis[var.local_name, index] = v
+    return ergebnis
+
+
+def nachbarschaft(model, art, zufall, anzahl_lkw=3, fensterbreite=None):
+    """Menge der freigegebenen (Name, Index) für die Nachbarschaft art."""
+    frei = set()
+    if art == 'lkw':
+        benutzt = [k for k in model.K if model.truck_used[k].value > 0.5]
+        lkw = set(zufall.sample(benutzt, min(anzahl_lkw, len(benutzt))))
+        for var in model.component_objects(pyo.Var):
+            i = position(var, model.K)
+            if i is not None:
+                frei |= {(var.local_name, index) for index in var if eintrag(index, i) in lkw}
+    elif art == 'fenster':
+        Z = list(model.Z)
+        breite = fensterbreite or max(1, len(Z) // 12)
+        erster = zufall.randrange(len(Z))
+        fenster = set(Z[erster:erster + breite])
+        for name in BETRIEB:
+            var = model.component(name)
+            i = position(var, model.Z)
+            frei |= {(name, index) for index in var if eintrag(index, i) in fenster}
+    else:
+        for name in BETRIEB + ('y_l', 'u'):
+            frei |= {(name, index) for index in model.component(name)}
+    return frei
+
+
+def festhalten(variablen, frei):
+    """Fixiert alle Variablen außerhalb von frei auf ihren (gerundeten) aktuellen Wert."""
+    for schluessel, v in variablen.items():
+        if schluessel in frei:
+            v.unfix()
+        else:
+            v.fix(round(v.value))
+
+
+def sichern(model):
+    return [(v, v.value) for v in model.component_data_objects(pyo.Var)]
+
+
+def zurueckschreiben(werte):
+    for v, wert in werte:
+        v.set_value(wert, skip_validation=True)
+
+
+def loese_lns(zeitbudget=300, stagnation=25, teilzeit=20, seed=0, erweiterungen=False, **optionen):
+    """LNS ab der konstruktiven Startlösung; gibt (Modell mit bester Lösung, Verlauf) zurück.
+
+    optionen werden an build_model weitergereicht.
+    """
+    start = time.perf_counter()
+    zufall = random.Random(seed)
+    model = build_model(erweiterungen=erweiterungen, **optionen)
+    bester = startloesung(model, erweiterungen)
+    if bester is None:
+        raise RuntimeError("Keine Startlösung: Touren passen nicht auf die LKW-Flotte K")
+    variablen = ganzzahlige(model)
+    beste_werte = sichern(model)
+    verlauf = [{'iteration': 0, 'nachbarschaft': 'start', 'zielwert': bester,
+                'sekunden': time.perf_counter() - start, 'verbessert': True}]
+    print(f"Startlösung: {bester:,.2f} €")
+
+    solver, solver_name = waehle_solver(teilzeit)
+    gewicht = {art: 1.0 for art in NACHBARSCHAFTEN}
+    ohne_verbesserung = 0
+    it = 0
+    while ohne_verbesserung < stagnation:
+        rest = zeitbudget - (time.perf_counter() - start)
+        if rest < MIN_TEILZEIT:
+            break
+        if solver_name in ZEITLIMIT_OPTION:
+            solver.options[ZEITLIMIT_OPTION[solver_name]] = min(teilzeit, rest)
+        it += 1
+        art = zufall.choices(NACHBARSCHAFTEN, weights=[gewicht[a] for a in NACHBARSCHAFTEN])[0]
+        festhalten(variablen, nachbarschaft(model, art, zufall))
+
+        if solver.warm_start_capable():
+            results = solver.solve(model, tee=False, warmstart=True, load_solutions=False)
+        else:
+            results = solver.solve(model, tee=False, load_solutions=False)
+        wert = None
+        if not unzulaessig(results) and len(results.solution) > 0:
+            model.solutions.load_from(results)
+            wert = pyo.value(model.obj)
+
+        verbessert = wert is not None and wert < bester - 1e-6
+        if verbessert:
+            bester = wert
+            beste_werte = sichern(model)
+            gewicht[art] += 1.0
+            ohne_verbesserung = 0
+        else:
+            zurueckschreiben(beste_werte)
+            gewicht[art] = max(0.2, gewicht[art] * 0.9)
+            ohne_verbesserung += 1
+        verlauf.append({'iteration': it, 'nachbarschaft': art, 'zielwert': bester,
+                        'sekunden': time.perf_counter() - start, 'verbessert': verbessert})
+        print(f"Iteration {it} ({art}): {'neu ' if verbessert else ''}beste {bester:,.2f} € | "
+              f"{verlauf[-1]['sekunden']:.0f}s")
+
+    for v in variablen.values():
+        v.unfix()
+    zurueckschreiben(beste_werte)
+    return model, verlauf
+
+
+def verlauf_schreiben(verlauf, pfad):
+    with open(pfad, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(verlauf[0]), delimiter=';')
+        writer.writeheader()
+        writer.writerows(verlauf)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Large Neighbourhood Search auf dem LKW-Modell")
+    parser.add_argument('--zeitbudget', type=int, default=300, help="Gesamtzeit in Sekunden")
+    parser.add_argument('--stagnation', type=int, default=25, help="Iterationen ohne Verbesserung bis Abbruch")
+    parser.add_argument('--teilzeit', type=int, default=20, help="Zeitlimit je Teil-MIP in Sekunden")
+    parser.add_argument('--seed', type=int, default=0, help="Zufallsstartwert der Nachbarschaftswahl")
+    parser.add_argument('--verlauf', help="Lösungsverlauf als CSV schreiben")
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    args = parser.parse_args()
+
+    model, verlauf = loese_lns(args.zeitbudget, args.stagnation, args.teilzeit, args.seed, args.erweiterungen)
+    if args.verlauf:
+        verlauf_schreiben(verlauf, args.verlauf)
+    erfolge = {art: sum(1 for e in verlauf if e['nachbarschaft'] == art and e['verbessert'])
+               for art in NACHBARSCHAFTEN}
+    print(f"\nBeste Lösung: {pyo.value(model.obj):,.2f} € nach {len(verlauf) - 1} Iterationen "
+          f"und {verlauf[-1]['sekunden']:.0f}s")
+    print("Verbesserungen je Nachbarschaft: " + ", ".join(f"{art}={n}" for art, n in erfolge.items()))
@@ -0,0 +1,119 @@
+# ============================================================================
+# LÖSUNGSSPEICHER: LÖSUNG + MODELLDATEN ALS NPZ, BERICHTE OHNE NEU ZU LÖSEN
+# Aufruf: python loesungsspeicher.py loesung_main.npz
+#
+# speichere_loesung schreibt nach dem Lösen eine komprimierte NPZ-Datei mit
+# einer Spalte je Indexposition und einer Wertspalte:
+#   v/<Variable>/0, v/<Variable>/1, ..., v/<Variable>/wert   nur Werte != 0
+#   p/<Parameter>/...  und  e/<Ausdruck>/...                 alle Einträge
+#   s/<Menge>/0, ...                                          Elemente in Reihenfolge
+#   obj, lower_bound, upper_bound
+# lade_loesung liefert daraus ein Objekt mit denselben Attributen wie das
+# Pyomo-Modell (model.R, model.dist[r], model.a[r, k], model.obj, ...), auf
+# dem die Berichte (TEIL A-E) in main.py und Teilaufgabe4.py unverändert
+# laufen; nicht gespeicherte Variableneinträge sind 0.
+# ============================================================================
+
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pyomo.environ as pyo
+
+ORDNER = os.path.dirname(os.path.abspath(__file__))
+
+# Beträge darunter gelten als 0 und werden nicht gespeichert
+NULL = 1e-9
+
+
+def loesungsdatei(name):
+    """Standardpfad der Lösung eines Skripts (z.B. 'main', 'teilaufgabe4')."""
+    return os.path.join(ORDNER, f"loesung_{name}.npz")
+
+
+def spalten(praefix, komponente, eintraege, daten):
+    """Schreibt (Index, Wert)-Paare als Index- und Wertspalten nach daten (Skalar: praefix/skalar)."""
+    if not komponente.is_indexed():
+        daten[f"{praefix}/skalar"] = np.array([wert for _, wert in eintraege])
+        return
+    indizes = [index if isinstance(index, tuple) else (index,) for index, _ in eintraege]
+    for i in range(len(indizes[0]) if indizes else 0):
+        daten[f"{praefix}/{i}"] = np.array([index[i] for index in indizes])
+    daten[f"{praefix}/wert"] = np.array([wert for _, wert in eintraege])
+
+
+def speichere_loesung(model, pfad, results=None):
+    """Schreibt die aktuelle Lösung von model (und die Berichtsdaten) nach pfad."""
+    daten = {'obj': np.array(pyo.value(model.obj))}
+    schranken = getattr(results, 'problem', None)
+    for name in ('lower_bound', 'upper_bound'):
+        wert = getattr(schranken, name, None)
+        if isinstance(wert, (int, float)):
+            daten[name] = np.array(wert)
+
+    for var in model.component_objects(pyo.Var):
+        eintraege = [(index, v.value) for index, v in var.items()
+                     if v.value is not None and abs(v.value) > NULL]
+        spalten(f"v/{var.local_name}", var, eintraege, daten)
+    for art, typ in (('p', pyo.Param), ('e', pyo.Expression)):
+        for komponente in model.component_objects(typ):
+            eintraege = [(index, pyo.value(wert, exception=False)) for index, wert in komponente.items()]
+            spalten(f"{art}/{komponente.local_name}", komponente,
+                    [(index, wert) for index, wert in eintraege if wert is not None], daten)
+    for menge in model.component_objects(pyo.Set):
+        # Nur benannte Modellmengen (keine indizierten Mengen, keine Pyomo-Indexmengen)
+        if menge.is_indexed() or menge.local_name.endswith('_index'):
+            continue
+        elemente = [element if isinstance(element, tuple) else (element,) for element in menge]
+        for i in range(len(elemente[0]) if elemente else 1):
+            daten[f"s/{menge.local_name}/{i}"] = np.array([element[i] for element in elemente])
+
+    np.savez_compressed(pfad, **daten)
+    return pfad
+
+
+class Werte(dict):
+    """Variablenwerte: fehlende (nicht gespeicherte) Einträge sind 0."""
+
+    def __missing__(self, index):
+        return 0.0
+
+
+def lade_loesung(pfad):
+    """Liest pfad; gibt (Lösung mit Modell-Attributen, results mit problem.lower/upper_bound) zurück."""
+    gruppen = {}
+    with np.load(pfad) as npz:
+        loesung = SimpleNamespace(obj=float(npz['obj']))
+        problem = SimpleNamespace(**{name: float(npz[name]) for name in ('lower_bound', 'upper_bound')
+                                     if name in npz.files})
+        for schluessel in npz.files:
+            if '/' in schluessel:
+                art, name, spalte = schluessel.split('/')
+                gruppen.setdefault((art, name), {})[spalte] = npz[schluessel].tolist()
+
+    for (art, name), spalten_ in gruppen.items():
+        if 'skalar' in spalten_:
+            werte = spalten_['skalar']
+            setattr(loesung, name, werte[0] if werte else 0.0)
+            continue
+        werte = spalten_.pop('wert', None)
+        stellen = [spalten_[str(i)] for i in range(len(spalten_))]
+        indizes = list(zip(*stellen)) if len(stellen) > 1 else (stellen[0] if stellen else [])
+        if art == 's':
+            setattr(loesung, name, indizes)
+        else:
+            setattr(loesung, name, (Werte if art == 'v' else dict)(zip(indizes, werte)))
+    return loesung, SimpleNamespace(problem=problem)
+
+
+if __name__ == "__main__":
+    pfad = sys.argv[1] if len(sys.argv) > 1 else loesungsdatei('main')
+    start = time.perf_counter()
+    loesung, results = lade_loesung(pfad)
+    print(f"{pfad}: {os.path.getsize(pfad) / 1024:,.0f} KiB, gelesen in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"Zielwert: {loesung.obj:,.2f} € | untere Schranke: "
+          f"{getattr(results.problem, 'lower_bound', float('nan')):,.2f} €")
+    print(f"Touren: {len(loesung.R)} | LKW-Index: {len(loesung.K)} | Zeitintervalle: {len(loesung.Z)}")
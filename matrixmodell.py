@@ -0,0 +1,605 @@
+# ============================================================================
+# MATRIX-BACKEND: LKW-MODELL DIREKT ALS DÜNNBESETZTE MATRIX (NUMPY, OHNE PYOMO-AUSDRÜCKE)
+# Aufruf: python matrixmodell.py [--erweiterungen] [--instanz full.csv] [--mps modell.mps]
+#                                [--loesen] [--zeitlimit 3600] [--pruefen]
+#
+# baue_matrix nimmt dieselben Optionen wie build_model und erzeugt dieselben
+# Variablen und Nebenbedingungen, aber blockweise: jede Nebenbedingungsfamilie
+# ist eine vektorisierte NumPy-Rechnung über ihre Indexmengen, die
+# (Zeile, Spalte, Koeffizient)-Tripel (COO) liefert. Mengen und Parameter
+# kommen aus baue_sets_und_parameter (gemeinsam mit build_model, ohne
+# Variablen und Nebenbedingungen), der E-Vorfilter aus e_vorfilter.
+# Das Ergebnis geht als spaltenweise Matrix direkt an HiGHS (highspy) oder
+# wird als MPS-Datei geschrieben; die Lösung kommt wie in modellcache.py als
+# {(Variable, Index): Wert} zurück. Im Modellaufbau fixierte Variablen
+# bleiben als Spalten mit Schranken [0, 0] erhalten.
+# vergleiche prüft gegen build_model: gleiche Variablen mit gleichen
+# Schranken, gleiche Zielfunktion und dieselbe Menge an Zeilen (Reihenfolge
+# und Vorzeichen einer Zeile egal, fixierte Variablen herausgerechnet).
+# ============================================================================
+
+import argparse
+import itertools
+import time
+from collections import Counter
+
+import highspy
+import numpy as np
+import pyomo.environ as pyo
+from pyomo.repn import generate_standard_repn
+
+from modell import (build_model, baue_sets_und_parameter, big_m_schranken, e_vorfilter, ereignisintervalle,
+                    flottengroesse, mindestflotte, SYMMETRIE_BRECHUNG, LINEARISIERUNG, BIG_M, PRESOLVE,
+                    ZEITAGGREGATION, AUFLOESUNG, LKW_RESERVE, VORFILTER)
+
+INF = highspy.kHighsInf
+
+
+class MatrixModell:
+    """Spalten, Zeilen und Koeffizienten eines MILP in NumPy-Arrays (min c·x + offset)."""
+
+    def __init__(self):
+        self.bloecke = {}        # Variable -> (erste Spalte, Indexmengen)
+        self.nebenbedingungen = {}   # Nebenbedingung -> (erste Zeile, Anzahl)
+        self.n_spalten = 0
+        self.n_zeilen = 0
+        self.offset = 0.0
+        self._spalten = []       # (lb, ub, ganzzahlig) je Block
+        self._zeilen = []        # (lb, ub) je Block
+        self._coo = []           # (Zeilen, Spalten, Werte)
+        self._ziel = []          # (Spalten, Werte)
+        self._fest = []          # auf 0 fixierte Spalten
+
+    def variable(self, name, mengen, lb=0.0, ub=INF, ganzzahlig=False):
+        """Legt einen Variablenblock über mengen an; gibt die Spaltennummern in dessen Form zurück."""
+        form = tuple(len(m) for m in mengen)
+        n = int(np.prod(form, dtype=np.int64))
+        spalten = self.n_spalten + np.arange(n).reshape(form)
+        self.bloecke[name] = (self.n_spalten, [list(m) for m in mengen])
+        self._spalten.append((np.broadcast_to(np.asarray(lb, dtype=float), form).ravel(),
+                              np.broadcast_to(np.asarray(ub, dtype=float), form).ravel(),
+                              np.full(n, ganzzahlig)))
+        self.n_spalten += n
+        return spalten
+
+    def binaer(self, name, mengen):
+        return self.variable(name, mengen, 0.0, 1.0, True)
+
+    def fixiere(self, spalten):
+        self._fest.append(np.asarray(spalten).ravel())
+
+    def zeilen(self, name, form, lb=-INF, ub=INF):
+        """Legt einen Zeilenblock der Form form an; gibt die Zeilennummern in dieser Form zurück."""
+        form = form if isinstance(form, tuple) else (form,)
+        n = int(np.prod(form, dtype=np.int64))
+        zeilen = self.n_zeilen + np.arange(n).reshape(form)
+        self.nebenbedingungen[name] = (self.n_zeilen, n)
+        self._zeilen.append((np.broadcast_to(np.asarray(lb, dtype=float), form).ravel(),
+                             np.broadcast_to(np.asarray(ub, dtype=float), form).ravel()))
+        self.n_zeilen += n
+        return zeilen
+
+    def eintraege(self, zeilen, spalten, werte=1.0):
+        """Koeffizienten werte an (zeilen, spalten); alle drei werden gegeneinander gebroadcastet."""
+        z, s, w = np.broadcast_arrays(zeilen, spalten, np.asarray(werte, dtype=float))
+        self._coo.append((z.ravel(), s.ravel(), w.ravel()))
+
+    def ziel(self, spalten, werte):
+        s, w = np.broadcast_arrays(spalten, np.asarray(werte, dtype=float))
+        self._ziel.append((s.ravel(), w.ravel()))
+
+    def fertig(self):
+        """Fasst die Blöcke zu Arrays zusammen; die Matrix wird spaltenweise (CSC) gespeichert."""
+        self.lb = np.concatenate([b[0] for b in self._spalten])
+        self.ub = np.concatenate([b[1] for b in self._spalten])
+        self.ganzzahlig = np.concatenate([b[2] for b in self._spalten])
+        if self._fest:
+            fest = np.concatenate(self._fest)
+            self.lb[fest] = 0.0
+            self.ub[fest] = 0.0
+        self.zeilen_lb = np.concatenate([b[0] for b in self._zeilen])
+        self.zeilen_ub = np.concatenate([b[1] for b in self._zeilen])
+
+        self.c = np.zeros(self.n_spalten)
+        for s, w in self._ziel:
+            np.add.at(self.c, s, w)
+
+        # Doppelte Einträge summieren, Nullen entfernen, nach (Spalte, Zeile) sortieren
+        z = np.concatenate([e[0] for e in self._coo]).astype(np.int64)
+        s = np.concatenate([e[1] for e in self._coo]).astype(np.int64)
+        w = np.concatenate([e[2] for e in self._coo])
+        schluessel, inverse = np.unique(s * self.n_zeilen + z, return_inverse=True)
+        werte = np.bincount(inverse, weights=w)
+        behalten = werte != 0
+        schluessel, self.werte = schluessel[behalten], werte[behalten]
+        self.index = schluessel % self.n_zeilen
+        spalten = schluessel // self.n_zeilen
+        self.start = np.concatenate(([0], np.cumsum(np.bincount(spalten, minlength=self.n_spalten))))
+        self._spalten = self._zeilen = self._coo = self._ziel = self._fest = None
+        return self
+
+    def spaltennamen(self):
+        """(Variable, Index) je Spalte, Index wie in Pyomo (None für skalare Variablen)."""
+        namen = []
+        for name, (_, mengen) in self.bloecke.items():
+            if not mengen:
+                namen.append((name, None))
+            elif len(mengen) == 1:
+                namen += [(name, i) for i in mengen[0]]
+            else:
+                namen += [(name, i) for i in itertools.product(*mengen)]
+        return namen
+
+    def highs_lp(self, mit_namen=False):
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.n_spalten
+        lp.num_row_ = self.n_zeilen
+        lp.offset_ = self.offset
+        lp.col_cost_ = self.c
+        lp.col_lower_ = self.lb
+        lp.col_upper_ = self.ub
+        lp.row_lower_ = self.zeilen_lb
+        lp.row_upper_ = self.zeilen_ub
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = self.start
+        lp.a_matrix_.index_ = self.index
+        lp.a_matrix_.value_ = self.werte
+        lp.integrality_ = [highspy.HighsVarType.kInteger if g else highspy.HighsVarType.kContinuous
+                           for g in self.ganzzahlig]
+        if mit_namen:
+            lp.col_names_ = [spaltenname(name, index) for name, index in self.spaltennamen()]
+            lp.row_names_ = [f"{name}_{i}" for name, (_, n) in self.nebenbedingungen.items() for i in range(n)]
+        return lp
+
+    def schreibe_mps(self, pfad):
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', False)
+        h.passModel(self.highs_lp(mit_namen=True))
+        h.writeModel(pfad)
+        return pfad
+
+    def loese(self, zeitlimit=3600, tee=False):
+        """Löst mit HiGHS; gibt {(Variable, Index): Wert}, Zielwert, Schranke, Status zurück (wie modellcache)."""
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', tee)
+        h.setOptionValue('time_limit', float(zeitlimit))
+        h.passModel(self.highs_lp())
+        h.run()
+        status = h.modelStatusToString(h.getModelStatus())
+        info = h.getInfo()
+        if info.primal_solution_status == 0:   # keine zulässige Lösung
+            return None, None, None, status
+        werte = dict(zip(self.spaltennamen(), h.getSolution().col_value))
+        schranke = info.mip_dual_bound if self.ganzzahlig.any() else info.objective_function_value
+        return werte, info.objective_function_value, schranke, status
+
+
+def spaltenname(name, index):
+    if index is None:
+        return name
+    teile = index if isinstance(index, tuple) else (index,)
+    return f"{name}({','.join(str(i) for i in teile)})".replace(' ', '_')
+
+
+def bereiche(von, bis):
+    """Verkettete Bereiche von[i]..bis[i]-1 und die zugehörige Nummer i."""
+    laenge = bis - von
+    nummer = np.repeat(np.arange(len(von)), laenge)
+    versatz = np.arange(laenge.sum()) - np.repeat(np.cumsum(laenge) - laenge, laenge)
+    return nummer, np.repeat(von, laenge) + versatz
+
+
+def werte(param, menge):
+    return np.array([pyo.value(param[i]) for i in menge], dtype=float)
+
+
+def baue_matrix(erweiterungen=False, ht_preis=0.27, nt_preis=0.22,
+                symmetrie_brechung=SYMMETRIE_BRECHUNG, linearisierung=LINEARISIERUNG,
+                big_m=BIG_M, presolve=PRESOLVE, zeitaggregation=ZEITAGGREGATION, intervalle=None,
+                aufloesung=AUFLOESUNG, tage=None, anzahl_lkw=None, lkw_reserve=LKW_RESERVE,
+                vorfilter=VORFILTER, instanz=None):
+    """Das Modell aus build_model (gleiche Optionen) als MatrixModell."""
+    d = pyo.ConcreteModel()
+    if intervalle is None and zeitaggregation:
+        intervalle = ereignisintervalle(erweiterungen, ht_preis, nt_preis, aufloesung, tage, instanz)
+    baue_sets_und_parameter(d, erweiterungen, ht_preis, nt_preis, intervalle, aufloesung, tage, instanz)
+    big_m_schranken(d, erweiterungen, big_m)
+
+    # --- Mengen als Listen, Parameter als Arrays ---
+    R, T, TE, L = list(d.R), list(d.T), list(d.TE), list(d.L)
+    Z = np.array(list(d.Z))
+    nR, nT, nL, nZ = len(R), len(T), len(L), len(Z)
+    r_pos = {r: i for i, r in enumerate(R)}
+    t_pos = {t: i for i, t in enumerate(T)}
+    te = np.array([t_pos[t] for t in TE], dtype=np.int64)
+    td = np.array([t_pos[t] for t in d.TD], dtype=np.int64)
+    K = list(range(1, flottengroesse(d, anzahl_lkw, lkw_reserve) + 1))
+    nK = len(K)
+
+    dist, mDist = werte(d.dist, R), werte(d.mDist, R)
+    dauer = werte(d.dur_z, R)
+    avgEv, soc_e = werte(d.avgEv_e, TE), werte(d.soc_e, TE)
+    max_p_e, max_p_l, cs_l = werte(d.max_p_e, T), werte(d.max_p_l, L), werte(d.cs_l, L)
+    dt, n_basis, unplug_ok = werte(d.delta_t, Z), werte(d.n_basis, Z), werte(d.unplug_ok, Z)
+    Nmax = pyo.value(d.Nmax)
+
+    # Tour-Intervall-Paare: Start (Position von s_r) und unterwegs (s_r <= z < e_r)
+    start = np.searchsorted(Z, werte(d.s_r, R))
+    ende = np.searchsorted(Z, werte(d.e_r, R))
+    akt_r, akt_z = bereiche(start, ende)
+    clique_c, clique_r = [], []
+    for i, c in enumerate(d.C):
+        for r in d.R_clique[c]:
+            clique_c.append(i)
+            clique_r.append(r_pos[r])
+    clique_c, clique_r = np.array(clique_c, dtype=np.int64), np.array(clique_r, dtype=np.int64)
+
+    # Presolve: depart nur in Intervallen mit Tourstart
+    dep = np.unique(start) if presolve else np.arange(nZ)
+    dep_nummer = np.full(nZ, -1)
+    dep_nummer[dep] = np.arange(len(dep))
+    laden_moeglich = not presolve or (max_p_e[te] > 0).any()
+
+    mm = MatrixModell()
+
+    # ========================================================================
+    # VARIABLEN (Namen und Indexmengen wie in build_model)
+    # ========================================================================
+
+    if erweiterungen:
+        PV = mm.variable('p_pv_cap', [], 0.0, 500.0)
+    TA = mm.binaer('type_assignment', [K, T])
+    TU = mm.binaer('truck_used', [K])
+    TTU = mm.binaer('truck_type_used', [K, T])
+    AT = mm.binaer('a_type', [R, K, T])
+    A = mm.binaer('a', [R, K])
+    DEP = mm.binaer('depart', [K, Z[dep].tolist()])
+    ASSIGN = mm.binaer('assign', [K, L, Z.tolist()])
+    PLUG = mm.binaer('plug', [K, L, Z.tolist()])
+    P = mm.variable('real_p', [K, L, Z.tolist()])
+    Y = mm.variable('y_l', [L], 0.0, Nmax, True)
+    if not laden_moeglich:
+        for spalten in (ASSIGN, PLUG, P, Y):
+            mm.fixiere(spalten)
+    SOC = mm.variable('soc', [K, Z.tolist()])
+
+    # ========================================================================
+    # LINEARISIERUNG a_type = a · type_assignment, truck_type_used = truck_used · type_assignment
+    # ========================================================================
+
+    if linearisierung == 'disaggregiert':
+        z = mm.zeilen('con_a_type_split', (nR, nK), 0, 0)
+        mm.eintraege(z, A, 1)
+        mm.eintraege(z[:, :, None], AT, -1)
+        z = mm.zeilen('con_a_type_lin2', (nR, nK, nT), ub=0)
+        mm.eintraege(z, AT, 1)
+        mm.eintraege(z, TA[None], -1)
+    else:
+        z = mm.zeilen('con_a_type_lin1', (nR, nK, nT), ub=0)
+        mm.eintraege(z, AT, 1)
+        mm.eintraege(z, A[:, :, None], -1)
+        z = mm.zeilen('con_a_type_lin2', (nR, nK, nT), ub=0)
+        mm.eintraege(z, AT, 1)
+        mm.eintraege(z, TA[None], -1)
+        z = mm.zeilen('con_a_type_lin3', (nR, nK, nT), lb=-1)
+        mm.eintraege(z, AT, 1)
+        mm.eintraege(z, A[:, :, None], -1)
+        mm.eintraege(z, TA[None], -1)
+
+    # --- 5.0 Typ-Zuordnung und truck_used ---
+    z = mm.zeilen('con_one_type_per_truck', nK, 1, 1)
+    mm.eintraege(z[:, None], TA, 1)
+    z = mm.zeilen('con_truck_used_lower', nK, ub=0)
+    mm.eintraege(z[None], A, 1)
+    mm.eintraege(z, TU, -nR)
+    z = mm.zeilen('con_truck_used_upper', nK, ub=0)
+    mm.eintraege(z, TU, 1)
+    mm.eintraege(z[None], A, -1)
+
+    if linearisierung == 'disaggregiert':
+        z = mm.zeilen('con_ttu_split', nK, 0, 0)
+        mm.eintraege(z, TU, 1)
+        mm.eintraege(z[:, None], TTU, -1)
+        z = mm.zeilen('con_ttu_lin2', (nK, nT), ub=0)
+        mm.eintraege(z, TTU, 1)
+        mm.eintraege(z, TA, -1)
+    else:
+        z = mm.zeilen('con_ttu_lin1', (nK, nT), ub=0)
+        mm.eintraege(z, TTU, 1)
+        mm.eintraege(z, TU[:, None], -1)
+        z = mm.zeilen('con_ttu_lin2', (nK, nT), ub=0)
+        mm.eintraege(z, TTU, 1)
+        mm.eintraege(z, TA, -1)
+        z = mm.zeilen('con_ttu_lin3', (nK, nT), lb=-1)
+        mm.eintraege(z, TTU, 1)
+        mm.eintraege(z, TU[:, None], -1)
+        mm.eintraege(z, TA, -1)
+
+    # --- 5.1/5.2 Tour-Zuordnung, Cliquen, Abfahrten ---
+    z = mm.zeilen('con_tour_assignment', nR, 1, 1)
+    mm.eintraege(z[:, None], A, 1)
+    z = mm.zeilen('con_no_concurrent_tours', (nK, len(d.C)), ub=1)
+    mm.eintraege(z[:, clique_c], A[clique_r].T, 1)
+    z = mm.zeilen('con_depart_definition', (nK, len(dep)), 0, 0)
+    mm.eintraege(z, DEP, 1)
+    mm.eintraege(z[:, dep_nummer[start]], A.T, -1)
+
+    # --- 5.4 Energie: soc[k,z+1] = soc[k,z] - cons[k,z] + Σ_l real_p·Δt ---
+    z = mm.zeilen('con_soc_dynamics', (nK, nZ - 1), 0, 0)
+    mm.eintraege(z, SOC[:, 1:], 1)
+    mm.eintraege(z, SOC[:, :-1], -1)
+    mm.eintraege(z[:, None, :], P[:, :, :-1], -dt[:-1])
+    nicht_letztes = akt_z < nZ - 1
+    r_, z_ = akt_r[nicht_letztes], akt_z[nicht_letztes]
+    verbrauch = (dist[r_, None] * avgEv[None] / dauer[r_, None]) * n_basis[z_, None]   # (Paare, TE)
+    mm.eintraege(z[:, z_][:, :, None], AT[r_][:, :, te].transpose(1, 0, 2), verbrauch[None])
+
+    z = mm.zeilen('con_soc_upper', (nK, nZ), ub=0)
+    mm.eintraege(z, SOC, 1)
+    mm.eintraege(z[:, :, None], TA[:, None, te], -soc_e)
+    mm.eintraege(z[:, :, None], TA[:, None, td], -1000)
+    z = mm.zeilen('con_soc_cycle', nK, 0, 0)
+    mm.eintraege(z, SOC[:, 0], 1)
+    mm.eintraege(z, SOC[:, -1], -1)
+    z = mm.zeilen('con_total_charger_limit', (), ub=Nmax)
+    mm.eintraege(z, Y, 1)
+
+    # --- 5.5 Lade-Logik ---
+    z = mm.zeilen('con_charging_requires_assign', (nK, nL, nZ), ub=0)
+    mm.eintraege(z, P, 1)
+    mm.eintraege(z, ASSIGN, -werte(d.M_laden, L)[None, :, None])
+    z = mm.zeilen('con_charging_power_limit', (nK, nL, nZ), ub=0)
+    mm.eintraege(z, P, 1)
+    mm.eintraege(z[..., None], TA[:, None, None, :], -max_p_e)
+    z = mm.zeilen('con_assign_requires_plug', (nK, nL, nZ), ub=0)
+    mm.eintraege(z, ASSIGN, 1)
+    mm.eintraege(z, PLUG, -1)
+    z = mm.zeilen('con_one_charger_per_truck', (nK, nZ), ub=1)
+    mm.eintraege(z[:, None, :], PLUG, 1)
+    if not presolve:
+        z = mm.zeilen('con_diesel_no_charging', (nK, nL, nZ), ub=0)
+        mm.eintraege(z, ASSIGN, 1)
+        mm.eintraege(z[..., None], TA[:, None, None, te], -1)
+    z = mm.zeilen('con_diesel_no_plug', (nK, nL, nZ), ub=0)
+    mm.eintraege(z, PLUG, 1)
+    mm.eintraege(z[..., None], TA[:, None, None, te], -1)
+    z = mm.zeilen('con_no_charge_while_driving', (nK, nZ), ub=1)
+    mm.eintraege(z[:, None, :], PLUG, 1)
+    mm.eintraege(z[:, akt_z], A[akt_r].T, 1)
+
+    vor_abfahrt = np.flatnonzero(dep_nummer[1:] >= 0)
+    z = mm.zeilen('con_unplug_before_departure', (nK, nL, len(vor_abfahrt)), ub=1)
+    mm.eintraege(z, PLUG[:, :, vor_abfahrt], 1)
+    mm.eintraege(z, DEP[:, None, dep_nummer[vor_abfahrt + 1]], 1)
+    umstecken = np.arange(nZ - 1)
+    if presolve:
+        umstecken = umstecken[unplug_ok[:-1] != 1]
+    z = mm.zeilen('con_unplug_timing', (nK, nL, len(umstecken)), ub=unplug_ok[umstecken])
+    mm.eintraege(z, PLUG[:, :, umstecken], 1)
+    mm.eintraege(z, PLUG[:, :, umstecken + 1], -1)
+
+    # --- 5.6 Säulenkapazitäten ---
+    for name, spalten, kapazitaet in (('con_charger_assign_capacity', ASSIGN, cs_l),
+                                      ('con_charger_plug_capacity', PLUG, cs_l),
+                                      ('con_charger_power_capacity', P, max_p_l)):
+        z = mm.zeilen(name, (nL, nZ), ub=0)
+        mm.eintraege(z[None], spalten, 1)
+        mm.eintraege(z, Y[:, None], -kapazitaet[:, None])
+
+    # --- 5.8 Netz und Speicher (baue_netz_und_speicher) ---
+    PS = mm.variable('p_s', [])
+    QS = mm.variable('q_s', [])
+    PLS = mm.variable('p_l_s', [Z.tolist()])
+    PES = mm.variable('p_e_s', [Z.tolist()])
+    SOCS = mm.variable('soc_s', [Z.tolist()])
+    MODE = mm.binaer('mode_s', [Z.tolist()])
+    PGRID = mm.variable('p_grid', [Z.tolist()])
+    PPEAK = mm.variable('p_peak', [])
+    U = mm.binaer('u', [])
+
+    z = mm.zeilen('con_grid_balance', nZ, 0, 0)
+    mm.eintraege(z, PGRID, 1)
+    mm.eintraege(z[None, None], P, -1)
+    mm.eintraege(z, PLS, -1)
+    mm.eintraege(z, PES, 1)
+    if erweiterungen:
+        mm.eintraege(z, PV, werte(d.pv_profile, Z))
+    z = mm.zeilen('con_grid_limit', nZ, ub=pyo.value(d.p_grid_max))
+    mm.eintraege(z, PGRID, 1)
+    mm.eintraege(z, U, -500)
+    z = mm.zeilen('con_peak_power', nZ, ub=0)
+    mm.eintraege(z, PGRID, 1)
+    mm.eintraege(z, PPEAK, -1)
+    z = mm.zeilen('con_storage_dynamics', nZ - 1, 0, 0)
+    mm.eintraege(z, SOCS[1:], 1)
+    mm.eintraege(z, SOCS[:-1], -1)
+    mm.eintraege(z, PLS[:-1], -dt[:-1])
+    mm.eintraege(z, PES[:-1], (1 / pyo.value(d.nrt)) * dt[:-1])
+    z = mm.zeilen('con_storage_neutral', (), 0, 0)
+    mm.eintraege(z, SOCS[0], 1)
+    mm.eintraege(z, SOCS[-1], -1)
+    z = mm.zeilen('con_storage_capacity', nZ, ub=0)
+    mm.eintraege(z, SOCS, 1)
+    mm.eintraege(z, QS, -1)
+    z = mm.zeilen('con_storage_reserve', nZ, lb=0)
+    mm.eintraege(z, SOCS, 1)
+    mm.eintraege(z, QS, -pyo.value(d.dod))
+    for name, spalten in (('con_storage_charge_mode', PLS), ('con_storage_discharge_mode', PES)):
+        z = mm.zeilen(name, nZ, ub=0)
+        mm.eintraege(z, spalten, 1)
+        mm.eintraege(z, PS, -1)
+    z = mm.zeilen('con_storage_charge_mode_binary', nZ, ub=0)
+    mm.eintraege(z, PLS, 1)
+    mm.eintraege(z, MODE, -pyo.value(d.M_speicher_laden))
+    M_entladen = pyo.value(d.M_speicher_entladen)
+    z = mm.zeilen('con_storage_discharge_mode_binary', nZ, ub=M_entladen)
+    mm.eintraege(z, PES, 1)
+    mm.eintraege(z, MODE, M_entladen)
+
+    # --- 5.9 Symmetriebrechung (k-1 = vorheriger LKW) ---
+    if symmetrie_brechung:
+        z = mm.zeilen('con_sym_truck_used', nK - 1, ub=0)
+        mm.eintraege(z, TU[1:], 1)
+        mm.eintraege(z, TU[:-1], -1)
+        rang = np.arange(nT, dtype=float)
+        z = mm.zeilen('con_sym_type_order', nK - 1, ub=0)
+        mm.eintraege(z[:, None], TA[:-1], rang)
+        mm.eintraege(z[:, None], TA[1:], -rang)
+        z = mm.zeilen('con_sym_tour_order', (nR, nK - 1, nT), ub=2)
+        mm.eintraege(z, A[:, 1:, None], 1)
+        r, r_vorher = np.tril_indices(nR, -1)
+        mm.eintraege(z[r], A[r_vorher, :-1, None], -1)
+        mm.eintraege(z, TA[None, 1:], 1)
+        mm.eintraege(z, TA[None, :-1], 1)
+
+    # --- 5.10 E-Vorfilter ---
+    if vorfilter:
+        zu_lang, paare = e_vorfilter(d)
+        for r, t in zu_lang:
+            mm.fixiere(AT[r_pos[r], :, t_pos[t]])
+        r1 = np.array([r_pos[p[0]] for p in paare], dtype=np.int64)
+        r2 = np.array([r_pos[p[1]] for p in paare], dtype=np.int64)
+        t = np.array([t_pos[p[2]] for p in paare], dtype=np.int64)
+        z = mm.zeilen('con_e_paar', (len(paare), nK), ub=1)
+        mm.eintraege(z, AT[r1, :, t], 1)
+        mm.eintraege(z, AT[r2, :, t], 1)
+
+    # ========================================================================
+    # ZIELFUNKTION
+    # ========================================================================
+
+    fix_typ = np.zeros(nT)
+    fix_typ[td] = werte(d.cap_d, d.TD) + werte(d.opx_d, d.TD) + werte(d.kfz_d, d.TD)
+    fix_typ[te] = werte(d.cap_e, TE) + werte(d.opx_e, TE) - werte(d.thg_e, TE)
+    mm.ziel(TTU, fix_typ)
+    mm.ziel(Y, werte(d.cap_l, L) + werte(d.opx_l, L))
+    mm.ziel(U, 10000)
+    opx_s = pyo.value(d.opx_s)
+    mm.ziel(PS, (1 + opx_s) * pyo.value(d.capP_s))
+    mm.ziel(QS, (1 + opx_s) * pyo.value(d.capQ_s))
+
+    jf = pyo.value(d.jahresfaktor)
+    maut = pyo.value(d.c_m_d) + (werte(d.c_co2_maut, d.TD) if erweiterungen else 0)
+    diesel = (maut * mDist[:, None] + pyo.value(d.c_diesel) * dist[:, None] * werte(d.avgDv_d, d.TD)[None])
+    mm.ziel(AT[:, :, td], jf * diesel[:, None, :])
+
+    mm.offset = pyo.value(d.c_gr)
+    mm.ziel(PPEAK, pyo.value(d.cPeak))
+    c_e = werte(d.c_e, Z) if erweiterungen else pyo.value(d.c_e)
+    mm.ziel(PGRID, jf * c_e * dt)
+    if erweiterungen:
+        mm.ziel(PV, pyo.value(d.capex_pv))
+
+    mm.mindestflotte = mindestflotte(d)
+    return mm.fertig()
+
+
+# ============================================================================
+# VALIDIERUNG GEGEN build_model
+# ============================================================================
+
+def schluessel(name, index):
+    return name, repr(index)
+
+
+def normiert(eintraege, lb, ub):
+    """Zeile als vergleichbares Tupel: sortiert, gerundet, erstes Vorzeichen positiv."""
+    eintraege = sorted((k, w) for k, w in eintraege if w != 0)
+    if not eintraege:
+        return None
+    if eintraege[0][1] < 0:
+        eintraege = [(k, -w) for k, w in eintraege]
+        lb, ub = -ub, -lb
+    return (tuple((k, float(f"{w:.10g}")) for k, w in eintraege),
+            float(f"{lb:.10g}"), float(f"{ub:.10g}"))
+
+
+def vergleiche(mm, model):
+    """Unterschiede zwischen MatrixModell und Pyomo-Modell als Liste von Texten (leer = gleich)."""
+    fehler = []
+    namen = [schluessel(*n) for n in mm.spaltennamen()]
+    fest = mm.lb == mm.ub
+
+    # Variablen: Schranken und Ganzzahligkeit
+    spalten = {n: i for i, n in enumerate(namen)}
+    pyomo_vars = {}
+    for v in model.component_data_objects(pyo.Var):
+        n = schluessel(v.parent_component().local_name, v.index())
+        pyomo_vars[n] = v
+        i = spalten.get(n)
+        if i is None:
+            fehler.append(f"Variable fehlt in der Matrix: {n}")
+        elif v.fixed != fest[i] or (not v.fixed and (
+                (v.lb if v.lb is not None else -INF, v.ub if v.ub is not None else INF, v.is_integer()) !=
+                (mm.lb[i], mm.ub[i], bool(mm.ganzzahlig[i])))):
+            fehler.append(f"Schranken/Typ verschieden: {n}")
+    fehler += [f"Variable fehlt im Pyomo-Modell: {n}" for n in namen if n not in pyomo_vars]
+
+    # Zielfunktion
+    repn = generate_standard_repn(model.obj.expr, compute_values=True)
+    ziel_pyomo = normiert([(schluessel(v.parent_component().local_name, v.index()), w)
+                           for v, w in zip(repn.linear_vars, repn.linear_coefs)], repn.constant, repn.constant)
+    ziel_matrix = normiert([(namen[i], mm.c[i]) for i in np.flatnonzero(~fest)], mm.offset, mm.offset)
+    if ziel_pyomo != ziel_matrix:
+        fehler.append("Zielfunktion verschieden")
+
+    # Zeilen als Multimenge
+    pyomo_zeilen = Counter()
+    for con in model.component_data_objects(pyo.Constraint, active=True):
+        repn = generate_standard_repn(con.body, compute_values=True)
+        lb = -INF if con.lower is None else pyo.value(con.lower) - repn.constant
+        ub = INF if con.upper is None else pyo.value(con.upper) - repn.constant
+        zeile = normiert([(schluessel(v.parent_component().local_name, v.index()), w)
+                          for v, w in zip(repn.linear_vars, repn.linear_coefs)], lb, ub)
+        if zeile is not None:
+            pyomo_zeilen[zeile] += 1
+
+    spalte_von = np.repeat(np.arange(mm.n_spalten), np.diff(mm.start))
+    nach_zeile = {}
+    for z, s, w in zip(mm.index.tolist(), spalte_von.tolist(), mm.werte.tolist()):
+        if not fest[s]:
+            nach_zeile.setdefault(z, []).append((namen[s], w))
+    matrix_zeilen = Counter()
+    for z, eintraege in nach_zeile.items():
+        matrix_zeilen[normiert(eintraege, mm.zeilen_lb[z], mm.zeilen_ub[z])] += 1
+
+    nur_pyomo = pyomo_zeilen - matrix_zeilen
+    nur_matrix = matrix_zeilen - pyomo_zeilen
+    for titel, zeilen in (("nur im Pyomo-Modell", nur_pyomo), ("nur in der Matrix", nur_matrix)):
+        if zeilen:
+            fehler.append(f"{sum(zeilen.values())} Zeilen {titel}, z.B. {next(iter(zeilen))}")
+    return fehler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LKW-Modell als Matrix aufbauen (ohne Pyomo-Ausdrücke)")
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    parser.add_argument('--instanz', help="full.csv-Datei (Standard: DATEN_CSV)")
+    parser.add_argument('--mps', help="Modell als MPS-Datei schreiben")
+    parser.add_argument('--loesen', action='store_true', help="Direkt mit HiGHS lösen")
+    parser.add_argument('--zeitlimit', type=int, default=3600, help="Zeitlimit in Sekunden")
+    parser.add_argument('--pruefen', action='store_true', help="Mit build_model vergleichen (Aufbauzeit, Zeilen)")
+    args = parser.parse_args()
+
+    optionen = {'erweiterungen': args.erweiterungen, 'instanz': args.instanz}
+    start = time.perf_counter()
+    mm = baue_matrix(**optionen)
+    aufbau = time.perf_counter() - start
+    print(f"Matrix-Aufbau: {aufbau:.3f}s | {mm.n_spalten} Spalten, {mm.n_zeilen} Zeilen, "
+          f"{len(mm.werte)} Nichtnullen")
+
+    if args.pruefen:
+        start = time.perf_counter()
+        model = build_model(**optionen)
+        aufbau_pyomo = time.perf_counter() - start
+        print(f"build_model:   {aufbau_pyomo:.3f}s (Faktor {aufbau_pyomo / aufbau:.1f})")
+        fehler = vergleiche(mm, model)
+        print("Vergleich mit build_model: " + ("identisch" if not fehler else f"{len(fehler)} Unterschiede"))
+        for f in fehler[:20]:
+            print(f"  {f}")
+    if args.mps:
+        print(f"MPS geschrieben: {mm.schreibe_mps(args.mps)}")
+    if args.loesen:
+        loesung, zielwert, schranke, status = mm.loese(args.zeitlimit, tee=True)
+        print(f"\n{status}" + (f" | Zielwert: {zielwert:,.2f} € | Schranke: {schranke:,.2f} €"
+                               if loesung is not None else ""))
@@ -0,0 +1,133 @@
+# ============================================================================
+# MEHRSTUFIGE LÖSUNG: GROBES STUNDENMODELL ALS START FÜR DAS FEINE MODELL
+# Aufruf: python mehrstufig.py [--modus start|fixieren] [--zeitlimit-grob 60]
+#                              [--zeitlimit 3600] [--aufloesung 15] [--erweiterungen]
+#
+# 1. Modell auf 1-Stunden-Raster (24 Intervalle, delta_t = 1) schnell lösen;
+#    Touren werden dabei nach außen auf volle Stunden gerundet, die gefundene
+#    Flotte ist also auch im feinen Raster überschneidungsfrei.
+# 2. Flottendesign (type_assignment, y_l, u, p_s, q_s, p_pv_cap) und
+#    Tourzuordnung a auf das feine Modell (AUFLOESUNG, z.B. 96 Slots) übertragen
+#    und dort fixiert lösen (restringiertes Modell: nur noch Lade- und Netzbetrieb frei).
+# 3. modus='start': Fixierung aufheben und das volle Modell mit dieser
+#    vollständigen Lösung als MIP-Start weiterrechnen.
+# ============================================================================
+
+import argparse
+import time
+
+import pyomo.environ as pyo
+
+from modell import build_model, waehle_solver, AUFLOESUNG
+
+# Vom groben auf das feine Modell übertragene Entscheidungen
+PROJEKTION = ('type_assignment', 'y_l', 'u', 'p_s', 'q_s', 'p_pv_cap', 'a')
+
+
+def stundenraster(aufloesung=AUFLOESUNG):
+    """Startslots der 24 Stundenintervalle im Basisraster."""
+    return list(range(1, 24 * 60 // aufloesung + 1, 60 // aufloesung))
+
+
+def loese(model, zeitlimit, warmstart=False):
+    """Löst model mit dem besten verfügbaren Solver; gibt (results, Sekunden) zurück."""
+    solver, solver_name = waehle_solver(zeitlimit)
+    start = time.perf_counter()
+    if warmstart and solver.warm_start_capable():
+        results = solver.solve(model, tee=True, warmstart=True)
+    else:
+        results = solver.solve(model, tee=True)
+    return results, time.perf_counter() - start
+
+
+def hat_loesung(model):
+    try:
+        return pyo.value(model.obj) is not None
+    except:
+        return False
+
+
+def projiziere(grob, fein, fixieren=False, namen=PROJEKTION):
+    """Überträgt die Variablen namen (Standard: PROJEKTION) von grob auf fein.
+
+    Die daraus folgenden Hilfsvariablen (truck_used, truck_type_used, a_type,
+    depart) werden konsistent gesetzt, damit fein einen vollständigen Start hat.
+    Mit fixieren=True werden die übertragenen Variablen fixiert.
+    """
+    for name in namen:
+        var_grob = grob.component(name)
+        if var_grob is None:
+            continue
+        var_fein = fein.component(name)
+        for index, v in var_fein.items():
+            wert = var_grob[index].value
+            if wert is None:
+                continue
+            if v.is_integer():
+                wert = round(wert)
+            v.set_value(wert, skip_validation=True)
+            if fixieren:
+                v.fix()
+
+    for k in fein.K:
+        fein.truck_used[k].set_value(1 if any(fein.a[r, k].value > 0.5 for r in fein.R) else 0)
+        for t in fein.T:
+            fein.truck_type_used[k, t].set_value(fein.truck_used[k].value * fein.type_assignment[k, t].value)
+            for r in fein.R:
+                fein.a_type[r, k, t].set_value(fein.a[r, k].value * fein.type_assignment[k, t].value)
+        for z in fein.Z_depart:
+            fein.depart[k, z].set_value(sum(fein.a[r, k].value for r in fein.R_start[z]))
+
+
+def loese_mehrstufig(modus='start', zeitlimit_grob=60, zeitlimit=3600, erweiterungen=False,
+                     aufloesung=AUFLOESUNG, **optionen):
+    """Grob lösen, projizieren, restringiert (und bei modus='start' voll) lösen.
+
+    optionen werden an beide build_model-Aufrufe weitergereicht. Gibt das
+    feine Modell mit der besten Lösung und die Laufzeiten je Stufe zurück.
+    """
+    zeiten = {}
+
+    print("\n>>> Stufe 1: Stundenraster")
+    grob = build_model(erweiterungen=erweiterungen, intervalle=stundenraster(aufloesung),
+                       aufloesung=aufloesung, **optionen)
+    _, zeiten['grob'] = loese(grob, zeitlimit_grob)
+    if not hat_loesung(grob):
+        raise RuntimeError("Grobes Modell ohne zulässige Lösung - Zeitlimit erhöhen")
+    print(f"Grobe Lösung: {pyo.value(grob.obj):,.2f} € nach {zeiten['grob']:.1f}s")
+
+    print(f"\n>>> Stufe 2: {aufloesung}-Minuten-Raster mit fixiertem Flottendesign")
+    # Nach außen gerundete Touren überlappen im Stundenraster stärker, grob.K ist
+    # also mindestens so groß wie die Mindestflotte im feinen Raster; gleiches K,
+    # damit jede Tourzuordnung der groben Lösung übertragbar bleibt
+    fein = build_model(erweiterungen=erweiterungen, aufloesung=aufloesung,
+                       **dict(optionen, anzahl_lkw=len(grob.K)))
+    projiziere(grob, fein, fixieren=True)
+    _, zeiten['fixiert'] = loese(fein, zeitlimit)
+    if not hat_loesung(fein):
+        raise RuntimeError("Restringiertes Modell ohne zulässige Lösung")
+    print(f"Restringierte Lösung: {pyo.value(fein.obj):,.2f} € nach {zeiten['fixiert']:.1f}s")
+
+    if modus == 'start':
+        print(f"\n>>> Stufe 3: volles {aufloesung}-Minuten-Modell mit MIP-Start")
+        for name in PROJEKTION:
+            if fein.component(name) is not None:
+                fein.component(name).unfix()
+        _, zeiten['voll'] = loese(fein, zeitlimit, warmstart=True)
+        print(f"Volle Lösung: {pyo.value(fein.obj):,.2f} € nach {zeiten['voll']:.1f}s")
+
+    return fein, zeiten
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grobes Stundenmodell als Start für das feine Modell")
+    parser.add_argument('--modus', choices=['start', 'fixieren'], default='start')
+    parser.add_argument('--zeitlimit-grob', type=int, default=60, help="Zeitlimit Stundenmodell in Sekunden")
+    parser.add_argument('--zeitlimit', type=int, default=3600, help="Zeitlimit feines Modell in Sekunden")
+    parser.add_argument('--aufloesung', type=int, default=AUFLOESUNG, help="Minuten pro Slot im feinen Modell")
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    args = parser.parse_args()
+
+    model, zeiten = loese_mehrstufig(args.modus, args.zeitlimit_grob, args.zeitlimit, args.erweiterungen,
+                                     args.aufloesung)
+    print("\nLaufzeiten: " + ", ".join(f"{stufe} {sekunden:.1f}s" for stufe, sekunden in zeiten.items()))
@@ -0,0 +1,1113 @@
+# ============================================================================
+# MILP-OPTIMIERUNGSMODELL FÜR LKW-FLOTTENPLANUNG MIT LADEINFRASTRUKTUR
+# Gemeinsamer Modellaufbau für main.py (Erste Aufgabe) und
+# Teilaufgabe4.py (Erweiterungen: CO₂-Maut, HT/NT-Tarif, PV-Anlage)
+# ============================================================================
+
+import os
+
+import pyomo.environ as pyo
+from pyomo.opt import SolverFactory
+
+from instanz import Instanz, lade_instanz
+
+# ============================================================================
+# KONFIGURATION
+# ============================================================================
+
+# Zeitauflösung in Minuten pro Slot (Teiler von 60, z.B. 5, 15 oder 60) - HIER ÄNDERN!
+AUFLOESUNG = 15
+
+# Eingangsdaten: Säulen, LKW-Typen und Touren (instanz.py) - HIER ÄNDERN!
+DATEN_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'full.csv')
+
+# Symmetriebrechung über die austauschbaren LKW-Indizes K - HIER ÄNDERN!
+SYMMETRIE_BRECHUNG = False
+
+# Formulierung: 'lkw' (LKW-indiziertes Modell, build_model) oder
+# 'fluss' (Touren-Verkettungs-Fluss, flussmodell.build_flow_model) - HIER ÄNDERN!
+FORMULIERUNG = 'lkw'
+
+# Linearisierung von a[r,k]*type_assignment[k,t] und truck_used[k]*type_assignment[k,t]:
+# 'mccormick' (3 Ungleichungen je Produkt) oder 'disaggregiert'
+# (a = Σ_t a_type, a_type <= type_assignment; kleiner und LP-schärfer) - HIER ÄNDERN!
+LINEARISIERUNG = 'mccormick'
+
+# Big-M der Lade- und Speicherlogik: 'auto' (kleinste gültige Schranke aus den
+# Parametern, siehe big_m_schranken) oder 'fest' (pauschal 10000) - HIER ÄNDERN!
+BIG_M = 'auto'
+
+# Struktureller Presolve im Modellaufbau: Variablen und Nebenbedingungen, die
+# durch den Fahrplan festliegen bzw. redundant sind, gar nicht erst erzeugen - HIER ÄNDERN!
+PRESOLVE = True
+
+# Ereignisbasierte Zeitaggregation: aufeinanderfolgende Basis-Slots ohne
+# Änderung der exogenen Daten zu einem Intervall mit eigenem delta_t zusammenfassen;
+# Auswertung danach über auf_basisraster im Basisraster - HIER ÄNDERN!
+ZEITAGGREGATION = False
+
+# Mehrtägiger Horizont (build_model(tage=[...]), rollierend.py): Touren je
+# Wochentag, None = alle Touren aus full.csv. SOC und Speicherstand laufen
+# über die Tagesgrenzen durch - HIER ÄNDERN!
+WOCHENPLAN = {'Mo': None, 'Di': None, 'Mi': None, 'Do': None, 'Fr': None, 'Sa': [], 'So': []}
+WOCHE = list(WOCHENPLAN)
+
+# E-Vorfilter: Touren, die für einen E-Typ zu lang sind, in a_type fixieren und
+# Tourpaare ausschließen, deren Energie nicht in soc_e plus die dazwischen
+# ladbare Energie passt (siehe e_vorfilter) - HIER ÄNDERN!
+VORFILTER = True
+
+# LKW-Indexmenge K: Mindestflotte aus der größten Überlappung der Touren
+# plus diese Reserve an zusätzlichen LKW - HIER ÄNDERN!
+LKW_RESERVE = 0
+
+# Konstruktive Startlösung (startloesung.py) vor dem Lösen als MIP-Start laden,
+# nur für FORMULIERUNG = 'lkw' - HIER ÄNDERN!
+MIP_START = True
+
+# Lösung nach dem Lösen als NPZ speichern (loesungsspeicher.py); mit
+# BERICHT_AUS_DATEI = True laufen die Berichte in main.py/Teilaufgabe4.py nur
+# aus dieser Datei, ohne Modellaufbau und Solver - HIER ÄNDERN!
+LOESUNG_SPEICHERN = True
+BERICHT_AUS_DATEI = False
+
+# Mit build_model(veraenderlich=True) als veränderliche Parameter (mutable)
+# angelegt: szenarien.py ändert sie im geladenen Modell und löst warm neu
+VERAENDERLICHE_PARAMETER = ('c_e', 'c_diesel', 'c_m_d', 'c_co2_maut', 'p_grid_max', 'capex_pv', 'cPeak', 'c_gr')
+
+
+def build_model(erweiterungen=False, ht_preis=0.27, nt_preis=0.22,
+                symmetrie_brechung=SYMMETRIE_BRECHUNG, linearisierung=LINEARISIERUNG,
+                big_m=BIG_M, presolve=PRESOLVE, zeitaggregation=ZEITAGGREGATION, intervalle=None,
+                aufloesung=AUFLOESUNG, tage=None, anzahl_lkw=None, lkw_reserve=LKW_RESERVE,
+                vorfilter=VORFILTER, instanz=None, veraenderlich=False):
+    """Baut das Pyomo-ConcreteModel auf und gibt es zurück.
+
+    erweiterungen=True ergänzt die Erweiterungen aus Teilaufgabe 4
+    (CO₂-Maut-Aufschlag, HT/NT-Tarif mit ht_preis/nt_preis, PV-Anlage).
+    symmetrie_brechung=True ergänzt die Nebenbedingungen aus Abschnitt 5.9.
+    linearisierung wählt die Formulierung der Typ-Produkte (Abschnitt 4).
+    big_m wählt die Big-M-Konstanten (siehe big_m_schranken).
+    presolve=True entfernt durch den Fahrplan festgelegte Variablen und
+    redundante Zeilen; die Zählung steht danach in model.presolve_bericht.
+    zeitaggregation=True rechnet auf Ereignisintervallen (siehe ereignisintervalle).
+    intervalle gibt ein eigenes Zeitraster vor (Startslots, z.B. stündlich für
+    mehrstufig.py); Touren werden dann nach außen auf dessen Grenzen gerundet.
+    aufloesung ist die Länge eines Basis-Slots in Minuten.
+    tage (z.B. WOCHE) plant mehrere aufeinanderfolgende Tage mit den Touren aus
+    WOCHENPLAN; Tourinstanzen heißen dann 'r@d' (Tour r an Tag d).
+    anzahl_lkw ist die Größe der LKW-Indexmenge K (obere Schranke der Flotte);
+    ohne Angabe Mindestflotte (größte Überlappung der Touren) + lkw_reserve.
+    vorfilter=True ergänzt den E-Vorfilter aus Abschnitt 5.10.
+    instanz ist eine Instanz (instanz.py) oder der Pfad einer full.csv-Datei
+    (None = DATEN_CSV).
+    veraenderlich=True legt VERAENDERLICHE_PARAMETER als mutable an (szenarien.py).
+    """
+
+    # ========================================================================
+    # MODELL INITIALISIERUNG
+    # ========================================================================
+
+    model = pyo.ConcreteModel(name="LKW_Flottenplanung")
+
+    if intervalle is None and zeitaggregation:
+        intervalle = ereignisintervalle(erweiterungen, ht_preis, nt_preis, aufloesung, tage, instanz)
+    baue_sets_und_parameter(model, erweiterungen, ht_preis, nt_preis, intervalle, aufloesung, tage, instanz,
+                            veraenderlich)
+    big_m_schranken(model, erweiterungen, big_m)
+
+    # LKWs: Mindestflotte (größte Clique) + lkw_reserve, falls nicht vorgegeben
+    model.mindestflotte = mindestflotte(model)
+    model.K = pyo.Set(initialize=range(1, flottengroesse(model, anzahl_lkw, lkw_reserve) + 1))
+
+    # --- Struktureller Presolve ---
+    # depart[k,z] ist nur in Slots mit Tourstart ungleich null; ohne ladefähigen
+    # E-Typ (Diesel-only) sind alle Ladevariablen null.
+    if presolve:
+        model.Z_depart = pyo.Set(initialize=[z for z in model.Z if len(model.R_start[z]) > 0])
+    else:
+        model.Z_depart = pyo.Set(initialize=model.Z)
+    laden_moeglich = not presolve or any(pyo.value(model.max_p_e[t]) > 0 for t in model.TE)
+
+    # ========================================================================
+    # 3️⃣ ENTSCHEIDUNGSVARIABLEN
+    # ========================================================================
+
+    # --- LKW-Typ-Zuordnung ---
+    model.type_assignment = pyo.Var(model.K, model.T, domain=pyo.Binary)
+
+    # LKW wird benutzt (mindestens eine Tour)
+    model.truck_used = pyo.Var(model.K, domain=pyo.Binary)
+
+    # Hilfsvariable für Linearisierung: truck_type_used[k,t] = truck_used[k] * type_assignment[k,t]
+    model.truck_type_used = pyo.Var(model.K, model.T, domain=pyo.Binary)
+
+    # --- Hilfsvariable für Linearisierung: a_type[r,k,t] = a[r,k] * type_assignment[k,t] ---
+    model.a_type = pyo.Var(model.R, model.K, model.T, domain=pyo.Binary)
+
+    # --- Zuordnung & Bewegung ---
+    model.a = pyo.Var(model.R, model.K, domain=pyo.Binary)
+    model.depart = pyo.Var(model.K, model.Z_depart, domain=pyo.Binary)
+
+    # --- Laden ---
+    model.assign = pyo.Var(model.K, model.L, model.Z, domain=pyo.Binary)
+    model.plug = pyo.Var(model.K, model.L, model.Z, domain=pyo.Binary)
+    model.real_p = pyo.Var(model.K, model.L, model.Z, domain=pyo.NonNegativeReals)
+    model.y_l = pyo.Var(model.L, domain=pyo.NonNegativeIntegers, bounds=(0, model.Nmax))
+
+    if not laden_moeglich:
+        for var in (model.assign, model.plug, model.real_p, model.y_l):
+            var.fix(0)
+
+    # --- Energiezustände ---
+    model.soc = pyo.Var(model.K, model.Z, domain=pyo.NonNegativeReals)
+
+    # ========================================================================
+    # 4️⃣ LINEARISIERUNG: a_type[r,k,t] = a[r,k] * type_assignment[k,t]
+    # ========================================================================
+
+    if linearisierung == 'disaggregiert':
+        # Disaggregiert: a[r,k] = Σ_t a_type[r,k,t], a_type[r,k,t] <= type_assignment[k,t]
+        def a_type_split_rule(model, r, k):
+            return model.a[r, k] == sum(model.a_type[r, k, t] for t in model.T)
+        model.con_a_type_split = pyo.Constraint(model.R, model.K, rule=a_type_split_rule)
+
+        def a_type_lin2_rule(model, r, k, t):
+            return model.a_type[r, k, t] <= model.type_assignment[k, t]
+        model.con_a_type_lin2 = pyo.Constraint(model.R, model.K, model.T, rule=a_type_lin2_rule)
+    else:
+        # Für ALLE Typen (TD und TE)
+        def a_type_lin1_rule(model, r, k, t):
+            return model.a_type[r, k, t] <= model.a[r, k]
+        model.con_a_type_lin1 = pyo.Constraint(model.R, model.K, model.T, rule=a_type_lin1_rule)
+
+        def a_type_lin2_rule(model, r, k, t):
+            return model.a_type[r, k, t] <= model.type_assignment[k, t]
+        model.con_a_type_lin2 = pyo.Constraint(model.R, model.K, model.T, rule=a_type_lin2_rule)
+
+        def a_type_lin3_rule(model, r, k, t):
+            return model.a_type[r, k, t] >= model.a[r, k] + model.type_assignment[k, t] - 1
+        model.con_a_type_lin3 = pyo.Constraint(model.R, model.K, model.T, rule=a_type_lin3_rule)
+
+    # ========================================================================
+    # 5️⃣ NEBENBEDINGUNGEN
+    # ========================================================================
+
+    # --- 5.0 LKW-TYP-ZUORDNUNG ---
+
+    def one_type_per_truck_rule(model, k):
+        return sum(model.type_assignment[k, t] for t in model.T) == 1
+    model.con_one_type_per_truck = pyo.Constraint(model.K, rule=one_type_per_truck_rule)
+
+    # --- 5.0b TRUCK_USED LOGIK ---
+
+    def truck_used_lower_rule(model, k):
+        return sum(model.a[r, k] for r in model.R) <= len(model.R) * model.truck_used[k]
+    model.con_truck_used_lower = pyo.Constraint(model.K, rule=truck_used_lower_rule)
+
+    def truck_used_upper_rule(model, k):
+        return model.truck_used[k] <= sum(model.a[r, k] for r in model.R)
+    model.con_truck_used_upper = pyo.Constraint(model.K, rule=truck_used_upper_rule)
+
+    # --- LINEARISIERUNG: truck_type_used[k,t] = truck_used[k] * type_assignment[k,t] ---
+
+    if linearisierung == 'disaggregiert':
+        def ttu_split_rule(model, k):
+            return model.truck_used[k] == sum(model.truck_type_used[k, t] for t in model.T)
+        model.con_ttu_split = pyo.Constraint(model.K, rule=ttu_split_rule)
+
+        def ttu_lin2_rule(model, k, t):
+            return model.truck_type_used[k, t] <= model.type_assignment[k, t]
+        model.con_ttu_lin2 = pyo.Constraint(model.K, model.T, rule=ttu_lin2_rule)
+    else:
+        def ttu_lin1_rule(model, k, t):
+            return model.truck_type_used[k, t] <= model.truck_used[k]
+        model.con_ttu_lin1 = pyo.Constraint(model.K, model.T, rule=ttu_lin1_rule)
+
+        def ttu_lin2_rule(model, k, t):
+            return model.truck_type_used[k, t] <= model.type_assignment[k, t]
+        model.con_ttu_lin2 = pyo.Constraint(model.K, model.T, rule=ttu_lin2_rule)
+
+        def ttu_lin3_rule(model, k, t):
+            return model.truck_type_used[k, t] >= model.truck_used[k] + model.type_assignment[k, t] - 1
+        model.con_ttu_lin3 = pyo.Constraint(model.K, model.T, rule=ttu_lin3_rule)
+
+    # --- 5.1 TOUR-ZUORDNUNG ---
+
+    def tour_assignment_rule(model, r):
+        return sum(model.a[r, k] for k in model.K) == 1
+    model.con_tour_assignment = pyo.Constraint(model.R, rule=tour_assignment_rule)
+
+    # --- 5.2 LKW-BEWEGUNGSLOGIK ---
+
+    # Eine Zeile pro (LKW, maximale Clique) - ersetzt die K×Z-Blöcke für
+    # gleichzeitige Touren und gleichzeitige Ankünfte
+    def no_concurrent_tours_rule(model, k, c):
+        return sum(model.a[r, k] for r in model.R_clique[c]) <= 1
+    model.con_no_concurrent_tours = pyo.Constraint(model.K, model.C, rule=no_concurrent_tours_rule)
+
+    def depart_definition_rule(model, k, z):
+        return model.depart[k, z] == sum(model.a[r, k] for r in model.R_start[z])
+    model.con_depart_definition = pyo.Constraint(model.K, model.Z_depart, rule=depart_definition_rule)
+
+    # --- 5.4 ENERGIE-DYNAMIK ---
+
+    # Energieverbrauch als Expression (JETZT LINEAR mit a_type)
+    # Verbrauch pro Basis-Slot × Anzahl Slots im Intervall
+    def cons_expr_rule(model, k, z):
+        return sum(
+            sum(
+                model.a_type[r, k, t] *
+                (model.dist[r] * model.avgEv_e[t] / model.dur_z[r]) * model.n_basis[z]
+                for r in model.R_active[z]
+            )
+            for t in model.TE
+        )
+    model.cons = pyo.Expression(model.K, model.Z, rule=cons_expr_rule)
+
+    # SOC-Dynamik
+    def soc_dynamics_rule(model, k, z):
+        if z == model.Z.last():
+            return pyo.Constraint.Skip
+        return (model.soc[k, model.Z.next(z)] == model.soc[k, z] - model.cons[k, z] +
+                sum(model.real_p[k, l, z] for l in model.L) * model.delta_t[z])
+    model.con_soc_dynamics = pyo.Constraint(model.K, model.Z, rule=soc_dynamics_rule)
+
+    # SOC-Obergrenze
+    def soc_upper_rule(model, k, z):
+        return model.soc[k, z] <= sum(model.type_assignment[k, t] * model.soc_e[t] for t in model.TE) + \
+                                   sum(model.type_assignment[k, t] * 1000 for t in model.TD)
+    model.con_soc_upper = pyo.Constraint(model.K, model.Z, rule=soc_upper_rule)
+
+    # KREISLAUF: Start = Ende
+    def soc_cycle_rule(model, k):
+        return model.soc[k, model.Z.first()] == model.soc[k, model.Z.last()]
+    model.con_soc_cycle = pyo.Constraint(model.K, rule=soc_cycle_rule)
+    # Neuer Code
+    #Gesamtbegrenzung Ladesäulen: maximal 3 Säulen insgesamt
+    def total_charger_limit_rule(model):
+        return sum(model.y_l[l] for l in model.L) <= model.Nmax
+    model.con_total_charger_limit = pyo.Constraint(rule=total_charger_limit_rule)
+
+    # --- 5.5 LADE-LOGIK ---
+    # 1. NEU: Nur laden wenn angesteckt
+    def charging_requires_assign_rule(model, k, l, z):
+        return model.real_p[k, l, z] <= model.assign[k, l, z] * model.M_laden[l]
+    model.con_charging_requires_assign = pyo.Constraint(model.K, model.L, model.Z, rule=charging_requires_assign_rule)
+
+    # ---
+    def charging_power_limit_rule(model, k, l, z):
+        return model.real_p[k, l, z] <= sum(model.type_assignment[k, t] * model.max_p_e[t] for t in model.T)
+    model.con_charging_power_limit = pyo.Constraint(model.K, model.L, model.Z, rule=charging_power_limit_rule)
+
+    def assign_requires_plug_rule(model, k, l, z):
+        return model.assign[k, l, z] <= model.plug[k, l, z]
+    model.con_assign_requires_plug = pyo.Constraint(model.K, model.L, model.Z, rule=assign_requires_plug_rule)
+
+    def one_charger_per_truck_rule(model, k, z):
+        return sum(model.plug[k, l, z] for l in model.L) <= 1
+    model.con_one_charger_per_truck = pyo.Constraint(model.K, model.Z, rule=one_charger_per_truck_rule)
+
+    def diesel_no_charging_rule(model, k, l, z):
+        # Presolve: folgt aus assign <= plug und diesel_no_plug
+        if presolve:
+            return pyo.Constraint.Skip
+        return model.assign[k, l, z] <= sum(model.type_assignment[k, t] for t in model.TE)
+    model.con_diesel_no_charging = pyo.Constraint(model.K, model.L, model.Z, rule=diesel_no_charging_rule)
+
+    def diesel_no_plug_rule(model, k, l, z):
+        return model.plug[k, l, z] <= sum(model.type_assignment[k, t] for t in model.TE)
+    model.con_diesel_no_plug = pyo.Constraint(model.K, model.L, model.Z, rule=diesel_no_plug_rule)
+
+    def no_charge_while_driving_rule(model, k, z):
+        return sum(model.plug[k, l, z] for l in model.L) <= 1 - sum(model.a[r, k] for r in model.R_active[z])
+    model.con_no_charge_while_driving = pyo.Constraint(model.K, model.Z, rule=no_charge_while_driving_rule)
+
+    def unplug_before_departure_rule(model, k, l, z):
+        if z == model.Z.last() or model.Z.next(z) not in model.Z_depart:
+            return pyo.Constraint.Skip
+        return model.plug[k, l, z] <= 1 - model.depart[k, model.Z.next(z)]
+    model.con_unplug_before_departure = pyo.Constraint(model.K, model.L, model.Z, rule=unplug_before_departure_rule)
+
+    def unplug_timing_rule(model, k, l, z):
+        # Presolve: bei unplug_ok = 1 gilt die Zeile für Binärvariablen immer
+        if z == model.Z.last() or (presolve and model.unplug_ok[z] == 1):
+            return pyo.Constraint.Skip
+        return model.plug[k, l, z] - model.plug[k, l, model.Z.next(z)] <= model.unplug_ok[z]
+    model.con_unplug_timing = pyo.Constraint(model.K, model.L, model.Z, rule=unplug_timing_rule)
+
+    # --- 5.6 LADESÄULEN-KAPAZITÄTEN ---
+
+    def charger_assign_capacity_rule(model, l, z):
+        return sum(model.assign[k, l, z] for k in model.K) <= model.y_l[l] * model.cs_l[l]
+    model.con_charger_assign_capacity = pyo.Constraint(model.L, model.Z, rule=charger_assign_capacity_rule)
+
+    def charger_plug_capacity_rule(model, l, z):
+        return sum(model.plug[k, l, z] for k in model.K) <= model.y_l[l] * model.cs_l[l]
+    model.con_charger_plug_capacity = pyo.Constraint(model.L, model.Z, rule=charger_plug_capacity_rule)
+
+    def charger_power_capacity_rule(model, l, z):
+        return sum(model.real_p[k, l, z] for k in model.K) <= model.y_l[l] * model.max_p_l[l]
+    model.con_charger_power_capacity = pyo.Constraint(model.L, model.Z, rule=charger_power_capacity_rule)
+
+    # --- 5.8 NETZ UND SPEICHER ---
+
+    def ladeleistung(model, z):
+        return sum(model.real_p[k, l, z] for k in model.K for l in model.L)
+    baue_netz_und_speicher(model, erweiterungen, ladeleistung)
+
+    # --- 5.9 SYMMETRIEBRECHUNG (optional) ---
+    # Die LKW-Indizes k sind austauschbar: jede Permutation einer Lösung ist
+    # wieder zulässig und gleich teuer. Gültige Repräsentanten-Auswahl:
+    #   (a) benutzte LKW zuerst:            truck_used[k-1] >= truck_used[k]
+    #   (b) Typen aufsteigend sortiert:     Rang(Typ k-1) <= Rang(Typ k)
+    #       (unbenutzte LKW übernehmen kostenlos den höchsten Rang)
+    #   (c) innerhalb eines Typ-Blocks lexikographisch nach der ersten Tour:
+    #       Tour r darf nur auf k, wenn k-1 (gleicher Typ) eine Tour vor r fährt
+    if symmetrie_brechung:
+        K_list = sorted(model.K)
+        K_prev = {K_list[i]: K_list[i - 1] for i in range(1, len(K_list))}
+        model.K_sym = pyo.Set(initialize=K_list[1:])
+        typ_rang = {t: i for i, t in enumerate(model.T)}
+        R_vorher = {r: list(model.R)[:i] for i, r in enumerate(model.R)}
+
+        def sym_truck_used_rule(model, k):
+            return model.truck_used[k] <= model.truck_used[K_prev[k]]
+        model.con_sym_truck_used = pyo.Constraint(model.K_sym, rule=sym_truck_used_rule)
+
+        def sym_type_order_rule(model, k):
+            return (sum(typ_rang[t] * model.type_assignment[K_prev[k], t] for t in model.T) <=
+                    sum(typ_rang[t] * model.type_assignment[k, t] for t in model.T))
+        model.con_sym_type_order = pyo.Constraint(model.K_sym, rule=sym_type_order_rule)
+
+        def sym_tour_order_rule(model, r, k, t):
+            return (model.a[r, k] <= sum(model.a[r2, K_prev[k]] for r2 in R_vorher[r]) +
+                    2 - model.type_assignment[k, t] - model.type_assignment[K_prev[k], t])
+        model.con_sym_tour_order = pyo.Constraint(model.R, model.K_sym, model.T, rule=sym_tour_order_rule)
+
+    # --- 5.10 E-VORFILTER (optional) ---
+    # Unabhängig von Laden und Netz unmögliche E-Zuordnungen vorab ausschließen:
+    # einzelne Touren über der Reichweite fixieren, unverträgliche Paare als
+    # No-Good-Schnitt je LKW (höchstens eine der beiden Touren mit Typ t)
+    n_fixiert = 0
+    if vorfilter:
+        zu_lang, paare = e_vorfilter(model)
+        for r, t in zu_lang:
+            for k in model.K:
+                model.a_type[r, k, t].fix(0)
+                n_fixiert += 1
+        model.E_paare = pyo.Set(initialize=paare, dimen=3)
+
+        def e_paar_rule(model, r1, r2, t, k):
+            return model.a_type[r1, k, t] + model.a_type[r2, k, t] <= 1
+        model.con_e_paar = pyo.Constraint(model.E_paare, model.K, rule=e_paar_rule)
+
+    # ========================================================================
+    # 6️⃣ ZIELFUNKTION (LINEARISIERT)
+    # ========================================================================
+
+    def objective_rule(model):
+        # C_trucks: NUR für benutzte LKWs
+        C_trucks = sum(
+            sum(model.truck_type_used[k, t] * (model.cap_d[t] + model.opx_d[t] + model.kfz_d[t]) for t in model.TD) +
+            sum(model.truck_type_used[k, t] * (model.cap_e[t] + model.opx_e[t]) for t in model.TE)
+            for k in model.K
+        )
+
+        C_chargers = sum(model.y_l[l] * (model.cap_l[l] + model.opx_l[l]) for l in model.L)
+
+        C_grid_trafo = 10000 * model.u
+
+        C_storage = (1 + model.opx_s) * (model.capP_s * model.p_s + model.capQ_s * model.q_s)
+
+        if erweiterungen:
+            # ERWEITERUNG 1: CO₂-Maut-Aufschlag hinzugefügt
+            C_diesel_var = model.jahresfaktor * sum(
+                model.a_type[r, k, t] * ((model.c_m_d + model.c_co2_maut[t]) * model.mDist[r] +
+                                          model.c_diesel * (model.dist[r]) * model.avgDv_d[t])
+                for r in model.R for k in model.K for t in model.TD
+            )
+
+            C_electricity = model.c_gr + model.cPeak * model.p_peak + \
+                            model.jahresfaktor * sum(model.c_e[z] * model.p_grid[z] * model.delta_t[z] for z in model.Z)
+        else:
+            C_diesel_var = model.jahresfaktor * sum(
+                model.a_type[r, k, t] * (model.c_m_d * model.mDist[r] +
+                                          model.c_diesel * (model.dist[r]) * model.avgDv_d[t])
+                for r in model.R for k in model.K for t in model.TD
+            )
+
+            C_electricity = model.c_gr + model.cPeak * model.p_peak + \
+                            model.jahresfaktor * model.c_e * sum(model.p_grid[z] * model.delta_t[z] for z in model.Z)
+
+        C_revenue = sum(
+            sum(model.truck_type_used[k, t] * model.thg_e[t] for t in model.TE)
+            for k in model.K
+        )
+
+        # ERWEITERUNG 3: PV-Anlage Kosten
+        C_pv = model.capex_pv * model.p_pv_cap if erweiterungen else 0
+
+        return C_trucks + C_chargers + C_grid_trafo + C_storage + C_diesel_var + C_electricity - C_revenue + C_pv
+
+    model.obj = pyo.Objective(rule=objective_rule, sense=pyo.minimize)
+
+    # --- Presolve-Bericht: gegenüber dem vollen Modell entfallene Einträge ---
+    n_kz = len(model.K) * len(model.Z)
+    n_klz = len(model.K) * len(model.L) * len(model.Z)
+    n_kl = len(model.K) * len(model.L)
+    model.presolve_bericht = {
+        'Variablen entfernt (depart)': n_kz - len(model.depart),
+        'Variablen fixiert (Laden, Diesel-only)': 0 if laden_moeglich else 3 * n_klz + len(model.L),
+        'con_depart_definition': n_kz - len(model.con_depart_definition),
+        'con_diesel_no_charging': n_klz - len(model.con_diesel_no_charging),
+        'con_unplug_before_departure': n_klz - n_kl - len(model.con_unplug_before_departure),
+        'con_unplug_timing': n_klz - n_kl - len(model.con_unplug_timing),
+        'a_type fixiert (E-Vorfilter)': n_fixiert,
+        'con_e_paar (E-Vorfilter, hinzugefügt)': len(model.con_e_paar) if vorfilter else 0,
+    }
+
+    # --- Flottenbericht: Größe der K-indizierten Blöcke ---
+    n_var_k = sum(len(v) for v in model.component_objects(pyo.Var) if lkw_indiziert(model, v))
+    n_con_k = sum(len(c) for c in model.component_objects(pyo.Constraint) if lkw_indiziert(model, c))
+    pro_lkw = (n_var_k / max(len(model.K), 1), n_con_k / max(len(model.K), 1))
+    model.flotten_bericht = {
+        'Mindestflotte (größte Überlappung)': model.mindestflotte,
+        'LKW-Indexmenge |K|': len(model.K),
+        'Variablen je LKW': round(pro_lkw[0]),
+        'Nebenbedingungen je LKW': round(pro_lkw[1]),
+        f'Variablen eingespart ggü. |K| = |R| = {len(model.R)}': round(pro_lkw[0] * (len(model.R) - len(model.K))),
+        f'Nebenbedingungen eingespart ggü. |K| = |R| = {len(model.R)}':
+            round(pro_lkw[1] * (len(model.R) - len(model.K))),
+    }
+
+    return model
+
+
+def presolve_ausgeben(model):
+    """Gibt aus, wie viele Variablen und Zeilen der Presolve und die Flottengröße K eingespart haben."""
+    print("\nPresolve (build_model):")
+    for name, anzahl in model.presolve_bericht.items():
+        print(f"  {name:<40} {anzahl:>8}")
+    print("\nLKW-Indexmenge K (build_model):")
+    for name, anzahl in model.flotten_bericht.items():
+        print(f"  {name:<50} {anzahl:>8}")
+    if len(model.K) < model.mindestflotte:
+        print(f"  WARNUNG: |K| = {len(model.K)} < Mindestflotte {model.mindestflotte} - Modell unzulässig!")
+
+
+def e_vorfilter(model):
+    """Vorab unzulässige E-Zuordnungen, unabhängig von Säulen und Netz.
+
+    Gibt (zu_lang, paare) zurück: zu_lang sind (r, t) mit dist·avgEv_e > soc_e
+    (während der Fahrt wird nicht geladen), paare sind (r1, r2, t) zweier
+    zeitlich verträglicher Touren, deren Energie nicht in soc_e plus die in
+    der kürzeren der beiden Standzeiten zwischen ihnen (im SOC-Kreislauf hin
+    und zurück) höchstens ladbare Energie passt. Ladbar ist eine Standzeit bis
+    zum letzten Intervall mit unplug_ok vor dem Intervall vor der Abfahrt, mit
+    höchstens min(max_p_e, Nmax·max max_p_l); das letzte Intervall zählt nicht
+    (SOC-Kreislauf).
+    """
+    Z = list(model.Z)
+    dauer = [pyo.value(model.delta_t[z]) for z in Z]
+    aktiv = {r: [] for r in model.R}
+    for i, z in enumerate(Z):
+        for r in model.R_active[z]:
+            aktiv[r].append(i)
+
+    def bis_abstecken(von, abfahrt):
+        """Stunden von Intervall von bis zum letzten erlaubten Abstecken vor abfahrt."""
+        ok = [j for j in range(von, abfahrt - 1) if model.unplug_ok[Z[j]] == 1]
+        return sum(dauer[von:ok[-1] + 1]) if ok else 0.0
+
+    energie = {(r, t): pyo.value(model.dist[r] * model.avgEv_e[t]) for r in model.R for t in model.TE}
+    zu_lang = [(r, t) for r in model.R for t in model.TE if energie[r, t] > pyo.value(model.soc_e[t])]
+
+    saeule = pyo.value(model.Nmax) * max(pyo.value(model.max_p_l[l]) for l in model.L)
+    touren = [r for r in model.R if aktiv[r]]
+    paare = []
+    for r1 in touren:
+        for r2 in touren:
+            if aktiv[r1][-1] >= aktiv[r2][0]:
+                continue
+            hin = bis_abstecken(aktiv[r1][-1] + 1, aktiv[r2][0])
+            zurueck = sum(dauer[aktiv[r2][-1] + 1:-1]) + bis_abstecken(0, aktiv[r1][0])
+            for t in model.TE:
+                if (r1, t) in zu_lang or (r2, t) in zu_lang:
+                    continue
+                leistung = min(pyo.value(model.max_p_e[t]), saeule)
+                if energie[r1, t] + energie[r2, t] > pyo.value(model.soc_e[t]) + leistung * min(hin, zurueck) + 1e-6:
+                    paare.append((r1, r2, t))
+    return zu_lang, paare
+
+
+def mindestflotte(model):
+    """Größte Clique des Intervallgraphen der Touren (= größte Überlappung =
+    chromatische Zahl), also die kleinste zulässige Flotte."""
+    return max((len(model.R_clique[c]) for c in model.C), default=min(1, len(model.R)))
+
+
+def flottengroesse(model, anzahl_lkw=None, lkw_reserve=LKW_RESERVE):
+    """Größe der LKW-Indexmenge K: anzahl_lkw oder Mindestflotte + lkw_reserve."""
+    return mindestflotte(model) + lkw_reserve if anzahl_lkw is None else anzahl_lkw
+
+
+def lkw_indiziert(model, komponente):
+    """True, wenn komponente (Var oder Constraint) über die LKW-Indexmenge K läuft."""
+    return komponente.is_indexed() and any(
+        m is model.K for m in komponente.index_set().subsets(expand_all_set_operators=False))
+
+
+def baue_sets_und_parameter(model, erweiterungen=False, ht_preis=0.27, nt_preis=0.22, intervalle=None,
+                            aufloesung=AUFLOESUNG, tage=None, instanz=None, veraenderlich=False):
+    """Legt Indexmengen (ohne LKW-Index K) und Parameter auf dem Modell an.
+
+    Wird von build_model und den alternativen Formulierungen gemeinsam genutzt.
+    aufloesung: Minuten pro Basis-Slot; Tour-Slots folgen aus den Uhrzeiten in full.csv.
+    intervalle: Startslots aggregierter Zeitintervalle (None = alle Basis-Slots).
+    Tourzeiten, die nicht auf Intervallgrenzen liegen, werden nach außen gerundet.
+    tage: Wochentage des Horizonts (Schlüssel von WOCHENPLAN), None = ein Tag.
+    instanz: Instanz oder Pfad einer full.csv-Datei (None = DATEN_CSV).
+    veraenderlich: VERAENDERLICHE_PARAMETER als mutable Parameter anlegen.
+    """
+    def mutable(name):
+        return veraenderlich and name in VERAENDERLICHE_PARAMETER
+
+    if not isinstance(instanz, Instanz):
+        instanz = lade_instanz(instanz if instanz is not None else DATEN_CSV)
+    if 60 % aufloesung != 0:
+        raise ValueError(f"aufloesung={aufloesung} min teilt keine Stunde")
+    slots_pro_tag = 24 * 60 // aufloesung
+    n_tage = 1 if tage is None else len(tage)
+    n_slots = n_tage * slots_pro_tag
+
+    def slot_um(stunde):
+        """Slot, der zur vollen Stunde beginnt (06:00 -> 25 bei 15 Minuten)."""
+        return stunde * 60 // aufloesung + 1
+
+    def tagesslot(z):
+        """Slot innerhalb seines Tages (Tageszeit von z im Horizont)."""
+        return (z - 1) % slots_pro_tag + 1
+
+    # ========================================================================
+    # 1️⃣ INDEXMENGEN (SETS)
+    # ========================================================================
+
+    # Touren (route_id-Abschnitt)
+    touren = instanz.touren.namen
+
+    # Mehrtägig: eine Tourinstanz 'r@d' je Tour r im WOCHENPLAN von Tag d
+    if tage is None:
+        tour_tag = {r: (r, 1) for r in touren}
+    else:
+        tour_tag = {}
+        for d, tag in enumerate(tage, start=1):
+            if tag not in WOCHENPLAN:
+                raise ValueError(f"Tag {tag!r} fehlt im WOCHENPLAN")
+            for r in touren if WOCHENPLAN[tag] is None else WOCHENPLAN[tag]:
+                if r not in touren:
+                    raise ValueError(f"WOCHENPLAN[{tag!r}]: unbekannte Tour {r!r}")
+                tour_tag[f"{r}@{d}"] = (r, d)
+    model.R = pyo.Set(initialize=list(tour_tag))
+
+    # Planungstage und Tag jeder Tour(instanz)
+    model.D = pyo.Set(initialize=range(1, n_tage + 1))
+    model.tag_r = pyo.Param(model.R, initialize={r: d for r, (_, d) in tour_tag.items()})
+    model.slots_pro_tag = pyo.Param(initialize=slots_pro_tag)
+
+    # Hochrechnung eines Horizonts auf ein Jahr: ein Tag = 260 Arbeitstage,
+    # mehrere Tage = Ausschnitt aus 52 Wochen à 7 Tagen
+    model.jahresfaktor = pyo.Param(initialize=260 if tage is None else 52 * 7 / n_tage)
+
+    # Diesel-LKW-Typen
+    model.TD = pyo.Set(initialize=instanz.diesel_lkw.namen)
+
+    # Elektro-LKW-Typen
+    model.TE = pyo.Set(initialize=instanz.e_lkw.namen)
+
+    # Alle LKW-Typen
+    model.T = model.TD | model.TE
+
+    # Ladesäulentypen
+    model.L = pyo.Set(initialize=instanz.saeulen.namen)
+
+    # Zeitintervalle (Startslot im Basisraster)
+    model.Z = pyo.Set(initialize=intervalle if intervalle is not None else range(1, n_slots + 1))  # 1...96
+
+    # Länge der Intervalle in Basis-Slots (ohne Aggregation überall 1)
+    Z_liste = list(model.Z)
+    model.n_basis = pyo.Param(model.Z, initialize={
+        z: naechster - z for z, naechster in zip(Z_liste, Z_liste[1:] + [n_slots + 1])
+    })
+
+    # Länge eines Basis-Slots in Stunden
+    model.delta_t_basis = pyo.Param(initialize=aufloesung / 60)
+
+    # Tagzeit (06:00-18:00)
+    model.Z_day = pyo.Set(initialize=[z for z in range(1, n_slots + 1)
+                                      if slot_um(6) <= tagesslot(z) < slot_um(18)])  # 25...72 je Tag
+
+    # Nachtzeit
+    model.Z_night = pyo.Set(initialize=[z for z in range(1, n_slots + 1) if z not in model.Z_day])
+
+    # ========================================================================
+    # 2️⃣ PARAMETER
+    # ========================================================================
+
+    # --- Tourenparameter ---
+
+    dist_data = instanz.touren.als_dict('distance_total')
+    model.dist = pyo.Param(model.R, initialize={r: dist_data[tour] for r, (tour, _) in tour_tag.items()})
+
+    mDist_data = instanz.touren.als_dict('distance_toll')
+    model.mDist = pyo.Param(model.R, initialize={r: mDist_data[tour] for r, (tour, _) in tour_tag.items()})
+
+    # Start-/Endslot aus starttime/endtime (full.csv): Start abrunden, Ende
+    # aufrunden; e_r ist der erste Slot nach der Tour (slots_pro_tag + 1 =
+    # Ankunft um Mitternacht bzw. im ersten Slot des Folgetags)
+    startzeit = instanz.touren.als_dict('starttime')
+    endzeit = instanz.touren.als_dict('endtime')
+    s_r_data = {r: startzeit[tour] // aufloesung + 1 for r, (tour, _) in tour_tag.items()}
+    e_r_data = {r: -(-endzeit[tour] // aufloesung) + 1 for r, (tour, _) in tour_tag.items()}
+    for r in model.R:
+        if not s_r_data[r] < e_r_data[r] <= slots_pro_tag + 1:
+            raise ValueError(f"Tour {r}: Zeiten über Mitternacht werden nicht unterstützt")
+    # Verschiebung um die vorherigen Tage des Horizonts
+    s_r_data = {r: s + (tour_tag[r][1] - 1) * slots_pro_tag for r, s in s_r_data.items()}
+    e_r_data = {r: e + (tour_tag[r][1] - 1) * slots_pro_tag for r, e in e_r_data.items()}
+
+    if intervalle is not None:
+        # Grobes Raster: Start ab-, Ende aufrunden (Tour belegt das ganze Intervall);
+        # ein Ende im letzten Intervall wird auf das Horizontende n_slots + 1 gerundet
+        s_r_data = {r: max(z for z in intervalle if z <= s) for r, s in s_r_data.items()}
+        e_r_data = {r: min((z for z in intervalle if z >= e), default=n_slots + 1) for r, e in e_r_data.items()}
+
+    model.s_r = pyo.Param(model.R, initialize=s_r_data)
+    model.e_r = pyo.Param(model.R, initialize=e_r_data)
+
+    def dur_z_init(model, r):
+        return model.e_r[r] - model.s_r[r]
+    model.dur_z = pyo.Param(model.R, initialize=dur_z_init)
+
+    # --- Dünnbesetzte Tour-Slot-Zuordnung ---
+    # Statt dichter R×Z-Parameter (fast nur Nullen) werden nur die tatsächlich
+    # belegten Tour-Slots gespeichert: pro Tour der Slot-Bereich, pro Slot die
+    # Touren, die dort starten, enden oder unterwegs sind.
+
+    def Z_active_init(model, r):
+        return [z for z in model.Z if model.s_r[r] <= z < model.e_r[r]]
+    model.Z_active = pyo.Set(model.R, initialize=Z_active_init)  # s_r <= z < e_r
+
+    R_start_data = {z: [] for z in model.Z}
+    R_end_data = {z: [] for z in model.Z}
+    R_active_data = {z: [] for z in model.Z}
+    for r in model.R:
+        R_start_data[model.s_r[r]].append(r)
+        if model.e_r[r] in R_end_data:   # Ankunft am Horizontende hat keinen Slot
+            R_end_data[model.e_r[r]].append(r)
+        for z in model.Z_active[r]:
+            R_active_data[z].append(r)
+
+    model.R_start = pyo.Set(model.Z, initialize=R_start_data)    # Touren mit Start in z
+    model.R_end = pyo.Set(model.Z, initialize=R_end_data)        # Touren mit Ankunft in z
+    model.R_active = pyo.Set(model.Z, initialize=R_active_data)  # Touren unterwegs in z
+
+    # --- Konfliktgraph der Touren: maximale Cliquen ---
+    # Zwei Touren stehen in Konflikt, wenn sich [s_r, e_r) überschneiden oder
+    # beide im selben Slot ankommen. Im Intervallgraphen ist jede maximale Clique
+    # die Menge der aktiven Touren an einem Startzeitpunkt, auf den bis zum
+    # nächsten Start mindestens eine Ankunft folgt. Statt K×Z Zeilen genügt damit
+    # eine Nebenbedingung pro (LKW, maximale Clique).
+
+    cliquen_data = maximale_cliquen(model)
+    model.C = pyo.Set(initialize=range(1, len(cliquen_data) + 1))
+    model.R_clique = pyo.Set(model.C, initialize={c: cliquen_data[c - 1] for c in model.C})
+
+    # --- Diesel-LKW-Parameter ---
+
+    model.cap_d = pyo.Param(model.TD, initialize=instanz.diesel_lkw.als_dict('capex_yearly'))
+    model.opx_d = pyo.Param(model.TD, initialize=instanz.diesel_lkw.als_dict('opex_yearly'))
+    model.kfz_d = pyo.Param(model.TD, initialize=instanz.diesel_lkw.als_dict('kfz_yearly'))
+    model.avgDv_d = pyo.Param(model.TD, initialize=instanz.diesel_lkw.als_dict('avg_diesel_per_100km', 100))
+    model.c_diesel = pyo.Param(initialize=1.5, mutable=mutable('c_diesel'))
+    model.c_m_d = pyo.Param(initialize=0.34, mutable=mutable('c_m_d'))
+
+    if erweiterungen:
+        # ====================================================================
+        # ERWEITERUNG 1: CO₂-MAUT-AUFSCHLAG (basierend auf co2_emission_class aus CSV)
+        # ====================================================================
+        # Aufschläge pro CO₂-Emissionsklasse (€/km, Stand 2024)
+        co2_maut_aufschlag = {
+            1: 0.158,  # Schlechteste Klasse
+            2: 0.142,
+            3: 0.126,
+            4: 0.079,
+            5: 0.000   # Beste Klasse
+        }
+
+        model.c_co2_maut = pyo.Param(model.TD, initialize={t: co2_maut_aufschlag[1] for t in model.TD},
+                                     mutable=mutable('c_co2_maut'))
+
+    # --- Elektro-LKW-Parameter ---
+
+    model.cap_e = pyo.Param(model.TE, initialize=instanz.e_lkw.als_dict('capex_yearly'))
+    model.opx_e = pyo.Param(model.TE, initialize=instanz.e_lkw.als_dict('opex_yearly'))
+    model.avgEv_e = pyo.Param(model.TE, initialize=instanz.e_lkw.als_dict('avg_energy_kWh_per_100km', 100))
+    model.soc_e = pyo.Param(model.TE, initialize=instanz.e_lkw.als_dict('soc_max_kWh'))
+    model.thg_e = pyo.Param(model.TE, initialize=instanz.e_lkw.als_dict('thg_yearly'))
+
+    # Diesel-LKW laden nicht
+    max_p_e_data = {**instanz.e_lkw.als_dict('max_power'), **{t: 0 for t in model.TD}}
+    model.max_p_e = pyo.Param(model.T, initialize=max_p_e_data)
+
+    # --- Ladesäulen-Parameter ---
+
+    model.cap_l = pyo.Param(model.L, initialize=instanz.saeulen.als_dict('capex_yearly'))
+    model.opx_l = pyo.Param(model.L, initialize=instanz.saeulen.als_dict('opex_yearly'))
+    model.max_p_l = pyo.Param(model.L, initialize=instanz.saeulen.als_dict('max_power'))
+    model.cs_l = pyo.Param(model.L, initialize=instanz.saeulen.als_dict('charging_spots'))
+
+    # --- Netz- und Speicherparameter ---
+
+    model.p_grid_max = pyo.Param(initialize=500, mutable=mutable('p_grid_max'))
+    model.capP_s = pyo.Param(initialize=30)
+    model.capQ_s = pyo.Param(initialize=350)
+    model.opx_s = pyo.Param(initialize=0.02)
+    model.nrt = pyo.Param(initialize=0.98)
+    model.dod = pyo.Param(initialize=0.025)
+
+    if erweiterungen:
+        # ====================================================================
+        # ERWEITERUNG 2: ZEITVARIABLE STROMPREISE (HT/NT-Tarif)
+        # ====================================================================
+        def c_e_init(model, z):
+            if slot_um(6) <= tagesslot(z) < slot_um(22):  # 06:00 - 22:00 (Hochtarif)
+                return ht_preis
+            else:              # 22:00 - 06:00 (Niedrigtarif)
+                return nt_preis
+
+        model.c_e = pyo.Param(model.Z, initialize=c_e_init, mutable=mutable('c_e'))
+    else:
+        model.c_e = pyo.Param(initialize=0.25, mutable=mutable('c_e'))
+    model.c_gr = pyo.Param(initialize=1000, mutable=mutable('c_gr'))
+    model.cPeak = pyo.Param(initialize=150, mutable=mutable('cPeak'))
+    model.Nmax = pyo.Param(initialize=3)
+
+    def delta_t_init(model, z):
+        return aufloesung / 60 * model.n_basis[z]  # Intervalllänge in Stunden
+    model.delta_t = pyo.Param(model.Z, initialize=delta_t_init)
+
+    model.z6 = pyo.Param(initialize=slot_um(6))
+
+    # Umstecken am Ende von Intervall z, also nach seinem letzten Basis-Slot
+    def unplug_ok_init(model, z):
+        z = z + model.n_basis[z] - 1
+        if z in model.Z_day:
+            return 1
+        elif tagesslot(z) + 1 == model.z6:
+            return 1
+        else:
+            return 0
+    model.unplug_ok = pyo.Param(model.Z, initialize=unplug_ok_init)
+
+    if erweiterungen:
+        # --- PV-Anlage ---
+        model.p_pv_cap = pyo.Var(domain=pyo.NonNegativeReals, bounds=(0, 500))  # Installierte PV-Leistung kWp
+
+        # ====================================================================
+        # ERWEITERUNG 3: PV-ANLAGE
+        # ====================================================================
+
+        model.capex_pv = pyo.Param(initialize=70, mutable=mutable('capex_pv')) #jährliche Kosten, runtergerechnet Instandhaltung, anschaffungskosten usw.. pro KW (Groesse)
+
+        # PV-Erzeugungsprofil (normiert 0-1, typischer Sommertag)
+        def pv_basis(z):
+            hour = (tagesslot(z) - 1) * aufloesung / 60  # Slot z in Stunden umrechnen
+            if hour < 6 or hour >= 20:      # Nacht: keine Erzeugung
+                return 0.0
+            elif 6 <= hour < 8:             # Sonnenaufgang
+                return (hour - 6) / 2 * 0.4
+            elif 8 <= hour < 10:            # Vormittag früh
+                return 0.4 + (hour - 8) / 2 * 0.3
+            elif 10 <= hour < 12:           # Vormittag spät
+                return 0.7 + (hour - 10) / 2 * 0.3
+            elif 12 <= hour < 14:           # Mittag (Maximum)
+                return 1.0
+            elif 14 <= hour < 16:           # Nachmittag früh
+                return 1.0 - (hour - 14) / 2 * 0.2
+            elif 16 <= hour < 18:           # Nachmittag spät
+                return 0.8 - (hour - 16) / 2 * 0.4
+            elif 18 <= hour < 20:           # Sonnenuntergang
+                return 0.4 - (hour - 18) / 2 * 0.4
+            else:
+                return 0.0
+
+        # Mittelwert über die Basis-Slots des Intervalls
+        def pv_profile_init(model, z):
+            return sum(pv_basis(b) for b in range(z, z + model.n_basis[z])) / model.n_basis[z]
+
+        model.pv_profile = pyo.Param(model.Z, initialize=pv_profile_init)
+
+        # PV-Erzeugung pro Zeitintervall
+        def p_pv_rule(model, z):
+            return model.p_pv_cap * model.pv_profile[z]
+        model.p_pv = pyo.Expression(model.Z, rule=p_pv_rule)
+
+
+def ereignisintervalle(erweiterungen=False, ht_preis=0.27, nt_preis=0.22, aufloesung=AUFLOESUNG, tage=None,
+                       instanz=None):
+    """Startslots der Ereignisintervalle für die Zeitaggregation.
+
+    Aufeinanderfolgende Basis-Slots werden zusammengefasst, solange keine
+    Tour startet oder endet und sich unplug_ok, Strompreis und PV-Profil nicht
+    ändern. Tourzeiten bleiben damit exakt; innerhalb eines Intervalls sind
+    Stecken und Ladeleistung konstant. Der letzte Slot bleibt einzeln, damit
+    soc_cycle und storage_neutral dieselbe Bedeutung wie im Basisraster haben.
+    """
+    basis = pyo.ConcreteModel()
+    baue_sets_und_parameter(basis, erweiterungen, ht_preis, nt_preis, aufloesung=aufloesung, tage=tage,
+                            instanz=instanz)
+
+    def exogene_daten(z):
+        if erweiterungen:
+            return basis.unplug_ok[z], basis.c_e[z], basis.pv_profile[z]
+        return basis.unplug_ok[z]
+
+    grenzen = {basis.Z.first(), basis.Z.last()}
+    grenzen |= {basis.s_r[r] for r in basis.R} | {basis.e_r[r] for r in basis.R if basis.e_r[r] in basis.Z}
+    grenzen |= {z for z in basis.Z if z != basis.Z.first() and exogene_daten(z) != exogene_daten(basis.Z.prev(z))}
+    return sorted(grenzen)
+
+
+def auf_basisraster(model, basis):
+    """Überträgt die Lösung eines zeitaggregierten Modells auf das Basisraster.
+
+    basis ist ein ungelöstes build_model(..., zeitaggregation=False) mit denselben
+    Optionen; es wird mit der expandierten Lösung gefüllt und zurückgegeben, sodass
+    die Auswertungen in main.py/Teilaufgabe4.py unverändert laufen. Leistungen und
+    Binärentscheidungen gelten im ganzen Intervall, Speicherstände (soc, soc_s)
+    werden linear interpoliert (konstante Leistung im Intervall).
+    """
+    intervall = {}
+    for z in model.Z:
+        for b in range(z, z + model.n_basis[z]):
+            intervall[b] = z
+
+    zustaende = {'soc', 'soc_s'}
+    for var_basis in basis.component_objects(pyo.Var):
+        var = model.component(var_basis.local_name)
+        zeitindex = (list(var_basis.index_set().subsets(expand_all_set_operators=False))[-1]
+                     if var_basis.is_indexed() else None)
+        zeitindiziert = zeitindex is basis.Z or zeitindex is basis.Z_depart
+        for index, v in var_basis.items():
+            if v.fixed:
+                continue
+            if not zeitindiziert:
+                v.set_value(var[index].value, skip_validation=True)
+                continue
+            index = index if isinstance(index, tuple) else (index,)
+            b = index[-1]
+            z = intervall[b]
+            wert = var[index[:-1] + (z,)].value
+            if var_basis.local_name in zustaende and wert is not None and z != model.Z.last():
+                wert_ende = var[index[:-1] + (model.Z.next(z),)].value
+                wert = wert + (b - z) / model.n_basis[z] * (wert_ende - wert)
+            v.set_value(wert, skip_validation=True)
+    return basis
+
+
+def big_m_schranken(model, erweiterungen, big_m=BIG_M):
+    """Big-M-Konstanten der Lade- und Speicherlogik als Parameter.
+
+    big_m='auto' leitet je Nebenbedingung die kleinste gültige Schranke aus
+    den Parametern ab, big_m='fest' verwendet den alten Pauschalwert 10000.
+    Kleinere M verschärfen die LP-Relaxierung und verbessern die Numerik.
+    """
+    if big_m == 'fest':
+        model.M_laden = pyo.Param(model.L, initialize=10000)
+        model.M_speicher_laden = pyo.Param(initialize=10000)
+        model.M_speicher_entladen = pyo.Param(initialize=10000)
+        return
+
+    # Ladeleistung je LKW und Säulentyp: begrenzt durch die Fahrzeug-Ladeleistung
+    # und durch die Leistung aller Säulen des Typs (y_l <= Nmax)
+    max_p_lkw = max(pyo.value(model.max_p_e[t]) for t in model.T)
+    model.M_laden = pyo.Param(model.L, initialize={
+        l: min(max_p_lkw, pyo.value(model.Nmax) * pyo.value(model.max_p_l[l])) for l in model.L
+    })
+
+    # Speicher laden (mode_s = 1, also p_e_s = 0): p_l_s = p_grid - Ladeleistung + p_pv
+    # <= p_grid_max + 500 (Trafo-Ausbau u) + maximale PV-Erzeugung
+    p_pv_max = 0
+    if erweiterungen:
+        p_pv_max = model.p_pv_cap.ub * max(pyo.value(model.pv_profile[z]) for z in model.Z)
+    if model.p_grid_max.mutable:
+        # Veränderliches p_grid_max (szenarien.py): M folgt dem Parameter
+        model.M_speicher_laden = pyo.Expression(expr=model.p_grid_max + 500 + p_pv_max)
+    else:
+        model.M_speicher_laden = pyo.Param(initialize=pyo.value(model.p_grid_max) + 500 + p_pv_max)
+
+    # Speicher entladen (mode_s = 0, also p_l_s = 0): wegen p_grid >= 0 höchstens die
+    # LKW-Ladeleistung, und die ist durch Nmax Säulen der stärksten Art begrenzt
+    model.M_speicher_entladen = pyo.Param(
+        initialize=pyo.value(model.Nmax) * max(pyo.value(model.max_p_l[l]) for l in model.L))
+
+
+def baue_netz_und_speicher(model, erweiterungen, ladeleistung):
+    """Abschnitt 5.8: Netzanschluss und stationärer Speicher.
+
+    ladeleistung(model, z) liefert die gesamte LKW-Ladeleistung im Intervall z;
+    damit nutzen LKW-indiziertes Modell und Fluss-Formulierung denselben Block.
+    """
+
+    # --- Speicherbetrieb ---
+    model.p_s = pyo.Var(domain=pyo.NonNegativeReals)
+    model.q_s = pyo.Var(domain=pyo.NonNegativeReals)
+    model.p_l_s = pyo.Var(model.Z, domain=pyo.NonNegativeReals)
+    model.p_e_s = pyo.Var(model.Z, domain=pyo.NonNegativeReals)
+    model.soc_s = pyo.Var(model.Z, domain=pyo.NonNegativeReals)
+    model.mode_s = pyo.Var(model.Z, domain=pyo.Binary)
+
+    # --- Netz ---
+    model.p_grid = pyo.Var(model.Z, domain=pyo.NonNegativeReals)
+    model.p_peak = pyo.Var(domain=pyo.NonNegativeReals)
+    model.u = pyo.Var(domain=pyo.Binary)
+
+    def grid_balance_rule(model, z):
+        p_pv = model.p_pv[z] if erweiterungen else 0
+        return (model.p_grid[z] == ladeleistung(model, z) +
+                model.p_l_s[z] - model.p_e_s[z] - p_pv)
+    model.con_grid_balance = pyo.Constraint(model.Z, rule=grid_balance_rule)
+
+    def grid_limit_rule(model, z):
+        return model.p_grid[z] <= model.p_grid_max + 500 * model.u
+    model.con_grid_limit = pyo.Constraint(model.Z, rule=grid_limit_rule)
+
+    def peak_power_rule(model, z):
+        return model.p_grid[z] <= model.p_peak
+    model.con_peak_power = pyo.Constraint(model.Z, rule=peak_power_rule)
+
+    def storage_dynamics_rule(model, z):
+        if z == model.Z.last():
+            return pyo.Constraint.Skip
+        return (model.soc_s[model.Z.next(z)] == model.soc_s[z] + model.p_l_s[z] * model.delta_t[z] -
+                (1/model.nrt) * model.p_e_s[z] * model.delta_t[z])
+    model.con_storage_dynamics = pyo.Constraint(model.Z, rule=storage_dynamics_rule)
+
+    def storage_neutral_rule(model):
+        return model.soc_s[model.Z.first()] == model.soc_s[model.Z.last()]
+    model.con_storage_neutral = pyo.Constraint(rule=storage_neutral_rule)
+
+    def storage_capacity_rule(model, z):
+        return model.soc_s[z] <= model.q_s
+    model.con_storage_capacity = pyo.Constraint(model.Z, rule=storage_capacity_rule)
+
+    def storage_reserve_rule(model, z):
+        return model.soc_s[z] >= model.dod * model.q_s
+    model.con_storage_reserve = pyo.Constraint(model.Z, rule=storage_reserve_rule)
+
+    def storage_charge_mode_rule(model, z):
+        return model.p_l_s[z] <= model.p_s
+    model.con_storage_charge_mode = pyo.Constraint(model.Z, rule=storage_charge_mode_rule)
+
+    def storage_charge_mode_binary_rule(model, z):
+        return model.p_l_s[z] <= model.M_speicher_laden * model.mode_s[z]
+    model.con_storage_charge_mode_binary = pyo.Constraint(model.Z, rule=storage_charge_mode_binary_rule)
+
+    def storage_discharge_mode_rule(model, z):
+        return model.p_e_s[z] <= model.p_s
+    model.con_storage_discharge_mode = pyo.Constraint(model.Z, rule=storage_discharge_mode_rule)
+
+    def storage_discharge_mode_binary_rule(model, z):
+        return model.p_e_s[z] <= model.M_speicher_entladen * (1 - model.mode_s[z])
+    model.con_storage_discharge_mode_binary = pyo.Constraint(model.Z, rule=storage_discharge_mode_binary_rule)
+
+
+def maximale_cliquen(model):
+    """Maximale Cliquen des Tour-Konfliktgraphen (sortierte Tourlisten)."""
+    starts = sorted(z for z in model.Z if len(model.R_start[z]) > 0)
+    kandidaten = []
+    for i, z in enumerate(starts):
+        clique = set(model.R_active[z])
+        naechster_start = starts[i + 1] if i + 1 < len(starts) else None
+        if naechster_start is None or min(model.e_r[r] for r in clique) <= naechster_start:
+            kandidaten.append(clique)
+    # Gleichzeitige Ankünfte (nur bei Touren ohne Dauer nicht schon abgedeckt)
+    kandidaten += [set(model.R_end[z]) for z in model.Z if len(model.R_end[z]) > 1]
+    cliquen = []
+    for c in kandidaten:
+        if len(c) > 1 and not any(c < d for d in kandidaten) and c not in cliquen:
+            cliquen.append(c)
+    return [sorted(c, key=lambda r: (model.s_r[r], r)) for c in cliquen]
+
+
+# ============================================================================
+# 7️⃣ SOLVER
+# ============================================================================
+
+# Name der Zeitlimit-Option (Sekunden) je Solver aus waehle_solver
+ZEITLIMIT_OPTION = {'Gurobi': 'TimeLimit', 'HiGHS': 'time_limit', 'CBC': 'seconds', 'GLPK': 'tmlim'}
+
+
+def waehle_solver(zeitlimit):
+    """Wählt den besten verfügbaren Solver (Gurobi > HiGHS > CBC > GLPK).
+
+    Gibt (solver, solver_name) zurück; die Solver-Optionen inkl. Zeitlimit
+    (Sekunden) sind bereits gesetzt.
+    """
+    solver = None
+    solver_name = None
+
+    # Versuche zuerst Gurobi (beste Löserqualität)
+    try:
+        solver = SolverFactory('gurobi')
+        if solver.available():
+            solver_name = 'Gurobi'
+            print(f"Verwende Solver: {solver_name}")
+    except:
+        pass
+
+    # Falls Gurobi nicht verfügbar, versuche HiGHS
+    if solver is None or not solver.available():
+        try:
+            solver = SolverFactory('appsi_highs')
+            if solver.available():
+                solver_name = 'HiGHS'
+                print(f"Verwende Solver: {solver_name}")
+        except:
+            pass
+
+    # Falls HiGHS nicht verfügbar, CBC
+    if solver is None or not solver.available():
+        try:
+            solver = SolverFactory('cbc')
+            if solver.available():
+                solver_name = 'CBC'
+                print(f"Verwende Solver: {solver_name}")
+        except:
+            pass
+
+    # Falls CBC nicht verfügbar, GLPK
+    if solver is None or not solver.available():
+        try:
+            solver = SolverFactory('glpk')
+            if solver.available():
+                solver_name = 'GLPK'
+                print(f"Verwende Solver: {solver_name}")
+        except:
+            pass
+
+    # Solver-Optionen
+    if solver_name in ZEITLIMIT_OPTION:
+        solver.options[ZEITLIMIT_OPTION[solver_name]] = zeitlimit
+    if solver_name == 'Gurobi':
+        solver.options['OutputFlag'] = 1
+    elif solver_name == 'HiGHS':
+        solver.options['log_to_console'] = True
+    elif solver_name == 'CBC':
+        solver.options['heuristics'] = 'on'
+        solver.options['round'] = 'on'
+        solver.options['feas'] = 'on'
+        solver.options['cuts'] = 'on'
+
+    return solver, solver_name
@@ -0,0 +1,162 @@
+# ============================================================================
+# MODELL-CACHE: SOLVER-DATEI (LP/MPS) JE INSTANZ UND MODELLOPTIONEN
+# Aufruf: python modellcache.py [--zeitlimit 3600] [--erweiterungen] [--format lp]
+#                               [--instanz full.csv] [--ordner modellcache] [--leeren]
+#
+# Der Schlüssel ist ein SHA-256 über den Inhalt der Instanzdatei, die
+# build_model-Optionen und den Quelltext von modell.py und instanz.py (damit
+# auch geänderte "HIER ÄNDERN!"-Konstanten oder Nebenbedingungen einen neuen
+# Eintrag ergeben). Je Schlüssel liegen im Cache-Ordner:
+#   <schluessel>.lp / .mps   die von Pyomo geschriebene Solver-Datei
+#   <schluessel>.json        Namenszuordnung Spaltenname -> (Variable, Index)
+#                            und die im Modellaufbau fixierten Variablen
+# Bei einem Treffer wird kein Pyomo-Modell gebaut: HiGHS (highspy) liest die
+# Datei direkt, die Lösung kommt als {(Variable, Index): Wert} zurück.
+# ============================================================================
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+import highspy
+import pyomo.environ as pyo
+
+import instanz as instanz_modul
+import modell
+from modell import build_model, DATEN_CSV
+
+CACHE_ORDNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modellcache')
+
+# Quelltexte, deren Änderung das Modell verändern kann
+QUELLEN = (modell.__file__, instanz_modul.__file__)
+
+
+def schluessel(optionen):
+    """SHA-256 über Instanzdatei, build_model-Optionen und Modell-Quelltext."""
+    # Nicht angegebene Optionen mit ihren Standardwerten, damit gleiche Modelle gleich heißen
+    gebunden = inspect.signature(build_model).bind(**optionen)
+    gebunden.apply_defaults()
+    optionen = dict(gebunden.arguments)
+    pfad = optionen.pop('instanz', None)
+    pfad = getattr(pfad, 'pfad', pfad) or DATEN_CSV
+    h = hashlib.sha256()
+    for datei in (pfad,) + QUELLEN:
+        with open(datei, 'rb') as f:
+            h.update(f.read())
+    h.update(json.dumps(optionen, sort_keys=True, default=repr).encode('utf-8'))
+    return h.hexdigest()[:24]
+
+
+def als_liste(index):
+    return list(index) if isinstance(index, tuple) else index
+
+
+def als_index(wert):
+    return tuple(wert) if isinstance(wert, list) else wert
+
+
+def schreibe_eintrag(model, basis, format='lp'):
+    """Schreibt Solver-Datei und Namenszuordnung von model nach basis.<format>/.json."""
+    # Format ergibt sich aus der Dateiendung
+    datei, smap_id = model.write(f"{basis}.{format}", io_options={'symbolic_solver_labels': True})
+    spalten = {}
+    for symbol, v in model.solutions.symbol_map[smap_id].bySymbol.items():
+        # nur Modellvariablen (nicht Zielfunktion, Zeilen oder ONE_VAR_CONSTANT)
+        if v.ctype is pyo.Var and v.parent_block() is not None:
+            spalten[symbol] = [v.parent_component().local_name, als_liste(v.index())]
+    fest = [[v.parent_component().local_name, als_liste(v.index()), v.value]
+            for v in model.component_data_objects(pyo.Var) if v.fixed]
+    with open(f"{basis}.json", 'w', encoding='utf-8') as f:
+        json.dump({'format': format, 'spalten': spalten, 'fest': fest}, f)
+    return datei
+
+
+def modell_datei(ordner=CACHE_ORDNER, format='lp', **optionen):
+    """Pfad der Solver-Datei und Namenszuordnung; baut das Modell nur ohne Cache-Eintrag.
+
+    Gibt (datei, zuordnung, treffer) zurück; optionen gehen an build_model.
+    """
+    os.makedirs(ordner, exist_ok=True)
+    basis = os.path.join(ordner, schluessel(optionen))
+    datei = f"{basis}.{format}"
+    treffer = os.path.exists(datei) and os.path.exists(f"{basis}.json")
+    if not treffer:
+        model = build_model(**optionen)
+        schreibe_eintrag(model, basis, format)
+    with open(f"{basis}.json", encoding='utf-8') as f:
+        zuordnung = json.load(f)
+    return datei, zuordnung, treffer
+
+
+def zuordne(zuordnung, paare):
+    """(Spaltenname, Wert)-Paare des Solvers als {(Variable, Index): Wert} inkl. fixierter Variablen."""
+    werte = {(name, als_index(index)): wert for name, index, wert in zuordnung['fest']}
+    spalten = zuordnung['spalten']
+    for name, wert in paare:
+        if name in spalten:
+            variable, index = spalten[name]
+            werte[variable, als_index(index)] = wert
+    return werte
+
+
+def loese_datei(datei, zuordnung, zeitlimit=3600, tee=False):
+    """Löst die Solver-Datei mit HiGHS; gibt {(Variable, Index): Wert}, Zielwert, Schranke, Status zurück."""
+    h = highspy.Highs()
+    h.setOptionValue('output_flag', tee)
+    h.setOptionValue('time_limit', float(zeitlimit))
+    h.readModel(datei)
+    h.run()
+    status = h.modelStatusToString(h.getModelStatus())
+    info = h.getInfo()
+    if info.primal_solution_status == 0:   # keine zulässige Lösung
+        return None, None, None, status
+
+    werte = zuordne(zuordnung, zip(h.getLp().col_names_, h.getSolution().col_value))
+    schranke = info.mip_dual_bound if h.getLp().integrality_ else info.objective_function_value
+    return werte, info.objective_function_value, schranke, status
+
+
+def loese_mit_cache(zeitlimit=3600, ordner=CACHE_ORDNER, format='lp', tee=False, **optionen):
+    """Solver-Datei aus dem Cache (oder neu) lösen; gibt ein Ergebnis-dict zurück."""
+    start = time.perf_counter()
+    datei, zuordnung, treffer = modell_datei(ordner, format, **optionen)
+    aufbau = time.perf_counter() - start
+    werte, zielwert, schranke, status = loese_datei(datei, zuordnung, zeitlimit, tee)
+    return {'werte': werte, 'zielwert': zielwert, 'schranke': schranke, 'status': status,
+            'treffer': treffer, 'datei': datei, 'aufbau': aufbau,
+            'loesung': time.perf_counter() - start - aufbau}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LKW-Modell über den Modell-Cache lösen")
+    parser.add_argument('--zeitlimit', type=int, default=3600, help="Zeitlimit in Sekunden")
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    parser.add_argument('--format', choices=['lp', 'mps'], default='lp', help="Format der Solver-Datei")
+    parser.add_argument('--instanz', help="full.csv-Datei (Standard: DATEN_CSV)")
+    parser.add_argument('--ordner', default=CACHE_ORDNER, help="Cache-Ordner")
+    parser.add_argument('--leeren', action='store_true', help="Cache-Ordner vorher löschen")
+    args = parser.parse_args()
+
+    if args.leeren and os.path.isdir(args.ordner):
+        shutil.rmtree(args.ordner)
+    optionen = {'erweiterungen': args.erweiterungen}
+    if args.instanz:
+        optionen['instanz'] = args.instanz
+    ergebnis = loese_mit_cache(args.zeitlimit, args.ordner, args.format, tee=True, **optionen)
+
+    print(f"\n{'Cache-Treffer' if ergebnis['treffer'] else 'Neu gebaut'}: {ergebnis['datei']} "
+          f"({ergebnis['aufbau']:.2f}s) | Lösung {ergebnis['loesung']:.1f}s | {ergebnis['status']}")
+    werte = ergebnis['werte']
+    if werte is not None:
+        print(f"Zielwert: {ergebnis['zielwert']:,.2f} € | Schranke: {ergebnis['schranke']:,.2f} €")
+        saeulen = {index: round(w) for (name, index), w in werte.items() if name == 'y_l' and w > 0.5}
+        typen = {}
+        for (name, index), w in werte.items():
+            if name == 'a_type' and w > 0.5:
+                typen.setdefault(index[2], set()).add(index[1])
+        print("Säulen: " + (", ".join(f"{l}={n}" for l, n in saeulen.items()) or "keine"))
+        print("LKW je Typ: " + (", ".join(f"{t}={len(k)}" for t, k in typen.items()) or "keine"))
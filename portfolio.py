@@ -0,0 +1,291 @@
+# ============================================================================
+# SOLVER-PORTFOLIO: ALLE VERFÜGBAREN SOLVER PARALLEL AUF DERSELBEN MPS-DATEI
+# Aufruf: python portfolio.py [--zeitlimit 3600] [--prozesse 8] [--erweiterungen]
+#                             [--instanz full.csv]
+#
+# Statt der Reihenfolge Gurobi > HiGHS > CBC > GLPK aus waehle_solver wird
+# die Solver-Datei einmal über den Modell-Cache (modellcache.py) als MPS
+# geschrieben und dann gleichzeitig in eigenen Prozessen gelöst von
+#   - jedem gefundenen Kommandozeilen-Solver (gurobi_cl, cbc, glpsol) und
+#   - HiGHS (highspy) in mehreren Varianten aus HIGHS_VARIANTEN (anderer
+#     random_seed, mehr Heuristik, ohne Presolve, ...), bis --prozesse
+#     (Standard: Anzahl Kerne) Prozesse laufen.
+# Jeder Lauf bekommt das volle Zeitlimit. Die erste bewiesen optimale Lösung
+# gewinnt und alle anderen Prozesse werden beendet; sonst gewinnt am Ende des
+# Zeitlimits die beste gefundene Lösung. Die Schranke ist die beste untere
+# Schranke aller Läufe.
+# ============================================================================
+
+import argparse
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+import highspy
+
+from modellcache import modell_datei, zuordne, CACHE_ORDNER
+
+# HiGHS-Varianten (Name, Optionen) in Startreihenfolge - HIER ÄNDERN!
+HIGHS_VARIANTEN = [
+    ('HiGHS', {}),
+    ('HiGHS Seed 1', {'random_seed': 1}),
+    ('HiGHS Heuristik', {'mip_heuristic_effort': 0.3}),
+    ('HiGHS Seed 2', {'random_seed': 2}),
+    ('HiGHS ohne Presolve', {'presolve': 'off'}),
+    ('HiGHS Seed 3', {'random_seed': 3}),
+]
+
+# Für jede Variante; ein Thread je Prozess, damit sich die Läufe nicht die Kerne streitig machen
+HIGHS_BASIS = {'threads': 1}
+
+# Kommandozeilen-Solver in Startreihenfolge (nur wenn im PATH)
+EXTERNE_SOLVER = ('gurobi_cl', 'cbc', 'glpsol')
+
+# Zusätzliche Zeit nach dem Zeitlimit, um Ergebnisse einzusammeln
+NACHLAUF = 30
+
+
+def portfolio_varianten(prozesse=None):
+    """Liste (Name, Solver, Optionen): gefundene externe Solver, dann HiGHS-Varianten bis prozesse."""
+    prozesse = prozesse or os.cpu_count() or 1
+    varianten = [(programm, programm, {}) for programm in EXTERNE_SOLVER if shutil.which(programm)]
+    varianten = varianten[:max(prozesse - 1, 0)]   # mindestens ein HiGHS-Lauf
+    for i in range(max(prozesse - len(varianten), 1)):
+        if i < len(HIGHS_VARIANTEN):
+            name, optionen = HIGHS_VARIANTEN[i]
+        else:
+            name, optionen = f"HiGHS Seed {i}", {'random_seed': i}
+        varianten.append((name, 'highs', optionen))
+    return varianten
+
+
+def highs_lauf(name, datei, zeitlimit, optionen, warteschlange):
+    """Prozess: löst datei mit HiGHS und legt (name, Ergebnis) in die Warteschlange."""
+    h = highspy.Highs()
+    h.setOptionValue('output_flag', False)
+    h.setOptionValue('time_limit', float(zeitlimit))
+    for option, wert in {**HIGHS_BASIS, **optionen}.items():
+        h.setOptionValue(option, wert)
+    h.readModel(datei)
+    h.run()
+    info = h.getInfo()
+    lp = h.getLp()
+    werte = None
+    if info.primal_solution_status != 0:   # zulässige Lösung vorhanden
+        werte = dict(zip(lp.col_names_, h.getSolution().col_value))
+    schranke = info.mip_dual_bound if lp.integrality_ else info.objective_function_value
+    warteschlange.put((name, {'status': h.modelStatusToString(h.getModelStatus()),
+                              'zielwert': info.objective_function_value if werte else None,
+                              'schranke': schranke, 'werte': werte}))
+
+
+def befehl(programm, datei, zeitlimit, loesung):
+    """Kommandozeile eines externen Solvers, der seine Lösung nach loesung schreibt."""
+    pfad = shutil.which(programm)
+    if programm == 'gurobi_cl':
+        return [pfad, 'Threads=1', f'TimeLimit={zeitlimit}', f'ResultFile={loesung}', datei]
+    if programm == 'cbc':
+        return [pfad, datei, 'threads', '1', 'sec', str(zeitlimit), 'solve', 'solu', loesung]
+    if programm == 'glpsol':
+        return [pfad, '--freemps', datei, '--tmlim', str(int(zeitlimit)), '-w', loesung]
+    raise ValueError(f"Unbekannter Solver: {programm}")
+
+
+def zahl(muster, text):
+    treffer = re.search(muster, text)
+    try:
+        return float(treffer.group(1)) if treffer else None
+    except ValueError:
+        return None
+
+
+def spaltennamen_mps(datei):
+    """Spaltennamen in der Reihenfolge des COLUMNS-Abschnitts (GLPK gibt nur Spaltennummern aus)."""
+    namen, abschnitt = {}, None
+    with open(datei, encoding='utf-8') as f:
+        for zeile in f:
+            if not zeile[:1].isspace():
+                abschnitt = zeile.split()[0] if zeile.strip() else abschnitt
+            elif abschnitt == 'COLUMNS' and 'MARKER' not in zeile:
+                namen.setdefault(zeile.split()[0], None)
+    return list(namen)
+
+
+def lese_loesung(programm, datei, loesung, protokoll):
+    """Liest die Lösungsdatei eines externen Solvers; gibt ein Ergebnis wie highs_lauf zurück."""
+    ergebnis = {'status': 'Unknown', 'zielwert': None, 'schranke': None, 'werte': None}
+    if not os.path.exists(loesung):
+        return ergebnis
+    with open(loesung, encoding='utf-8', errors='replace') as f:
+        zeilen = [zeile.split() for zeile in f if zeile.strip()]
+    werte = {}
+
+    if programm == 'gurobi_cl':
+        for teile in zeilen:
+            if teile[0] == '#':
+                ergebnis['zielwert'] = zahl(r'Objective value = (\S+)', ' '.join(teile))
+            else:
+                werte[teile[0]] = float(teile[1])
+        ergebnis['status'] = ('Optimal' if 'Optimal solution found' in protokoll else
+                              'Infeasible' if 'infeasible' in protokoll.lower() else 'Time limit reached')
+        ergebnis['schranke'] = zahl(r'best bound (\S+?),', protokoll)
+
+    elif programm == 'cbc':
+        kopf = ' '.join(zeilen[0])
+        ergebnis['status'] = ('Optimal' if kopf.startswith('Optimal') else
+                              'Infeasible' if 'nfeasible' in kopf else 'Time limit reached')
+        if 'no integer solution' in kopf or ergebnis['status'] == 'Infeasible':
+            return ergebnis
+        ergebnis['zielwert'] = zahl(r'objective value (\S+)', kopf)
+        for teile in zeilen[1:]:
+            teile = teile[1:] if teile[0] == '**' else teile
+            werte[teile[1]] = float(teile[2])
+        ergebnis['schranke'] = zahl(r'Lower bound:\s+(\S+)', protokoll)
+
+    elif programm == 'glpsol':
+        namen = spaltennamen_mps(datei)
+        for teile in zeilen:
+            if teile[0] == 's':   # s mip ZEILEN SPALTEN STATUS ZIELWERT
+                ergebnis['status'] = {'o': 'Optimal', 'f': 'Time limit reached',
+                                      'n': 'Infeasible'}.get(teile[4], 'Unknown')
+                ergebnis['zielwert'] = float(teile[5])
+            elif teile[0] == 'j':
+                werte[namen[int(teile[1]) - 1]] = float(teile[-1])
+        if ergebnis['status'] not in ('Optimal', 'Time limit reached'):
+            ergebnis['zielwert'] = None
+            return ergebnis
+
+    ergebnis['werte'] = werte
+    return ergebnis
+
+
+def loese_portfolio(zeitlimit=3600, prozesse=None, varianten=None, ordner=CACHE_ORDNER, **optionen):
+    """Löst die Solver-Datei mit allen Varianten parallel; gibt ein Ergebnis-dict zurück.
+
+    Die Schlüssel entsprechen modellcache.loese_mit_cache, dazu 'sieger' und
+    'laeufe' ({Variante: Status, Zielwert, Schranke, Zeit}).
+    """
+    start = time.perf_counter()
+    datei, zuordnung, treffer = modell_datei(ordner, 'mps', **optionen)
+    aufbau = time.perf_counter() - start
+    varianten = varianten or portfolio_varianten(prozesse)
+    print(f"Portfolio ({len(varianten)} Prozesse): " + ", ".join(name for name, _, _ in varianten))
+
+    kontext = multiprocessing.get_context('spawn')
+    warteschlange = kontext.Queue()
+    laeufe, ergebnisse, reihenfolge = {}, {}, []
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for i, (name, solver, solver_optionen) in enumerate(varianten):
+            if solver == 'highs':
+                prozess = kontext.Process(target=highs_lauf, daemon=True,
+                                          args=(name, datei, zeitlimit, solver_optionen, warteschlange))
+                prozess.start()
+                laeufe[name] = (solver, prozess, None, None)
+            else:
+                loesung, protokoll = os.path.join(tmp, f"{i}.sol"), os.path.join(tmp, f"{i}.log")
+                with open(protokoll, 'w') as log:
+                    prozess = subprocess.Popen(befehl(solver, datei, zeitlimit, loesung),
+                                               stdout=log, stderr=subprocess.STDOUT, cwd=tmp)
+                laeufe[name] = (solver, prozess, loesung, protokoll)
+
+        def eintragen(name, ergebnis):
+            ergebnis['zeit'] = time.perf_counter() - start
+            ergebnisse[name] = ergebnis
+            reihenfolge.append(name)
+            print(f">>> {name}: {ergebnis['status']} nach {ergebnis['zeit']:.1f}s")
+
+        frist = start + zeitlimit + NACHLAUF
+        while len(ergebnisse) < len(laeufe) and time.perf_counter() < frist:
+            if any(e['status'] == 'Optimal' for e in ergebnisse.values()):
+                break
+            try:
+                eintragen(*warteschlange.get(timeout=0.2))
+            except queue.Empty:
+                pass
+            for name, (solver, prozess, loesung, protokoll) in laeufe.items():
+                if name in ergebnisse:
+                    continue
+                if solver != 'highs' and prozess.poll() is not None:
+                    with open(protokoll, encoding='utf-8', errors='replace') as f:
+                        eintragen(name, lese_loesung(solver, datei, loesung, f.read()))
+                elif solver == 'highs' and prozess.exitcode not in (None, 0):
+                    eintragen(name, {'status': f'Abbruch (Exitcode {prozess.exitcode})',
+                                     'zielwert': None, 'schranke': None, 'werte': None})
+
+        # Alle übrigen Läufe beenden
+        for name, (solver, prozess, _, _) in laeufe.items():
+            if name not in ergebnisse:
+                ergebnisse[name] = {'status': 'beendet', 'zielwert': None, 'schranke': None,
+                                    'werte': None, 'zeit': time.perf_counter() - start}
+            laeuft = prozess.is_alive() if solver == 'highs' else prozess.poll() is None
+            if laeuft:
+                prozess.terminate()
+        for solver, prozess, _, _ in laeufe.values():
+            if solver == 'highs':
+                prozess.join(5)
+                if prozess.is_alive():
+                    prozess.kill()
+            else:
+                try:
+                    prozess.wait(5)
+                except subprocess.TimeoutExpired:
+                    prozess.kill()
+        warteschlange.close()
+
+    loesung = time.perf_counter() - start
+    optimal = [name for name in reihenfolge if ergebnisse[name]['status'] == 'Optimal']
+    mit_loesung = [name for name in reihenfolge if ergebnisse[name]['werte'] is not None]
+    # Ohne lesbaren Zielwert (Kopfzeile nicht erkannt) nur, wenn kein anderer Lauf eine Lösung hat
+    mit_ziel = [name for name in mit_loesung if ergebnisse[name]['zielwert'] is not None]
+    if optimal:
+        sieger = optimal[0]
+    elif mit_ziel:
+        sieger = min(mit_ziel, key=lambda name: ergebnisse[name]['zielwert'])
+    else:
+        sieger = mit_loesung[0] if mit_loesung else None
+    schranken = [e['schranke'] for e in ergebnisse.values() if e['schranke'] is not None]
+    beste = ergebnisse[sieger] if sieger else {'status': 'keine Lösung', 'zielwert': None, 'werte': None}
+    return {'werte': zuordne(zuordnung, beste['werte'].items()) if beste['werte'] is not None else None,
+            'zielwert': beste['zielwert'], 'schranke': max(schranken, default=None),
+            'status': beste['status'], 'sieger': sieger, 'treffer': treffer, 'datei': datei,
+            'aufbau': aufbau, 'loesung': loesung,
+            'laeufe': {name: {k: w for k, w in e.items() if k != 'werte'} for name, e in ergebnisse.items()}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LKW-Modell mit einem parallelen Solver-Portfolio lösen")
+    parser.add_argument('--zeitlimit', type=int, default=3600, help="Zeitlimit je Lauf in Sekunden")
+    parser.add_argument('--prozesse', type=int, help="Anzahl paralleler Läufe (Standard: Anzahl Kerne)")
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    parser.add_argument('--instanz', help="full.csv-Datei (Standard: DATEN_CSV)")
+    parser.add_argument('--ordner', default=CACHE_ORDNER, help="Cache-Ordner")
+    args = parser.parse_args()
+
+    optionen = {'erweiterungen': args.erweiterungen}
+    if args.instanz:
+        optionen['instanz'] = args.instanz
+    ergebnis = loese_portfolio(args.zeitlimit, args.prozesse, ordner=args.ordner, **optionen)
+
+    print("\n" + "=" * 80)
+    print(f"{'Lauf':<24} {'Status':<22} {'Zielwert':>14} {'Schranke':>14} {'Zeit':>7}")
+    print("-" * 80)
+    for name, e in ergebnis['laeufe'].items():
+        zielwert = f"{e['zielwert']:,.2f}" if e['zielwert'] is not None else '-'
+        schranke = f"{e['schranke']:,.2f}" if e['schranke'] is not None else '-'
+        marke = ' *' if name == ergebnis['sieger'] else ''
+        print(f"{name:<24} {e['status']:<22} {zielwert:>14} {schranke:>14} {e['zeit']:>6.1f}s{marke}")
+    print("=" * 80)
+    print(f"{'Cache-Treffer' if ergebnis['treffer'] else 'Neu gebaut'}: {ergebnis['datei']} "
+          f"({ergebnis['aufbau']:.2f}s) | Portfolio {ergebnis['loesung']:.1f}s | Sieger: {ergebnis['sieger']}")
+    if ergebnis['werte'] is not None:
+        schranke = ergebnis['schranke']
+        print(f"Zielwert: {ergebnis['zielwert']:,.2f} € | Schranke: "
+              f"{f'{schranke:,.2f} €' if schranke is not None else '-'}")
+        saeulen = {index: round(w) for (name, index), w in ergebnis['werte'].items() if name == 'y_l' and w > 0.5}
+        print("Säulen: " + (", ".join(f"{l}={n}" for l, n in saeulen.items()) or "keine"))
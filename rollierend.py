@@ -0,0 +1,191 @@
+# ============================================================================
+# ROLLIERENDER HORIZONT: MEHRTÄGIGE PLANUNG IN ÜBERLAPPENDEN TAGESFENSTERN
+# Aufruf: python rollierend.py [--tage Mo Di Mi Do Fr Sa So] [--fenster 2]
+#                              [--schritt 1] [--zeitlimit 600] [--erweiterungen]
+#
+# Das Wochenmodell (build_model(tage=WOCHE), Touren je Tag aus WOCHENPLAN)
+# ist als Ganzes zu groß. Stattdessen werden Fenster von `fenster` Tagen
+# nacheinander gelöst; jedes Fenster ist ein eigenes build_model nur über
+# seine Tage, die Modellgröße bleibt also je Fenster gleich:
+#   - Nach dem Lösen werden die ersten `schritt` Tage des Fensters
+#     festgeschrieben, der Rest ist nur Vorausschau.
+#   - Übergabe an das nächste Fenster (siehe Uebergabe): SOC je benutztem LKW
+#     und Speicherstand am Ende des letzten festgeschriebenen Tags als
+#     Startwert, der Startwert von Tag 1 als Endwert (wie soc_cycle über den
+#     ganzen Horizont). Benutzte LKW behalten ihren Typ und bleiben gekauft;
+#     Säulen, Netzausbau, Speicher, PV und Spitzenlast gehen als untere
+#     Schranken ein (Infrastruktur kann nur wachsen).
+#   - Die Jahreskosten setzen sich aus der Infrastruktur und Flotte des
+#     letzten Fensters und den variablen Kosten der festgeschriebenen Tage
+#     zusammen (Jahresfaktor des ganzen Horizonts).
+# ============================================================================
+
+import argparse
+
+import pyomo.environ as pyo
+
+from modell import build_model, baue_sets_und_parameter, flottengroesse, LKW_RESERVE, WOCHE
+from mehrstufig import loese, hat_loesung
+
+# Infrastruktur, die in späteren Fenstern nur wachsen kann
+INFRASTRUKTUR = ('y_l', 'u', 'p_s', 'q_s', 'p_pv_cap', 'p_peak')
+
+
+class Uebergabe:
+    """Zustand, den die festgeschriebenen Tage an das nächste Fenster weitergeben."""
+
+    def __init__(self):
+        self.typ = {}             # benutzter LKW k -> Typ
+        self.soc_start = {}       # k -> SOC zu Beginn des nächsten Fensters
+        self.soc_ende = {}        # k -> SOC zu Beginn seines ersten Tags (Kreislauf)
+        self.speicher_start = None
+        self.speicher_ende = None
+        self.schranken = {}       # (Variable, Index) -> untere Schranke
+
+    def anwenden(self, model):
+        """Setzt Startwerte, Kreislauf, Flotte und Infrastruktur-Schranken im Fenstermodell."""
+        for (name, index), wert in self.schranken.items():
+            var = model.component(name)
+            if var is not None:
+                var[index].setlb(max(wert, var[index].lb or 0))
+
+        for k, typ in self.typ.items():
+            for t in model.T:
+                model.type_assignment[k, t].fix(1 if t == typ else 0)
+            # Gekaufte LKW kosten auch ohne Touren in diesem Fenster
+            model.truck_used[k].fix(1)
+            model.con_truck_used_upper[k].deactivate()
+            model.con_soc_cycle[k].deactivate()
+        erster, letzter = model.Z.first(), model.Z.last()
+        model.con_soc_start = pyo.Constraint(list(self.typ), rule=lambda m, k: m.soc[k, erster] == self.soc_start[k])
+        model.con_soc_ende = pyo.Constraint(list(self.typ), rule=lambda m, k: m.soc[k, letzter] == self.soc_ende[k])
+
+        if self.speicher_start is not None:
+            model.con_storage_neutral.deactivate()
+            model.con_speicher_start = pyo.Constraint(expr=model.soc_s[erster] == self.speicher_start)
+            model.con_speicher_ende = pyo.Constraint(expr=model.soc_s[letzter] == self.speicher_ende)
+
+    def festschreiben(self, model, bis_tag):
+        """Übernimmt Flotte, Infrastruktur und Endzustand nach Tag bis_tag (Tag des Fenstermodells)."""
+        z_ende = int(bis_tag * pyo.value(model.slots_pro_tag))
+        z_ende = max(z for z in model.Z if z <= z_ende)   # letztes Intervall von Tag bis_tag
+        for k in model.K:
+            if not any(model.a[r, k].value > 0.5 for r in model.R if model.tag_r[r] <= bis_tag):
+                continue
+            if k not in self.typ:
+                self.typ[k] = next(t for t in model.T if model.type_assignment[k, t].value > 0.5)
+                self.soc_ende[k] = model.soc[k, model.Z.first()].value
+            self.soc_start[k] = pyo.value(model.soc[k, z_ende] - model.cons[k, z_ende] +
+                                          sum(model.real_p[k, l, z_ende] for l in model.L) * model.delta_t[z_ende])
+        if self.speicher_ende is None:
+            self.speicher_ende = model.soc_s[model.Z.first()].value
+        self.speicher_start = pyo.value(model.soc_s[z_ende] + model.p_l_s[z_ende] * model.delta_t[z_ende] -
+                                        (1 / model.nrt) * model.p_e_s[z_ende] * model.delta_t[z_ende])
+        for name in INFRASTRUKTUR:
+            var = model.component(name)
+            if var is not None:
+                for index, v in var.items():
+                    self.schranken[name, index] = round(v.value) if v.is_integer() else v.value
+
+
+def variable_kosten(model, d, erweiterungen=False):
+    """Diesel-, Maut- und Stromkosten von Tag d des Fenstermodells (ein Tag, ohne Jahresfaktor)."""
+    def maut(t):
+        return model.c_m_d + (model.c_co2_maut[t] if erweiterungen else 0)
+
+    def c_e(z):
+        return model.c_e[z] if erweiterungen else model.c_e
+    diesel = sum(model.a_type[r, k, t] * (maut(t) * model.mDist[r] + model.c_diesel * model.dist[r] * model.avgDv_d[t])
+                 for r in model.R if model.tag_r[r] == d for k in model.K for t in model.TD)
+    strom = sum(c_e(z) * model.p_grid[z] * model.delta_t[z] for z in model.Z if tag_von_slot(model, z) == d)
+    return pyo.value(diesel + strom)
+
+
+def tag_von_slot(model, z):
+    return (z - 1) // pyo.value(model.slots_pro_tag) + 1
+
+
+def tagesbericht(model, d, name, erweiterungen=False):
+    """Kennzahlen von Tag d des Fenstermodells: Touren, E-Touren, Netzbezug, variable Kosten."""
+    touren = [r for r in model.R if model.tag_r[r] == d]
+    return {
+        'tag': name,
+        'touren': len(touren),
+        'elektrisch': sum(1 for r in touren for k in model.K for t in model.TE
+                          if pyo.value(model.a_type[r, k, t]) > 0.5),
+        'netzbezug': sum(pyo.value(model.p_grid[z]) * pyo.value(model.delta_t[z]) for z in model.Z
+                         if tag_von_slot(model, z) == d),
+        'kosten': variable_kosten(model, d, erweiterungen),
+    }
+
+
+def loese_rollierend(tage=WOCHE, fenster=2, schritt=1, zeitlimit=600, erweiterungen=False, **optionen):
+    """Löst den Horizont tage fensterweise.
+
+    optionen werden an build_model weitergereicht (ohne Symmetriebrechung, die
+    mit der übergebenen Flotte unverträglich sein kann). Gibt (Modell des
+    letzten Fensters, Tagesberichte, auf ein Jahr hochgerechnete Kosten) zurück.
+    """
+    if not 1 <= schritt <= fenster:
+        raise ValueError("Es muss 1 <= schritt <= fenster gelten")
+
+    # Gleiche LKW-Indexmenge in allen Fenstern, damit LKW k über die Fenster derselbe bleibt
+    daten = pyo.ConcreteModel()
+    baue_sets_und_parameter(daten, erweiterungen, tage=tage, **{
+        name: optionen[name] for name in ('ht_preis', 'nt_preis', 'aufloesung', 'instanz') if name in optionen})
+    optionen = dict(optionen, symmetrie_brechung=False,
+                    anzahl_lkw=flottengroesse(daten, optionen.get('anzahl_lkw'),
+                                              optionen.get('lkw_reserve', LKW_RESERVE)))
+
+    uebergabe = Uebergabe()
+    berichte = []
+    erster = 1
+    while True:
+        letzter = min(erster + fenster - 1, len(tage))
+        print(f"\n>>> Fenster Tag {erster}-{letzter} ({', '.join(tage[erster - 1:letzter])}), "
+              f"festgeschrieben: Tag 1-{erster - 1}")
+        model = build_model(erweiterungen=erweiterungen, tage=tage[erster - 1:letzter], **optionen)
+        uebergabe.anwenden(model)
+        _, sekunden = loese(model, zeitlimit)
+        if not hat_loesung(model):
+            raise RuntimeError(f"Fenster Tag {erster}-{letzter} ohne zulässige Lösung")
+        print(f"Fenster Tag {erster}-{letzter}: {pyo.value(model.obj):,.2f} € nach {sekunden:.1f}s")
+
+        fest = schritt if letzter < len(tage) else letzter - erster + 1
+        berichte += [tagesbericht(model, d, tage[erster + d - 2], erweiterungen) for d in range(1, fest + 1)]
+        if letzter == len(tage):
+            break
+        uebergabe.festschreiben(model, fest)
+        erster += schritt
+
+    # Flotte und Infrastruktur: Zielwert des letzten Fensters ohne seine variablen Kosten
+    fix = pyo.value(model.obj) - pyo.value(model.jahresfaktor) * sum(
+        variable_kosten(model, d, erweiterungen) for d in model.D)
+    jahreskosten = fix + 52 * 7 / len(tage) * sum(b['kosten'] for b in berichte)
+    return model, berichte, jahreskosten
+
+
+def ausgabe(model, berichte, jahreskosten):
+    """Kurzbericht je Tag: Touren, E-Touren, Netzbezug; Flotte und Säulen aus dem letzten Fenster."""
+    print("\n" + "=" * 60)
+    print(f"{'Tag':<6} {'Touren':>8} {'elektrisch':>12} {'Netzbezug [kWh]':>18}")
+    print("-" * 60)
+    for b in berichte:
+        print(f"{b['tag']:<6} {b['touren']:>8} {b['elektrisch']:>12} {b['netzbezug']:>18,.1f}")
+    print("=" * 60)
+    flotte = {t: sum(round(pyo.value(model.truck_type_used[k, t])) for k in model.K) for t in model.T}
+    print("Flotte: " + ", ".join(f"{t}={n}" for t, n in flotte.items() if n) +
+          " | Säulen: " + ", ".join(f"{l}={round(pyo.value(model.y_l[l]))}" for l in model.L))
+    print(f"Jahreskosten (hochgerechnet): {jahreskosten:,.2f} €")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mehrtägige Planung mit rollierendem Horizont")
+    parser.add_argument('--tage', nargs='+', default=WOCHE, help="Wochentage des Horizonts (WOCHENPLAN)")
+    parser.add_argument('--fenster', type=int, default=2, help="Tage pro Fenster")
+    parser.add_argument('--schritt', type=int, default=1, help="pro Fenster festgeschriebene Tage")
+    parser.add_argument('--zeitlimit', type=int, default=600, help="Zeitlimit pro Fenster in Sekunden")
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    args = parser.parse_args()
+
+    ausgabe(*loese_rollierend(args.tage, args.fenster, args.schritt, args.zeitlimit, args.erweiterungen))
@@ -0,0 +1,292 @@
+# ============================================================================
+# SPALTENGENERIERUNG ÜBER LKW-DIENSTPLÄNE (PRICE-AND-BRANCH)
+# Aufruf: python spaltengenerierung.py [--iterationen 200] [--zeitlimit 600]
+#                                      [--erweiterungen]
+#
+# Eine Spalte ist ein Tagesdienst: LKW-Typ t und eine Menge sich nicht
+# überschneidender Touren, die ein LKW dieses Typs fahren kann (für E-Typen
+# geprüft mit dem Einzel-LKW-Modell aus benders.py bei höchster Ladeleistung).
+# Ohne LKW-Index K gibt es keine Symmetrie zwischen gleichen LKW.
+#
+# Master (RMP): jede Tour genau einmal abdecken (wie tour_assignment_rule),
+#   beliebig viele Dienste (Flottengröße ergibt sich; max_dienste begrenzt sie
+#   optional, z.B. auf |K| in lagrange.py), Energiebedarf der E-Dienste gekoppelt an Säulen
+#   (y_l * max_p_l * 24h), Netz (p_grid_max + 500 u) und Netzbezug (PV ab).
+# Pricing je Typ: kleinste reduzierte Kosten über Tourmengen (MILP mit den
+#   Cliquen als Konflikten); unzulässige Dienste werden als Cut ausgeschlossen.
+# Danach: ganzzahliger Master über alle erzeugten Spalten und exakte
+#   Bewertung der Dienste in build_model (Laden, Netz, Speicher, PV) mit
+#   genau einem LKW je gewähltem Dienst. Bis dahin werden nur Mengen und
+#   Parameter (baue_sets_und_parameter) gebraucht, kein K-indiziertes Modell.
+# Die LP-Schranke nach Konvergenz ist eine untere Schranke des Gesamtmodells.
+# ============================================================================
+
+import argparse
+import time
+
+import pyomo.environ as pyo
+
+from modell import build_model, baue_sets_und_parameter, waehle_solver, AUFLOESUNG
+from benders import datenoptionen, minimale_unzulaessige_menge, tourenergie, ladeleistung_typ
+from mehrstufig import loese, hat_loesung
+
+
+# ----------------------------------------------------------------------------
+# Dienste
+# ----------------------------------------------------------------------------
+
+def variable_kosten(basis, r, t, erweiterungen=False):
+    """Jährliche Maut- und Dieselkosten von Tour r mit Diesel-Typ t (E-Typen: 0, Strom über den Netzbezug)."""
+    if t not in basis.TD:
+        return 0.0
+    maut = basis.c_m_d + (basis.c_co2_maut[t] if erweiterungen else 0)
+    return pyo.value(basis.jahresfaktor * (maut * basis.mDist[r] + basis.c_diesel * basis.dist[r] * basis.avgDv_d[t]))
+
+
+def fixkosten(basis, t):
+    """Jährliche Kosten eines benutzten LKW vom Typ t (E-Typen abzüglich THG-Erlös)."""
+    if t in basis.TD:
+        return pyo.value(basis.cap_d[t] + basis.opx_d[t] + basis.kfz_d[t])
+    return pyo.value(basis.cap_e[t] + basis.opx_e[t] - basis.thg_e[t])
+
+
+def dienst_kosten(basis, dienst, erweiterungen=False):
+    t, touren = dienst
+    return fixkosten(basis, t) + sum(variable_kosten(basis, r, t, erweiterungen) for r in touren)
+
+
+def dienst_energie(basis, dienst):
+    t, touren = dienst
+    return sum(tourenergie(basis, r, t) for r in touren) if t in basis.TE else 0.0
+
+
+# ----------------------------------------------------------------------------
+# Master
+# ----------------------------------------------------------------------------
+
+def baue_rmp(basis, dienste, ganzzahlig=False, erweiterungen=False, max_dienste=None):
+    """Restringierter Master über die Dienste (LP oder ganzzahlig), höchstens max_dienste Dienste."""
+    m = pyo.ConcreteModel(name="Dienstplan_Master")
+    m.S = pyo.Set(initialize=range(len(dienste)))
+    m.lam = pyo.Var(m.S, domain=pyo.Binary if ganzzahlig else pyo.NonNegativeReals)
+    m.y_l = pyo.Var(basis.L, domain=pyo.NonNegativeIntegers if ganzzahlig else pyo.NonNegativeReals,
+                    bounds=(0, basis.Nmax))
+    m.u = pyo.Var(domain=pyo.Binary if ganzzahlig else pyo.NonNegativeReals, bounds=(0, 1))
+    m.bezug = pyo.Var(domain=pyo.NonNegativeReals)  # Netzbezug kWh pro Tag
+
+    tag_h = sum(pyo.value(basis.delta_t[z]) for z in basis.Z)
+    energie = {s: dienst_energie(basis, dienste[s]) for s in m.S}
+    if erweiterungen:
+        m.p_pv_cap = pyo.Var(domain=pyo.NonNegativeReals, bounds=(0, basis.p_pv_cap.ub))
+        pv = m.p_pv_cap * sum(pyo.value(basis.pv_profile[z] * basis.delta_t[z]) for z in basis.Z)
+        c_strom = min(pyo.value(basis.c_e[z]) for z in basis.Z)
+    else:
+        pv = 0
+        c_strom = pyo.value(basis.c_e)
+    e_summe = sum(energie[s] * m.lam[s] for s in m.S)
+
+    m.con_touren = pyo.Constraint(basis.R, rule=lambda m, r: sum(
+        m.lam[s] for s in m.S if r in dienste[s][1]) == 1)
+    if max_dienste is not None:
+        m.con_flotte = pyo.Constraint(expr=sum(m.lam[s] for s in m.S) <= max_dienste)
+    m.con_saeulen_anzahl = pyo.Constraint(expr=sum(m.y_l[l] for l in basis.L) <= basis.Nmax)
+    m.con_saeulen_energie = pyo.Constraint(
+        expr=e_summe - sum(m.y_l[l] * basis.max_p_l[l] for l in basis.L) * tag_h <= 0)
+    m.con_netz_energie = pyo.Constraint(
+        expr=e_summe - 500 * m.u * tag_h - pv <= basis.p_grid_max * tag_h)
+    m.con_bezug = pyo.Constraint(expr=e_summe - m.bezug - pv <= 0)
+
+    m.obj = pyo.Objective(expr=(
+        sum(dienst_kosten(basis, dienste[s], erweiterungen) * m.lam[s] for s in m.S) +
+        sum(m.y_l[l] * (basis.cap_l[l] + basis.opx_l[l]) for l in basis.L) + 10000 * m.u +
+        basis.c_gr + basis.jahresfaktor * c_strom * m.bezug +
+        (basis.capex_pv * m.p_pv_cap if erweiterungen else 0)), sense=pyo.minimize)
+    if not ganzzahlig:
+        m.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+    return m
+
+
+# ----------------------------------------------------------------------------
+# Pricing
+# ----------------------------------------------------------------------------
+
+def baue_pricing(basis, t):
+    """Tourauswahl für einen Dienst vom Typ t; die Zielfunktion setzt pricing_ziel."""
+    p = pyo.ConcreteModel(name=f"Pricing_{t}")
+    p.x = pyo.Var(basis.R, domain=pyo.Binary)
+    p.con_clique = pyo.Constraint(basis.C, rule=lambda p, c: sum(p.x[r] for r in basis.R_clique[c]) <= 1)
+    p.con_nicht_leer = pyo.Constraint(expr=sum(p.x[r] for r in basis.R) >= 1)
+    if t in basis.TE:
+        p_max = max(ladeleistung_typ(basis, l, t, pyo.value(basis.Nmax)) for l in basis.L)
+        tag_h = sum(pyo.value(basis.delta_t[z]) for z in basis.Z)
+        p.con_energie = pyo.Constraint(expr=sum(
+            p.x[r] * (tourenergie(basis, r, t) + p_max * basis.dur_z[r] * basis.delta_t_basis)
+            for r in basis.R) <= p_max * tag_h)
+        for r in basis.R:
+            if tourenergie(basis, r, t) > basis.soc_e[t]:
+                p.x[r].fix(0)
+    p.cuts = pyo.ConstraintList()
+    p.obj = pyo.Objective(expr=0, sense=pyo.minimize)
+    return p
+
+
+def pricing_ziel(basis, p, t, duals, erweiterungen=False):
+    """Reduzierte Kosten eines Dienstes vom Typ t als Funktion von x."""
+    e_dual = duals['saeulen'] + duals['netz'] + duals['bezug']
+    return (fixkosten(basis, t) - duals['flotte'] + sum(
+        p.x[r] * (variable_kosten(basis, r, t, erweiterungen) - duals['touren'][r] -
+                  (tourenergie(basis, r, t) * e_dual if t in basis.TE else 0))
+        for r in basis.R))
+
+
+def duale_werte(rmp, basis):
+    return {
+        'touren': {r: rmp.dual[rmp.con_touren[r]] for r in basis.R},
+        'flotte': rmp.dual[rmp.con_flotte] if rmp.component('con_flotte') is not None else 0.0,
+        'saeulen': rmp.dual[rmp.con_saeulen_energie],
+        'netz': rmp.dual[rmp.con_netz_energie],
+        'bezug': rmp.dual[rmp.con_bezug],
+    }
+
+
+# ----------------------------------------------------------------------------
+# Exakte Bewertung
+# ----------------------------------------------------------------------------
+
+def bewerte(dienste, y, zeitlimit, erweiterungen=False, aufloesung=AUFLOESUNG, **optionen):
+    """Löst build_model mit fester Dienstzuordnung (LKW k = k-ter Dienst), y_l als Mindestausstattung.
+
+    K hat genau einen LKW je Dienst; ohne Symmetriebrechung, deren Reihenfolge
+    der Dienste bei fester Zuordnung unzulässig sein kann.
+    """
+    model = build_model(erweiterungen=erweiterungen, aufloesung=aufloesung,
+                        **dict(optionen, anzahl_lkw=len(dienste), symmetrie_brechung=False))
+    for k, (t, touren) in zip(model.K, dienste):
+        for r in model.R:
+            model.a[r, k].fix(1 if r in touren else 0)
+        for t2 in model.T:
+            model.type_assignment[k, t2].fix(1 if t2 == t else 0)
+    for l in model.L:
+        model.y_l[l].setlb(y[l])
+    loese(model, zeitlimit)
+    return model
+
+
+def startdienste(basis):
+    """Zulässige Startspalten: Touren nach Startzeit greedy auf Diesel-Dienste verteilt.
+
+    Im Intervallgraphen braucht das genau so viele Dienste wie die größte Clique,
+    der Master ist damit von Beginn an zulässig.
+    """
+    konflikt = {(r1, r2) for c in basis.C for r1 in basis.R_clique[c] for r2 in basis.R_clique[c]}
+    diesel = basis.TD.first()
+    touren = []
+    for r in sorted(basis.R, key=lambda r: basis.s_r[r]):
+        for dienst in touren:
+            if not any((r, r2) in konflikt for r2 in dienst):
+                dienst.append(r)
+                break
+        else:
+            touren.append([r])
+    return [(diesel, tuple(dienst)) for dienst in touren]
+
+
+def generiere_spalten(basis, iterationen=200, erweiterungen=False, aufloesung=AUFLOESUNG, daten=(),
+                      max_dienste=None):
+    """Spaltengenerierung am Wurzelknoten.
+
+    daten sind die Datenoptionen für die Einzel-LKW-Prüfung (benders.datenoptionen).
+    Gibt (Dienste, LP-Schranke oder None ohne Konvergenz, Duale des letzten RMP) zurück.
+    """
+    solver, _ = waehle_solver(60)
+    start = time.perf_counter()
+
+    dienste = startdienste(basis)
+    bekannt = set(dienste)
+    pricing = {t: baue_pricing(basis, t) for t in basis.T}
+    leistung = {t: max(ladeleistung_typ(basis, l, t, pyo.value(basis.Nmax)) for l in basis.L) for t in basis.TE}
+
+    lp_schranke = None
+    for it in range(1, iterationen + 1):
+        rmp = baue_rmp(basis, dienste, erweiterungen=erweiterungen, max_dienste=max_dienste)
+        solver.solve(rmp)
+        lp_wert = pyo.value(rmp.obj)
+        duals = duale_werte(rmp, basis)
+
+        neu = 0
+        for t in basis.T:
+            p = pricing[t]
+            p.obj.set_value(pricing_ziel(basis, p, t, duals, erweiterungen))
+            while True:
+                solver.solve(p)
+                if pyo.value(p.obj) >= -1e-6:
+                    break
+                touren = tuple(r for r in basis.R if p.x[r].value > 0.5)
+                if t in basis.TE:
+                    kern = minimale_unzulaessige_menge((touren, t, leistung[t], erweiterungen, aufloesung, daten))
+                    if kern is not None:
+                        p.cuts.add(sum(p.x[r] for r in kern) <= len(kern) - 1)
+                        continue
+                if (t, touren) not in bekannt:
+                    dienste.append((t, touren))
+                    bekannt.add((t, touren))
+                    neu += 1
+                break
+
+        print(f"Iteration {it}: LP {lp_wert:,.2f} € | {len(dienste)} Dienste | +{neu} | "
+              f"{time.perf_counter() - start:.0f}s")
+        if neu == 0:
+            lp_schranke = lp_wert
+            break
+    return dienste, lp_schranke, duals
+
+
+def waehle_dienste(basis, dienste, zeitlimit, erweiterungen=False, max_dienste=None):
+    """Ganzzahliger Master: beste Überdeckung aus dem Dienst-Pool; gibt (Dienste, y_l) zurück."""
+    solver, _ = waehle_solver(zeitlimit)
+    rmp = baue_rmp(basis, dienste, ganzzahlig=True, erweiterungen=erweiterungen, max_dienste=max_dienste)
+    solver.solve(rmp)
+    gewaehlt = [dienste[s] for s in rmp.S if rmp.lam[s].value > 0.5]
+    y = {l: round(rmp.y_l[l].value) for l in basis.L}
+    print(f"Master: {pyo.value(rmp.obj):,.2f} € mit {len(gewaehlt)} Diensten")
+    return gewaehlt, y
+
+
+def loese_spaltengenerierung(iterationen=200, zeitlimit=600, erweiterungen=False, aufloesung=AUFLOESUNG,
+                             **optionen):
+    """Spaltengenerierung, ganzzahliger Master, exakte Bewertung.
+
+    Gibt (Modell mit vollständiger Lösung oder None, LP-Schranke, Dienste) zurück.
+    """
+    daten = datenoptionen(optionen)
+    basis = pyo.ConcreteModel(name="Dienstplan_Daten")
+    baue_sets_und_parameter(basis, erweiterungen, aufloesung=aufloesung, **dict(daten))
+    dienste, lp_schranke, _ = generiere_spalten(basis, iterationen, erweiterungen, aufloesung, daten)
+
+    print("\n>>> Ganzzahliger Master über alle Dienste")
+    gewaehlt, y = waehle_dienste(basis, dienste, zeitlimit, erweiterungen)
+
+    print("\n>>> Exakte Bewertung in build_model")
+    model = bewerte(gewaehlt, y, zeitlimit, erweiterungen, aufloesung, **optionen)
+    return (model if hat_loesung(model) else None), lp_schranke, gewaehlt
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spaltengenerierung über LKW-Dienstpläne")
+    parser.add_argument('--iterationen', type=int, default=200)
+    parser.add_argument('--zeitlimit', type=int, default=600, help="Zeitlimit je Master/Bewertung in Sekunden")
+    parser.add_argument('--aufloesung', type=int, default=AUFLOESUNG)
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    args = parser.parse_args()
+
+    model, lp_schranke, dienste = loese_spaltengenerierung(args.iterationen, args.zeitlimit,
+                                                           args.erweiterungen, args.aufloesung)
+    print("\nDienste:")
+    for t, touren in dienste:
+        print(f"  {t:<12} {', '.join(touren)}")
+    if lp_schranke is not None:
+        print(f"LP-Schranke (Spaltengenerierung konvergiert): {lp_schranke:,.2f} €")
+    if model is None:
+        print("Keine zulässige Bewertung - Zeitlimit erhöhen")
+    else:
+        print(f"Zielwert build_model: {pyo.value(model.obj):,.2f} €")
@@ -0,0 +1,356 @@
+# ============================================================================
+# KONSTRUKTIVE STARTLÖSUNG (MIP-START) FÜR DAS LKW-MODELL
+# Aufruf: python startloesung.py [--erweiterungen] [--loesen] [--zeitlimit 600]
+#
+# Baut in Sekundenbruchteilen eine vollständige zulässige Lösung von
+# build_model und lädt sie als Startwerte (solve(..., warmstart=True)):
+#   1. Ketten: Touren nach Startzeit greedy auf Ketten ohne Cliquenkonflikt
+#      verteilt (Intervallgraph: so wenige LKW wie die größte Clique), danach
+#      Kettenenden paarweise getauscht, solange die geschätzten Kosten sinken.
+#   2. Typen: eine Kette wird elektrisch, wenn ihr Energiebedarf
+#      Σ dist·avgEv_e in soc_e passt und sie damit billiger ist als Diesel
+#      (Strom und Spitzenlast geschätzt, kettenkosten).
+#   3. Laden: jeder E-LKW ist in seinen Standzeiten angesteckt, jeweils bis
+#      zum letzten erlaubten Abstecken (unplug_ok) vor der Abfahrt; der Bedarf
+#      wird gleichmäßig auf die billigsten Intervalle verteilt, begrenzt durch
+#      max_p_e, die gepoolte Säulenleistung y_l·max_p_l und das Netz.
+#      Alle Säulenkonfigurationen (Σ y_l <= Nmax) und Teilmengen der
+#      E-Kandidaten nach Ersparnis werden bewertet, die billigste gewinnt.
+# Speicher und PV bleiben im Start leer (p_s = q_s = p_pv_cap = 0).
+# ============================================================================
+
+import argparse
+import itertools
+import time
+
+import pyomo.environ as pyo
+
+from modell import build_model
+from benders import tourenergie
+from spaltengenerierung import fixkosten, variable_kosten
+from mehrstufig import loese, hat_loesung
+
+
+def strompreis(model, z):
+    return pyo.value(model.c_e[z] if model.c_e.is_indexed() else model.c_e)
+
+
+def ladefenster(model, touren):
+    """Intervalle, in denen ein E-LKW mit diesen Touren angesteckt sein kann.
+
+    Jede Standzeit zwischen zwei Touren (bzw. vor der ersten) wird bis zum
+    letzten Intervall mit unplug_ok genutzt, das vor dem Intervall direkt vor
+    der nächsten Abfahrt liegt (unplug_before_departure); die Standzeit nach
+    der letzten Tour ganz bis zum Horizontende.
+    """
+    Z = list(model.Z)
+    belegt = [i for i, z in enumerate(Z) if any(r in model.R_active[z] for r in touren)]
+    fenster = []
+    frei = 0
+    for i in belegt + [len(Z)]:
+        if i == len(Z):
+            fenster += Z[frei:]
+        elif i > frei:
+            ende = [j for j in range(frei, i - 1) if model.unplug_ok[Z[j]] == 1]
+            fenster += Z[frei:ende[-1] + 1] if ende else []
+        frei = i + 1
+    return fenster
+
+
+def konflikte(model):
+    return {(r1, r2) for c in model.C for r1 in model.R_clique[c] for r2 in model.R_clique[c]}
+
+
+def bilde_ketten(model):
+    """Touren nach Startzeit auf Ketten ohne Cliquenkonflikt verteilen.
+
+    Wie startdienste in spaltengenerierung.py, aber jede Tour geht an die
+    verträgliche Kette mit der frühesten letzten Ankunft: gleich viele Ketten
+    (größte Clique), dafür lange Standzeiten zum Laden zwischen den Touren.
+    """
+    konflikt = konflikte(model)
+    ergebnis = []
+    for r in sorted(model.R, key=lambda r: model.s_r[r]):
+        frei = [kette for kette in ergebnis if not any((r, r2) in konflikt for r2 in kette)]
+        if frei:
+            min(frei, key=lambda kette: max(model.e_r[r2] for r2 in kette)).append(r)
+        else:
+            ergebnis.append([r])
+    return [tuple(kette) for kette in ergebnis]
+
+
+def kettenkosten(model, touren, erweiterungen=False):
+    """Geschätzte Jahreskosten einer Kette mit dem günstigsten LKW-Typ.
+
+    E-Typen: Energiebedarf muss in soc_e passen und in den Standzeiten ladbar
+    sein; Strom zum billigsten Preis der Standzeiten plus Spitzenlast bei
+    gleichmäßigem Laden über alle Standzeiten. Säulen bleiben unberücksichtigt.
+    Gibt (Kosten, Typ, Energie, Ladefenster) zurück.
+    """
+    diesel = model.TD.first()
+    wahl = (fixkosten(model, diesel) + sum(variable_kosten(model, r, diesel, erweiterungen) for r in touren),
+            diesel, 0.0, [])
+    fenster = ladefenster(model, touren)
+    # Laden im letzten Intervall geht nicht mehr in den SOC-Kreislauf ein
+    stunden = sum(pyo.value(model.delta_t[z]) for z in fenster if z != model.Z.last())
+    preis = min((strompreis(model, z) for z in fenster), default=0.0)
+    for t in model.TE:
+        energie = sum(tourenergie(model, r, t) for r in touren)
+        if energie > pyo.value(model.soc_e[t]) or energie > pyo.value(model.max_p_e[t]) * stunden:
+            continue
+        kosten = (fixkosten(model, t) + pyo.value(model.jahresfaktor) * preis * energie +
+                  pyo.value(model.cPeak) * energie / stunden)
+        if kosten < wahl[0]:
+            wahl = (kosten, t, energie, fenster)
+    return wahl
+
+
+def tausche_enden(model, ketten, bewertung):
+    """Tauscht Kettenenden zwischen je zwei Ketten, solange bewertung(Kette) in Summe sinkt."""
+    konflikt = konflikte(model)
+    ketten = [list(kette) for kette in ketten]
+
+    def vertraeglich(kette):
+        return not any((r1, r2) in konflikt for i, r1 in enumerate(kette) for r2 in kette[i + 1:])
+
+    verbessert = True
+    while verbessert:
+        verbessert = False
+        for a, b in itertools.combinations(range(len(ketten)), 2):
+            for i in range(len(ketten[a]) + 1):
+                for j in range(len(ketten[b]) + 1):
+                    neu_a = ketten[a][:i] + ketten[b][j:]
+                    neu_b = ketten[b][:j] + ketten[a][i:]
+                    if not neu_a or not neu_b or not vertraeglich(neu_a) or not vertraeglich(neu_b):
+                        continue
+                    alt = bewertung(tuple(ketten[a])) + bewertung(tuple(ketten[b]))
+                    if bewertung(tuple(neu_a)) + bewertung(tuple(neu_b)) < alt - 1e-6:
+                        ketten[a], ketten[b] = neu_a, neu_b
+                        verbessert = True
+    return [tuple(kette) for kette in ketten]
+
+
+def auffuellen(bedarf, kapazitaet, dauer):
+    """Verteilt bedarf [kWh] möglichst gleichmäßig auf die Intervalle von kapazitaet [kW].
+
+    Gibt (Leistung je Intervall, nicht gedeckter Rest) zurück.
+    """
+    leistung = {z: 0.0 for z in kapazitaet}
+    offen = [z for z in kapazitaet if kapazitaet[z] > 1e-9]
+    while bedarf > 1e-9 and offen:
+        stufe = bedarf / sum(dauer[z] for z in offen)
+        voll = []
+        for z in offen:
+            p = min(stufe, kapazitaet[z] - leistung[z])
+            leistung[z] += p
+            bedarf -= p * dauer[z]
+            if kapazitaet[z] - leistung[z] <= 1e-9:
+                voll.append(z)
+        if not voll:
+            break
+        offen = [z for z in offen if z not in voll]
+    return leistung, max(bedarf, 0.0)
+
+
+def lade(model, elektrisch, y, u):
+    """Ladeplan der E-LKW bei y Säulen je Typ und Netzausbau u.
+
+    elektrisch: Liste von (Typ, Touren, Energie, Ladefenster).
+    Gibt (Kosten, Säule je LKW, Ladeleistung je (LKW, Intervall)) oder None zurück.
+    """
+    frei = {l: y[l] * pyo.value(model.cs_l[l]) for l in model.L}
+    saeule_rest = {(l, z): y[l] * pyo.value(model.max_p_l[l]) for l in model.L for z in model.Z}
+    netz_rest = {z: pyo.value(model.p_grid_max) + 500 * u for z in model.Z}
+    dauer = {z: pyo.value(model.delta_t[z]) for z in model.Z}
+
+    saeule, leistung = {}, {}
+    for i in sorted(range(len(elektrisch)), key=lambda i: -elektrisch[i][2]):
+        t, _, bedarf, fenster = elektrisch[i]
+        l = max((l for l in model.L if frei[l] > 0), key=lambda l: model.max_p_l[l], default=None)
+        if l is None:
+            return None
+        frei[l] -= 1
+        saeule[i] = l
+        # Laden im letzten Intervall geht nicht mehr in den SOC-Kreislauf ein
+        fenster = [z for z in fenster if z != model.Z.last()]
+        # Preisstufen aufsteigend, innerhalb einer Stufe gleichmäßig
+        for preis in sorted({strompreis(model, z) for z in fenster}):
+            kapazitaet = {z: min(pyo.value(model.max_p_e[t]), saeule_rest[l, z], netz_rest[z])
+                          for z in fenster if strompreis(model, z) == preis}
+            p, bedarf = auffuellen(bedarf, kapazitaet, dauer)
+            for z, wert in p.items():
+                if wert > 0:
+                    leistung[i, z] = leistung.get((i, z), 0.0) + wert
+                    saeule_rest[l, z] -= wert
+                    netz_rest[z] -= wert
+        if bedarf > 1e-6:
+            return None
+
+    bezug = {z: sum(leistung.get((i, z), 0.0) for i in saeule) for z in model.Z}
+    kosten = (sum(y[l] * pyo.value(model.cap_l[l] + model.opx_l[l]) for l in model.L) + 10000 * u +
+              pyo.value(model.cPeak) * max(bezug.values(), default=0.0) +
+              pyo.value(model.jahresfaktor) * sum(strompreis(model, z) * bezug[z] * dauer[z] for z in model.Z))
+    return kosten, saeule, leistung
+
+
+def bester_ladeplan(model, elektrisch):
+    """Billigster Ladeplan über alle Säulenkonfigurationen mit Σ y_l <= Nmax und u."""
+    n_max = pyo.value(model.Nmax)
+    bester = None
+    for werte in itertools.product(range(n_max + 1), repeat=len(model.L)):
+        if sum(werte) > n_max:
+            continue
+        y = dict(zip(model.L, werte))
+        if sum(y[l] * pyo.value(model.cs_l[l]) for l in model.L) < len(elektrisch):
+            continue
+        for u in (0, 1):
+            plan = lade(model, elektrisch, y, u)
+            if plan is not None and (bester is None or plan[0] < bester[0]):
+                bester = (plan[0], y, u, plan[1], plan[2])
+    return bester
+
+
+def setze(v, wert):
+    if not v.fixed:
+        v.set_value(wert, skip_validation=True)
+
+
+def startloesung(model, erweiterungen=False):
+    """Konstruiert eine zulässige Lösung und lädt sie als Startwerte in model.
+
+    Gibt den Zielwert der Startlösung zurück, None wenn die Touren nicht auf
+    |K| LKW passen (model bleibt dann unverändert).
+    """
+    ketten = bilde_ketten(model)
+    if len(ketten) > len(model.K):
+        return None
+    diesel = model.TD.first()
+
+    # --- Ketten verbessern und Typwahl je Kette ---
+    bewertet = {}
+
+    def bewertung(touren):
+        if touren not in bewertet:
+            bewertet[touren] = kettenkosten(model, touren, erweiterungen)
+        return bewertet[touren][0]
+
+    ketten = tausche_enden(model, ketten, bewertung)
+    dieselkosten = [fixkosten(model, diesel) + sum(variable_kosten(model, r, diesel, erweiterungen) for r in touren)
+                    for touren in ketten]
+    kandidaten = []
+    for i, touren in enumerate(ketten):
+        bewertung(touren)
+        kosten, t, energie, fenster = bewertet[touren]
+        if t in model.TE:
+            kandidaten.append((dieselkosten[i] - kosten, i, t, energie, fenster))
+    kandidaten.sort(key=lambda k: -k[0])
+    plaetze = pyo.value(model.Nmax) * max(pyo.value(model.cs_l[l]) for l in model.L)
+    kandidaten = kandidaten[:plaetze]
+
+    # --- Anzahl E-LKW: beste Ersparnis-Teilmenge inkl. Säulen und Netz ---
+    beste = (sum(dieselkosten), [], None)
+    for n in range(1, len(kandidaten) + 1):
+        auswahl = kandidaten[:n]
+        elektrisch = [(t, ketten[i], energie, fenster) for _, i, t, energie, fenster in auswahl]
+        plan = bester_ladeplan(model, elektrisch)
+        if plan is None:
+            continue
+        kosten = (sum(dieselkosten) - sum(dieselkosten[i] - fixkosten(model, t) for _, i, t, _, _ in auswahl) +
+                  plan[0])
+        if kosten < beste[0]:
+            beste = (kosten, elektrisch, plan)
+    _, elektrisch, plan = beste
+    y, u, saeule, leistung = plan[1:] if plan else ({l: 0 for l in model.L}, 0, {}, {})
+
+    # --- LKW-Indizes: benutzte zuerst, nach Typrang, im Typ nach erster Tour ---
+    e_index = {e[1]: j for j, e in enumerate(elektrisch)}
+    typ_rang = {t: i for i, t in enumerate(model.T)}
+    position = {r: i for i, r in enumerate(model.R)}
+    lkw = sorted(((elektrisch[e_index[touren]][0] if touren in e_index else diesel, touren) for touren in ketten),
+                 key=lambda x: (typ_rang[x[0]], min(position[r] for r in x[1])))
+
+    for v in model.component_data_objects(pyo.Var):
+        setze(v, 0)
+    K = sorted(model.K)
+    for k in K[len(lkw):]:
+        setze(model.type_assignment[k, model.T.last()], 1)
+
+    Z = list(model.Z)
+    for k, (t, touren) in zip(K, lkw):
+        setze(model.type_assignment[k, t], 1)
+        setze(model.truck_used[k], 1)
+        setze(model.truck_type_used[k, t], 1)
+        for r in touren:
+            setze(model.a[r, k], 1)
+            setze(model.a_type[r, k, t], 1)
+        for z in model.Z_depart:
+            setze(model.depart[k, z], sum(1 for r in touren if r in model.R_start[z]))
+        if t not in model.TE:
+            continue
+
+        j = e_index[touren]
+        l = saeule[j]
+        for z in elektrisch[j][3]:
+            setze(model.plug[k, l, z], 1)
+            setze(model.assign[k, l, z], 1)
+            setze(model.real_p[k, l, z], leistung.get((j, z), 0.0))
+
+        # SOC: Verlauf relativ zum Start, Start so hoch wie möglich; da Laden
+        # und Verbrauch je höchstens E <= soc_e betragen, bleibt er in [0, soc_e]
+        verlauf = [0.0]
+        for z in Z[:-1]:
+            verbrauch = sum(pyo.value(model.dist[r] * model.avgEv_e[t] / model.dur_z[r] * model.n_basis[z])
+                            for r in model.R_active[z] if r in touren)
+            verlauf.append(verlauf[-1] + leistung.get((j, z), 0.0) * pyo.value(model.delta_t[z]) - verbrauch)
+        start = pyo.value(model.soc_e[t]) - max(verlauf)
+        for z, wert in zip(Z, verlauf):
+            setze(model.soc[k, z], max(start + wert, 0.0))
+
+    for l in model.L:
+        setze(model.y_l[l], y[l])
+    setze(model.u, u)
+    bezug = {z: sum(leistung.get((j, z), 0.0) for j in saeule) for z in model.Z}
+    for z in model.Z:
+        setze(model.p_grid[z], bezug[z])
+    setze(model.p_peak, max(bezug.values(), default=0.0))
+
+    return pyo.value(model.obj)
+
+
+def groesste_verletzung(model):
+    """Größte Verletzung einer aktiven Nebenbedingung durch die aktuellen Werte."""
+    verletzung = 0.0
+    for c in model.component_data_objects(pyo.Constraint, active=True):
+        wert = pyo.value(c.body)
+        if c.has_lb():
+            verletzung = max(verletzung, pyo.value(c.lower) - wert)
+        if c.has_ub():
+            verletzung = max(verletzung, wert - pyo.value(c.upper))
+    return verletzung
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Konstruktive Startlösung für das LKW-Modell")
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    parser.add_argument('--loesen', action='store_true', help="danach mit MIP-Start lösen")
+    parser.add_argument('--zeitlimit', type=int, default=600, help="Zeitlimit in Sekunden für --loesen")
+    args = parser.parse_args()
+
+    model = build_model(erweiterungen=args.erweiterungen)
+    start = time.perf_counter()
+    wert = startloesung(model, args.erweiterungen)
+    sekunden = time.perf_counter() - start
+    if wert is None:
+        raise SystemExit("Touren passen nicht auf die LKW-Flotte K")
+
+    flotte = {t: sum(round(model.truck_type_used[k, t].value) for k in model.K) for t in model.T}
+    print(f"Startlösung: {wert:,.2f} € nach {sekunden:.3f}s")
+    print("Flotte: " + ", ".join(f"{t}={n}" for t, n in flotte.items() if n) +
+          " | Säulen: " + ", ".join(f"{l}={model.y_l[l].value}" for l in model.L) +
+          f" | Netzausbau: {model.u.value}")
+    print(f"Größte Verletzung einer Nebenbedingung: {groesste_verletzung(model):.2e}")
+
+    if args.loesen:
+        _, sekunden = loese(model, args.zeitlimit, warmstart=True)
+        if hat_loesung(model):
+            print(f"Lösung mit MIP-Start: {pyo.value(model.obj):,.2f} € nach {sekunden:.1f}s")
@@ -0,0 +1,158 @@
+# ============================================================================
+# WAS-WÄRE-WENN-SZENARIEN MIT PERSISTENTEM SOLVER
+# Aufruf: python szenarien.py [--zeitlimit 300] [--erweiterungen] [--instanz full.csv]
+#
+# Das Modell wird einmal mit build_model(veraenderlich=True) gebaut, d.h. die
+# VERAENDERLICHE_PARAMETER aus modell.py (Strompreis c_e, Dieselpreis,
+# Maut, Netzanschluss p_grid_max, PV-Kosten, ...) sind mutable. Ein
+# Szenario setzt nur diese Parameter im geladenen Modell; ein persistenter
+# appsi-Solver (Gurobi > HiGHS, siehe waehle_persistenten_solver) wird für
+# alle Szenarien wiederverwendet: nur die geänderten Koeffizienten und
+# Schranken werden übertragen, gestartet wird warm von der zuletzt geladenen
+# Lösung. Ohne appsi-Solver fällt das Skript mit Warnung auf waehle_solver
+# zurück, das Modell wird dann je Szenario neu geschrieben.
+# Jedes Szenario geht vom Basisfall aus; ein Wert ist eine Zahl (bei
+# indizierten Parametern für alle Einträge), ein dict {Index: Wert} oder eine
+# Funktion des Basiswerts (z.B. lambda alt: 1.2 * alt).
+# ============================================================================
+
+import argparse
+import time
+
+import pyomo.environ as pyo
+from pyomo.opt import SolverFactory
+
+from modell import build_model, waehle_solver, MIP_START
+from startloesung import startloesung
+from benders import unzulaessig
+
+# Persistente Solver in Reihenfolge der Wahl: (appsi-Name, Anzeigename, Zeitlimit-Option)
+PERSISTENTE_SOLVER = (('appsi_gurobi', 'Gurobi', 'TimeLimit'), ('appsi_highs', 'HiGHS', 'time_limit'))
+
+# (Name, {Parameter: Wert}) - HIER ÄNDERN!
+SZENARIEN = [
+    ('Basis', {}),
+    ('Strompreis +20 %', {'c_e': lambda alt: 1.2 * alt}),
+    ('Strompreis -20 %', {'c_e': lambda alt: 0.8 * alt}),
+    ('Diesel 1,80 €/l', {'c_diesel': 1.8}),
+    ('Diesel 1,20 €/l', {'c_diesel': 1.2}),
+    ('Maut 0,45 €/km', {'c_m_d': 0.45}),
+    ('Netzanschluss 300 kW', {'p_grid_max': 300}),
+    ('Netzanschluss 1000 kW', {'p_grid_max': 1000}),
+    ('Leistungspreis 100 €/kW', {'cPeak': 100}),
+]
+
+# Nur im Modell aus Teilaufgabe 4 vorhanden
+SZENARIEN_ERWEITERUNGEN = [
+    ('CO₂-Aufschlag Klasse 4', {'c_co2_maut': 0.079}),
+    ('PV 40 €/kWp', {'capex_pv': 40}),
+    ('PV 100 €/kWp', {'capex_pv': 100}),
+]
+
+
+def parameterwerte(param):
+    """Aktuelle Werte von param als {Index: Wert} (None bei skalaren Parametern)."""
+    return {index: pyo.value(param[index]) for index in param}
+
+
+def setze_parameter(model, basis, aenderungen):
+    """Setzt alle veränderlichen Parameter auf basis und dann auf die Szenario-Werte."""
+    for name, werte in basis.items():
+        param = model.component(name)
+        for index, wert in werte.items():
+            param[index] = wert
+    for name, neu in aenderungen.items():
+        if name not in basis:
+            raise KeyError(f"{name} ist kein veränderlicher Parameter dieses Modells")
+        param = model.component(name)
+        for index, alt in basis[name].items():
+            if callable(neu):
+                param[index] = neu(alt)
+            elif isinstance(neu, dict):
+                param[index] = neu.get(index, alt)
+            else:
+                param[index] = neu
+
+
+def ergebnis(model):
+    """Kennzahlen der geladenen Lösung."""
+    e_lkw = sum(1 for k in model.K for t in model.TE if pyo.value(model.truck_type_used[k, t]) > 0.5)
+    lkw = sum(1 for k in model.K if pyo.value(model.truck_used[k]) > 0.5)
+    saeulen = {l: round(pyo.value(model.y_l[l])) for l in model.L if pyo.value(model.y_l[l]) > 0.5}
+    return {'lkw': lkw, 'e_lkw': e_lkw, 'saeulen': saeulen, 'trafo': pyo.value(model.u) > 0.5,
+            'peak': pyo.value(model.p_peak)}
+
+
+def waehle_persistenten_solver(zeitlimit):
+    """Erster verfügbarer Solver aus PERSISTENTE_SOLVER; gibt (solver, solver_name) zurück.
+
+    Ist keiner verfügbar, wird mit Warnung waehle_solver verwendet (nicht persistent).
+    """
+    for appsi_name, solver_name, zeitoption in PERSISTENTE_SOLVER:
+        try:
+            solver = SolverFactory(appsi_name)
+            if solver.available():
+                solver.options[zeitoption] = zeitlimit
+                print(f"Verwende Solver: {solver_name} (persistent)")
+                return solver, solver_name
+        except:
+            pass
+    print("WARNUNG: kein persistenter Solver (appsi_gurobi, appsi_highs) - jedes Szenario baut das Modell "
+          "im Solver neu auf")
+    return waehle_solver(zeitlimit)
+
+
+def loese_szenarien(szenarien, zeitlimit=300, erweiterungen=False, **optionen):
+    """Baut das Modell einmal und löst alle Szenarien nacheinander warm; gibt eine Zeile je Szenario zurück."""
+    start = time.perf_counter()
+    model = build_model(erweiterungen=erweiterungen, veraenderlich=True, **optionen)
+    basis = {p.local_name: parameterwerte(p) for p in model.component_objects(pyo.Param) if p.mutable}
+    warm = MIP_START and startloesung(model, erweiterungen) is not None
+    solver, _ = waehle_persistenten_solver(zeitlimit)
+    warm = warm and solver.warm_start_capable()
+    print(f"Modellaufbau: {time.perf_counter() - start:.1f}s | veränderlich: {', '.join(basis)}")
+
+    zeilen = []
+    for name, aenderungen in szenarien:
+        setze_parameter(model, basis, aenderungen)
+        start = time.perf_counter()
+        if warm:
+            results = solver.solve(model, tee=False, warmstart=True, load_solutions=False)
+        else:
+            results = solver.solve(model, tee=False, load_solutions=False)
+        dauer = time.perf_counter() - start
+        zeile = {'szenario': name, 'zeit': dauer, 'status': str(results.solver.termination_condition),
+                 'zielwert': None}
+        if not unzulaessig(results) and len(results.solution) > 0:
+            model.solutions.load_from(results)
+            zeile.update(zielwert=pyo.value(model.obj), **ergebnis(model))
+        zeilen.append(zeile)
+        print(f">>> {name}: {zeile['status']} in {dauer:.1f}s")
+    setze_parameter(model, basis, {})
+    return zeilen
+
+
+def ausgabe(zeilen):
+    print("\n" + "=" * 110)
+    print(f"{'Szenario':<26} {'Zielwert':>14} {'Status':<15} {'Zeit':>7} {'LKW':>4} {'E-LKW':>6} "
+          f"{'Trafo':>6} {'Spitze kW':>10}  Säulen")
+    print("-" * 110)
+    for z in zeilen:
+        if z['zielwert'] is None:
+            print(f"{z['szenario']:<26} {'-':>14} {z['status']:<15} {z['zeit']:>6.1f}s")
+            continue
+        saeulen = ", ".join(f"{l}={n}" for l, n in z['saeulen'].items()) or "-"
+        print(f"{z['szenario']:<26} {z['zielwert']:>14,.2f} {z['status']:<15} {z['zeit']:>6.1f}s "
+              f"{z['lkw']:>4} {z['e_lkw']:>6} {'ja' if z['trafo'] else 'nein':>6} {z['peak']:>10.1f}  {saeulen}")
+    print("=" * 110)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Was-wäre-wenn-Szenarien mit persistentem Solver")
+    parser.add_argument('--zeitlimit', type=int, default=300, help="Zeitlimit je Szenario in Sekunden")
+    parser.add_argument('--erweiterungen', action='store_true', help="Modell aus Teilaufgabe 4")
+    parser.add_argument('--instanz', help="full.csv-Datei (Standard: DATEN_CSV)")
+    args = parser.parse_args()
+
+    szenarien = SZENARIEN + (SZENARIEN_ERWEITERUNGEN if args.erweiterungen else [])
+    ausgabe(loese_szenarien(szenarien, args.zeitlimit, args.erweiterungen, instanz=args.instanz))